@@ -0,0 +1,108 @@
+"""
+DIDGERI-BOOM Audio Analysis
+Decode a clip's soundtrack straight into NumPy and derive energy envelopes.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("[AUDIO] numpy not installed. Audio analysis disabled.")
+    np = None
+
+# Short-time spectra computed per batch in onset_envelope
+FLUX_BLOCK_FRAMES = 4096
+
+
+def decode_audio(path: Path, sample_rate: int = 8000, duration: Optional[float] = None):
+    """First audio stream as mono float32 samples in [-1, 1).
+
+    FFmpeg resamples and downmixes while decoding and pipes raw s16le, so
+    no WAV is written and video is never decoded. ``duration`` stops the
+    decode after that many seconds.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for audio analysis")
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        str(path),
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        *(["-t", str(duration)] if duration else []),
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(
+            result.stderr.decode("utf-8", errors="replace").strip()[-300:]
+        )
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_signal(samples, frame: int, hop: int):
+    """Overlapping frames as a (n_frames, frame) view; the tail is zero-padded."""
+    if len(samples) < frame:
+        samples = np.pad(samples, (0, frame - len(samples)))
+    n_frames = 1 + (len(samples) - frame + hop - 1) // hop
+    samples = np.pad(samples, (0, (n_frames - 1) * hop + frame - len(samples)))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+
+
+def rms_envelope(samples, sample_rate: int, hop_seconds: float):
+    """Root-mean-square level per hop."""
+    hop = max(1, int(sample_rate * hop_seconds))
+    frames = frame_signal(samples, hop, hop)
+    return np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+
+
+def onset_envelope(samples, sample_rate: int, hop_seconds: float, fft_size: int = 512):
+    """Spectral flux per hop: how much new energy appears across the spectrum.
+
+    Short-time spectra are taken every ~fft_size/2 samples, at a step
+    that divides the hop exactly; the half-wave rectified frame-to-frame
+    increase in log magnitude is averaged per hop, so strikes, pulses and
+    vocal hits score high while a steady drone scores low. Hops line up
+    one-to-one with ``rms_envelope`` for the same ``hop_seconds``.
+    """
+    hop = max(1, int(sample_rate * hop_seconds))
+    steps = [s for s in range(fft_size // 4, fft_size + 1) if hop % s == 0]
+    step = min(steps, key=lambda s: abs(s - fft_size // 2)) if steps else fft_size // 2
+    frames = frame_signal(samples, fft_size, step)
+    window = np.hanning(fft_size).astype(np.float32)
+    flux = np.empty(len(frames), dtype=np.float32)
+    previous = None
+    # Blocks keep the spectra of a 20-minute session from sitting in memory at once
+    for start in range(0, len(frames), FLUX_BLOCK_FRAMES):
+        spectra = np.log1p(
+            np.abs(
+                np.fft.rfft(frames[start : start + FLUX_BLOCK_FRAMES] * window, axis=1)
+            )
+        )
+        prepend = spectra[:1] if previous is None else previous
+        flux[start : start + len(spectra)] = np.maximum(
+            np.diff(spectra, axis=0, prepend=prepend), 0
+        ).sum(axis=1)
+        previous = spectra[-1:]
+
+    # Each frame belongs to the hop its centre falls in (later ones are padding)
+    n_hops = max(1, -(-len(samples) // hop))
+    owner = (np.arange(len(flux)) * step + fft_size // 2) // hop
+    keep = owner < n_hops
+    totals = np.bincount(owner[keep], weights=flux[keep], minlength=n_hops)
+    counts = np.bincount(owner[keep], minlength=n_hops)
+    return totals / np.maximum(counts, 1)
@@ -0,0 +1,193 @@
+"""
+DIDGERI-BOOM Batch Renderer
+Fans process_video jobs out to a bounded pool of worker processes.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from config import VIDEO_RENDER_WORKERS
+
+# How often a clip held back by low disk space re-checks
+LOW_DISK_RETRY_SECONDS = 60
+
+# One VideoEditor per worker process, built by the pool initializer
+_worker_editor = None
+
+
+def _init_worker(ffmpeg_threads: int, preload_whisper: bool, reuse_batched: bool):
+    global _worker_editor
+    from video_editor import VideoEditor
+    from whisper_pool import shared_pool
+
+    if preload_whisper:
+        # Load before the first clip; Whisper gets the same core share as FFmpeg
+        shared_pool(cpu_threads=ffmpeg_threads).preload()
+    _worker_editor = VideoEditor(ffmpeg_threads=ffmpeg_threads)
+    _worker_editor.caption_engine.reuse_batched = reuse_batched
+
+
+def _render(video_path: str, options: dict) -> dict:
+    try:
+        return _worker_editor.process_video(Path(video_path), **options)
+    except Exception as e:
+        return {"input": video_path, "error": str(e), "status": "failed"}
+
+
+class BatchRun:
+    """Results of one ``BatchRenderer.render`` call, in completion order.
+
+    Clips are handed to the pool one per free worker, each only once
+    ``storage`` (if given) has room for it; a finished clip's
+    intermediates are released straight away. ``close()`` is safe from
+    any thread (e.g. when a streaming client disconnects): no more clips
+    are queued, while renders already running finish in their workers
+    without anyone waiting on them.
+    """
+
+    def __init__(
+        self,
+        pool: ProcessPoolExecutor,
+        workers: int,
+        video_paths: Iterable,
+        options: dict,
+        storage=None,
+    ):
+        self._pool = pool
+        self._options = options
+        self._storage = storage
+        self._slots = threading.Semaphore(workers)
+        self._finished: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._received = 0
+        self._fed = False
+        self._closed = threading.Event()
+        threading.Thread(target=self._feed, args=(video_paths,), daemon=True).start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        while True:
+            with self._lock:
+                done = self._closed.is_set() or (
+                    self._fed and self._received >= self._submitted
+                )
+            if done:
+                self.close()
+                raise StopIteration
+            item = self._finished.get()
+            if item is None:
+                # End of the clip source, or close() waking us up
+                with self._lock:
+                    self._fed = True
+                continue
+            self._received += 1
+            path, future = item
+            if future.cancelled():
+                continue
+            try:
+                return future.result()
+            except Exception as e:
+                # Worker died (OOM kill etc.) — report the clip and keep going
+                return {"input": path, "error": str(e), "status": "failed"}
+
+    def close(self):
+        """Stop the batch: cancel queued clips and release the pool without blocking."""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._finished.put(None)
+
+    def _feed(self, video_paths: Iterable):
+        try:
+            for path in video_paths:
+                # One clip per free worker, so the space check sees the disk as it starts
+                while not self._slots.acquire(timeout=1):
+                    if self._closed.is_set():
+                        return
+                if not self._wait_for_space(path):
+                    return
+                with self._lock:
+                    if self._closed.is_set():
+                        return
+                    future = self._pool.submit(_render, str(path), self._options)
+                    self._submitted += 1
+                future.add_done_callback(lambda f, p=str(path): self._done(p, f))
+        except Exception as e:
+            print(f"[BATCH] Stopped queueing clips: {e}")
+        finally:
+            # A lazy source (e.g. CaptionEngine.prefill) stops transcribing too
+            if hasattr(video_paths, "close"):
+                video_paths.close()
+            self._finished.put(None)
+
+    def _done(self, path: str, future):
+        if self._storage and not future.cancelled() and not future.exception():
+            result = future.result()
+            if result.get("status") == "ready" and result.get("work_dir"):
+                self._storage.release(Path(result["work_dir"]))
+        self._slots.release()
+        self._finished.put((path, future))
+
+    def _wait_for_space(self, path) -> bool:
+        """Hold the next clip while free disk space would drop below the floor (False if closed)."""
+        if not self._storage:
+            return True
+        render_mode = self._options.get("render_mode")
+        if self._storage.has_room(path, render_mode):
+            return True
+        self._storage.collect()
+        held = False
+        while not self._storage.has_room(path, render_mode):
+            if not held:
+                print(f"[BATCH] Low disk space — holding {Path(path).name}")
+                held = True
+            if self._closed.wait(LOW_DISK_RETRY_SECONDS):
+                return False
+        return True
+
+
+class BatchRenderer:
+    """Renders many clips concurrently, splitting CPU between workers and FFmpeg threads."""
+
+    def __init__(self, workers: int = VIDEO_RENDER_WORKERS, storage=None):
+        self.storage = storage
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, min(workers, cpus))
+        # Each concurrent FFmpeg gets an even share of the cores
+        self.ffmpeg_threads = max(1, cpus // self.workers)
+
+    def render(
+        self, video_paths: Iterable, prefilled: bool = False, **options
+    ) -> BatchRun:
+        """Process every clip, yielding each result as soon as it finishes.
+
+        ``video_paths`` may be lazy, like CaptionEngine.prefill(): clips
+        are submitted as they arrive, so rendering overlaps the batched
+        transcription. With ``prefilled`` the workers reuse those
+        transcripts and only load Whisper for a clip that missed. Close
+        the returned BatchRun to abandon the rest of the batch.
+        """
+        sized = isinstance(video_paths, (list, tuple))
+        workers = max(1, min(self.workers, len(video_paths))) if sized else self.workers
+        add_captions = bool(options.get("add_captions", True))
+        # Worker processes only start once clips are submitted
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.ffmpeg_threads, add_captions and not prefilled, prefilled),
+        )
+        return BatchRun(pool, workers, video_paths, options, self.storage)
+
+    def get_status(self) -> dict:
+        return {"workers": self.workers, "ffmpeg_threads": self.ffmpeg_threads}
@@ -0,0 +1,430 @@
+"""
+DIDGERI-BOOM Pipeline Benchmark
+Renders deterministic synthetic clips through VideoEditor and records cost per run.
+
+Usage:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --modes fused stream --durations 10 60 --repeat 3
+    python benchmark_pipeline.py --compare data/benchmarks/bench_a91c789.json
+    python benchmark_pipeline.py --transcription clips/*.mp4 --batch-size 16
+
+Clips are FFmpeg lavfi sources (testsrc2 + sine), so every machine renders
+identical input. Each render runs in a fresh child process with its own
+DATA_DIR, so it neither hits nor fills the probe, loudness, transcript,
+template and render caches of the real install. Run wall time, CPU seconds
+(user + sys, FFmpeg included) and peak RSS come from wait4() on that child;
+the same per stage (wall/fps/CPU/peak RSS) from the processing report, and
+per-stage output bytes from the checkpoint manifest.
+
+--transcription instead times Whisper alone on real clips (synthetic tones
+hold no speech): one transcribe() per clip versus a single batched
+transcribe_batch() over all of them, with the transcript cache disabled.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+sys.path.append(str(BASE_DIR))
+
+from config import DATA_DIR, RAW_VIDEO_DIR, SUPPORTED_INPUT_FORMATS, WHISPER_BATCH_SIZE
+
+MEDIA_DIR = DATA_DIR / "bench_media"
+RESULTS_DIR = DATA_DIR / "benchmarks"
+
+SHAPES = {
+    "landscape": (1920, 1080),
+    "portrait": (1080, 1920),
+    "ultratall": (720, 2560),
+}
+MODES = ("fused", "stream", "staged")
+
+
+# ── Synthetic media ───────────────────────────────────────────
+
+
+def make_clip(shape: str, duration: int) -> Path:
+    """Generate (once) a testsrc2 + sine clip of the given shape and length."""
+    width, height = SHAPES[shape]
+    path = MEDIA_DIR / f"{shape}_{duration}s.mp4"
+    if path.exists():
+        return path
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={width}x{height}:rate=30:duration={duration}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=220:beep_factor=4:sample_rate=44100:duration={duration}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-crf",
+            "20",
+            "-g",
+            "60",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "128k",
+            "-fflags",
+            "+bitexact",
+            "-flags:v",
+            "+bitexact",
+            "-flags:a",
+            "+bitexact",
+            "-shortest",
+            "-f",
+            "mp4",
+            str(tmp),
+        ],
+        check=True,
+    )
+    tmp.replace(path)
+    return path
+
+
+# ── Running ───────────────────────────────────────────────────
+
+
+def run_once(clip: Path, mode: str, captions: bool) -> dict:
+    """Render ``clip`` in a child process and measure it."""
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        tmp = Path(tmp)
+        out_file = tmp / "result.json"
+        env = dict(
+            os.environ,
+            DATA_DIR=str(tmp / "data"),
+            RAW_VIDEO_DIR=str(tmp / "raw"),
+            PROCESSED_VIDEO_DIR=str(tmp / "processed"),
+            UPLOAD_QUEUE_DIR=str(tmp / "queue"),
+        )
+        cmd = [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "--worker",
+            str(clip),
+            mode,
+            "1" if captions else "0",
+            str(out_file),
+        ]
+        started = time.monotonic()
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.monotonic() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        report = (
+            json.loads(out_file.read_text(encoding="utf-8"))
+            if out_file.exists()
+            else {}
+        )
+        return {
+            "status": report.get("status", "failed"),
+            "error": report.get("error")
+            or (None if proc.returncode == 0 else f"exit {proc.returncode}"),
+            "wall_s": round(wall, 3),
+            "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+            # ru_maxrss is KiB on Linux — the largest of the worker and its FFmpeg children
+            "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+            "output_bytes": report.get("output_bytes", 0),
+            "stages": report.get("timings", {}),
+            "stage_output_bytes": report.get("stage_output_bytes", {}),
+        }
+
+
+def worker(clip: str, mode: str, captions: str, out_file: str):
+    """Child-process entry point: one process_video call, report written as JSON."""
+    from video_editor import VideoEditor
+
+    editor = VideoEditor()
+    result = editor.process_video(
+        Path(clip),
+        render_mode=mode,
+        add_captions=captions == "1",
+        use_cache=False,
+    )
+    if result.get("output"):
+        result["output_bytes"] = Path(result["output"]).stat().st_size
+    manifest = Path(result.get("work_dir", "")) / "checkpoint.json"
+    if manifest.is_file():
+        stages = json.loads(manifest.read_text(encoding="utf-8")).get("stages", {})
+        result["stage_output_bytes"] = {
+            name: sum(size for _, size in entry["outputs"])
+            for name, entry in stages.items()
+        }
+    Path(out_file).write_text(json.dumps(result, default=str), encoding="utf-8")
+
+
+def run_suite(
+    shapes: list, durations: list, modes: list, repeat: int, captions: bool
+) -> list:
+    runs = []
+    for shape in shapes:
+        for duration in durations:
+            clip = make_clip(shape, duration)
+            for mode in modes:
+                samples = [run_once(clip, mode, captions) for _ in range(repeat)]
+                # Report the median-wall sample so one noisy run doesn't skew it
+                best = sorted(samples, key=lambda s: s["wall_s"])[len(samples) // 2]
+                best["wall_samples"] = [s["wall_s"] for s in samples]
+                best.update(clip=clip.name, shape=shape, duration=duration, mode=mode)
+                runs.append(best)
+                print(
+                    f"  {clip.name:<22} {mode:<7} {best['status']:<7} "
+                    f"wall {best['wall_s']:>7.2f}s  cpu {best['cpu_s']:>7.2f}s  "
+                    f"rss {best['peak_rss_mb']:>7.1f}MB  out {best['output_bytes'] / 1e6:>6.2f}MB"
+                )
+                for stage, timing in best["stages"].items():
+                    print(
+                        f"    {stage:<28} wall {timing.get('wall_s', 0):>7.2f}s  "
+                        f"cpu {timing.get('cpu_s', 0):>7.2f}s  rss {timing.get('peak_rss_mb', 0):>7.1f}MB"
+                    )
+    return runs
+
+
+# ── Transcription throughput ──────────────────────────────────
+
+
+def run_transcription(clips: list, batch_size: int, repeat: int) -> dict:
+    """Sequential vs batched Whisper over the same decoded clips."""
+    from caption_engine import WHISPER_SAMPLE_RATE, CaptionEngine
+    from transcript_cache import TranscriptCache
+
+    with tempfile.TemporaryDirectory(prefix="bench_tx_") as tmp:
+        # A zero budget evicts every transcript as soon as it is stored
+        engine = CaptionEngine(
+            transcript_cache=TranscriptCache(max_mb=0, cache_dir=Path(tmp))
+        )
+        if not engine.pool.preload(engine.model_size):
+            raise SystemExit("Whisper model unavailable")
+        audios = [engine.extract_audio(Path(c)) for c in clips]
+        audio_seconds = sum(len(a) for a in audios) / WHISPER_SAMPLE_RATE
+
+        def measure(name: str, fn) -> dict:
+            samples = []
+            for _ in range(repeat):
+                # Whisper runs in this process; process_time() is its user + system time on every OS
+                cpu = time.process_time()
+                started = time.monotonic()
+                fn()
+                wall = time.monotonic() - started
+                samples.append((wall, time.process_time() - cpu))
+            wall, cpu = sorted(samples)[len(samples) // 2]
+            print(
+                f"  {name:<10} wall {wall:>7.2f}s  cpu {cpu:>7.2f}s  "
+                f"{audio_seconds / wall:>6.1f}x realtime  {len(clips) / wall * 60:>6.1f} clips/min"
+            )
+            return {
+                "wall_s": round(wall, 3),
+                "cpu_s": round(cpu, 3),
+                "wall_samples": [round(w, 3) for w, _ in samples],
+                "realtime_factor": round(audio_seconds / wall, 2),
+            }
+
+        print(
+            f"Transcribing {len(clips)} clips ({audio_seconds:.0f}s of audio), batch size {batch_size}:"
+        )
+        sequential = measure(
+            "sequential", lambda: [engine.transcribe(a) for a in audios]
+        )
+        batched = measure(
+            "batched", lambda: engine.transcribe_batch(audios, batch_size)
+        )
+    speedup = sequential["wall_s"] / batched["wall_s"] if batched["wall_s"] else 0
+    print(f"  speedup {speedup:.2f}x")
+    return {
+        "model": engine.model_size,
+        "clips": [Path(c).name for c in clips],
+        "audio_seconds": round(audio_seconds, 1),
+        "batch_size": batch_size,
+        "sequential": sequential,
+        "batched": batched,
+        "speedup": round(speedup, 2),
+    }
+
+
+# ── Environment & comparison ──────────────────────────────────
+
+
+def git_revision() -> dict:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args],
+                cwd=BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except Exception:
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def ffmpeg_version() -> str:
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True
+        ).stdout
+        return out.splitlines()[0]
+    except Exception:
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Print per-run deltas against ``baseline``; True if anything regressed."""
+    base_runs = {(r["clip"], r["mode"]): r for r in baseline.get("runs", [])}
+    print(f"\nCompared with {baseline.get('commit', '?')} (threshold {threshold:.0%}):")
+    regressed = False
+    for run in current["runs"]:
+        base = base_runs.get((run["clip"], run["mode"]))
+        if not base or base["status"] != "ready" or run["status"] != "ready":
+            continue
+        deltas = {}
+        for metric in ("wall_s", "cpu_s", "peak_rss_mb", "output_bytes"):
+            if base[metric]:
+                deltas[metric] = (run[metric] - base[metric]) / base[metric]
+        slower = [
+            m
+            for m in ("wall_s", "cpu_s", "peak_rss_mb")
+            if deltas.get(m, 0) > threshold
+        ]
+        regressed = regressed or bool(slower)
+        print(
+            f"  {run['clip']:<22} {run['mode']:<7} "
+            + "  ".join(f"{m} {d:+.1%}" for m, d in deltas.items())
+            + (f"  ← REGRESSION ({', '.join(slower)})" if slower else "")
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="🎬 Benchmark the DIDGERI-BOOM video pipeline on synthetic clips",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark_pipeline.py
+  python benchmark_pipeline.py --shapes portrait --durations 30 --modes fused --repeat 5
+  python benchmark_pipeline.py --compare data/benchmarks/bench_e68a0c5.json
+  python benchmark_pipeline.py --transcription --batch-size 16
+        """,
+    )
+    parser.add_argument(
+        "--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES)
+    )
+    parser.add_argument(
+        "--durations",
+        nargs="+",
+        type=int,
+        default=[5, 30],
+        help="Clip lengths in seconds",
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per clip/mode (median is kept)"
+    )
+    parser.add_argument(
+        "--captions", action="store_true", help="Include Whisper transcription"
+    )
+    parser.add_argument(
+        "--output", help="Results JSON (default: data/benchmarks/bench_<commit>.json)"
+    )
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Regression threshold (default 10%%)",
+    )
+    parser.add_argument(
+        "--transcription",
+        nargs="*",
+        metavar="CLIP",
+        help="Benchmark sequential vs batched Whisper instead (default: every clip in RAW_VIDEO_DIR)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=WHISPER_BATCH_SIZE,
+        help="Batched transcription size",
+    )
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    revision = git_revision()
+    print(
+        f"Benchmarking {revision['commit']}{' (dirty)' if revision['dirty'] else ''}..."
+    )
+    results = {
+        **revision,
+        "created_at": datetime.now().isoformat(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(),
+        },
+    }
+
+    if args.transcription is not None:
+        clips = args.transcription or sorted(
+            str(f)
+            for f in RAW_VIDEO_DIR.iterdir()
+            if f.suffix.lower() in SUPPORTED_INPUT_FORMATS
+        )
+        if not clips:
+            raise SystemExit("No clips to transcribe")
+        results["transcription"] = run_transcription(
+            clips, args.batch_size, max(1, args.repeat)
+        )
+        name = f"transcribe_{revision['commit']}.json"
+    else:
+        results["settings"] = {"captions": args.captions, "repeat": args.repeat}
+        results["runs"] = run_suite(
+            args.shapes, args.durations, args.modes, max(1, args.repeat), args.captions
+        )
+        name = f"bench_{revision['commit']}.json"
+
+    output = Path(args.output) if args.output else RESULTS_DIR / name
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    if args.compare and "runs" in results:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,94 +4,312 @@ Auto-generates captions from video audio using Whisper AI.
 """
 
 import json
-import subprocess
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
-from config import WHISPER_MODEL
+from audio_analysis import decode_audio, np
+from config import (
+    SPEECH_PRESCAN,
+    SPEECH_SKIP_CONFIDENCE,
+    WHISPER_BATCH_SIZE,
+    WHISPER_MODEL,
+)
+from speech_detector import SpeechDetector
+from transcript_cache import TranscriptCache
+from whisper_pool import WhisperPool, shared_pool
+
+# Whisper's native input rate
+WHISPER_SAMPLE_RATE = 16000
+# Passed to WhisperModel.transcribe — part of the transcript cache key
+TRANSCRIBE_OPTIONS = {"beam_size": 5, "word_timestamps": True, "vad_filter": True}
+# Cache key options of batched passes — decoded differently, so stored apart
+BATCHED_OPTIONS = {**TRANSCRIBE_OPTIONS, "mode": "batched"}
+# Whisper's context window — batched speech windows never exceed it
+WINDOW_SECONDS = 30
+# Audio concatenated into one batched run (~38 MB of samples at 16 kHz)
+BATCH_MAX_AUDIO_SECONDS = 600
 
 
 class CaptionEngine:
     """Generates captions/subtitles from video audio using Whisper."""
 
-    def __init__(self, model_size: str = WHISPER_MODEL):
+    def __init__(
+        self,
+        model_size: str = WHISPER_MODEL,
+        pool: Optional[WhisperPool] = None,
+        transcript_cache: Optional[TranscriptCache] = None,
+    ):
         self.model_size = model_size
-        self._model = None
-
-    def _load_model(self):
-        """Lazy-load the Whisper model."""
-        if self._model is None:
-            try:
-                from faster_whisper import WhisperModel
-                self._model = WhisperModel(
-                    self.model_size,
-                    device="cpu",
-                    compute_type="int8",
+        # Models live in the process-wide pool, not per engine
+        self.pool = pool or shared_pool()
+        self.transcript_cache = transcript_cache or TranscriptCache()
+        self.speech_detector = SpeechDetector() if SPEECH_PRESCAN else None
+        # Let transcribe() fall back to transcripts from batched passes
+        # (set for renders that a prefill() ran ahead of)
+        self.reuse_batched = False
+        # This thread's last transcribe(): served from cache? speech pre-scan result
+        self._local = threading.local()
+
+    def extract_audio(self, video_path: Path):
+        """Audio track as 16 kHz mono float32 samples, piped from FFmpeg (no temp file)."""
+        return decode_audio(video_path, WHISPER_SAMPLE_RATE)
+
+    def transcribe(self, audio) -> list[dict]:
+        """Transcribe audio (samples from ``extract_audio`` or a file path) to timed segments.
+
+        Samples confidently scanned as instrumental get instrumental
+        captions without Whisper; the rest are looked up in the transcript
+        cache (then among batched-pass transcripts, with ``reuse_batched``),
+        and only a miss loads/borrows the model.
+        """
+        self._local.cached = False
+        self._local.speech_scan = None
+        key = None
+        if not isinstance(audio, (str, Path)):
+            scan = self._local.speech_scan = self._scan_speech(audio)
+            if scan and scan["skipped_whisper"]:
+                return self._get_instrumental_captions()
+            key = self.transcript_cache.make_key(
+                audio, self.model_size, TRANSCRIBE_OPTIONS
+            )
+            cached = self.transcript_cache.lookup(key)
+            if cached is None and self.reuse_batched:
+                cached = self.transcript_cache.lookup(
+                    self.transcript_cache.make_key(
+                        audio, self.model_size, BATCHED_OPTIONS
+                    )
                 )
-            except ImportError:
-                print("[CAPTION] faster-whisper not installed. Captions disabled.")
-                return None
-        return self._model
-
-    def extract_audio(self, video_path: Path, output_path: Optional[Path] = None) -> Path:
-        """Extract audio track from video using FFmpeg."""
-        if output_path is None:
-            output_path = video_path.with_suffix(".wav")
-
-        cmd = [
-            "ffmpeg", "-y",
-            "-i", str(video_path),
-            "-vn",  # No video
-            "-acodec", "pcm_s16le",
-            "-ar", "16000",  # 16kHz for Whisper
-            "-ac", "1",  # Mono
-            str(output_path),
-        ]
-        subprocess.run(cmd, capture_output=True, check=True)
-        return output_path
+            if cached is not None:
+                self._local.cached = True
+                return self._with_fallback(cached)
 
-    def transcribe(self, audio_path: Path) -> list[dict]:
-        """Transcribe audio to text segments with timestamps."""
-        model = self._load_model()
-        if model is None:
+        with self.pool.acquire(self.model_size) as model:
+            if model is None:
+                return self._get_instrumental_captions()
+            result = self._run_model(model, audio)
+        if result is None:
             return self._get_instrumental_captions()
+        if key:
+            self.transcript_cache.store(key, result)
+        return self._with_fallback(result)
 
+    def _run_model(self, model, audio) -> Optional[list[dict]]:
+        """Raw Whisper segments, or None if transcription failed."""
         try:
             segments, info = model.transcribe(
-                str(audio_path),
-                beam_size=5,
-                word_timestamps=True,
-                vad_filter=True,
+                str(audio) if isinstance(audio, Path) else audio,
+                **TRANSCRIBE_OPTIONS,
             )
 
-            result = []
-            for segment in segments:
-                seg_data = {
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip(),
-                    "words": [],
-                }
-                if segment.words:
-                    for word in segment.words:
-                        seg_data["words"].append({
-                            "word": word.word,
-                            "start": word.start,
-                            "end": word.end,
-                            "probability": word.probability,
-                        })
-                result.append(seg_data)
-
-            # If very little speech detected, add instrumental captions
-            total_text = " ".join(s["text"] for s in result).strip()
-            if len(total_text) < 10:
-                result = self._get_instrumental_captions()
-
-            return result
+            return [self._segment_dict(segment) for segment in segments]
 
         except Exception as e:
             print(f"[CAPTION] Transcription error: {e}")
+            return None
+
+    def transcribe_batch(
+        self, audios: list, batch_size: int = WHISPER_BATCH_SIZE
+    ) -> list[list[dict]]:
+        """Transcribe many clips' samples in batched passes; results in input order.
+
+        The speech windows of every clip that misses the transcript cache
+        are packed into one BatchedInferencePipeline run, so short clips
+        fill a batch together instead of each paying the per-call overhead.
+        Results are cached apart from ``transcribe``'s, which only reuses
+        them with ``reuse_batched``. One language is detected per pass, so
+        a batch shouldn't mix languages.
+        """
+        keys = [
+            self.transcript_cache.make_key(a, self.model_size, BATCHED_OPTIONS)
+            for a in audios
+        ]
+        raw = [self.transcript_cache.lookup(k) for k in keys]
+        for i, audio in enumerate(audios):
+            scan = self._scan_speech(audio) if raw[i] is None else None
+            if scan and scan["skipped_whisper"]:
+                raw[i] = []
+        misses = [i for i, segments in enumerate(raw) if segments is None]
+        if misses:
+            with self.pool.acquire(self.model_size) as model:
+                for group in (
+                    self._batch_groups(misses, audios) if model is not None else []
+                ):
+                    results = self._run_batched(
+                        model, [audios[i] for i in group], batch_size
+                    )
+                    for i, segments in zip(group, results):
+                        if segments is not None:
+                            raw[i] = segments
+                            self.transcript_cache.store(keys[i], segments)
+        return [
+            (
+                self._with_fallback(r)
+                if r is not None
+                else self._get_instrumental_captions()
+            )
+            for r in raw
+        ]
+
+    def prefill(
+        self, video_paths: list, batch_size: int = WHISPER_BATCH_SIZE
+    ) -> Iterator[Path]:
+        """Batch-transcribe clips ahead of rendering, yielding each clip once its pass is cached.
+
+        Callers can start rendering the yielded clips (with
+        ``reuse_batched``) while later passes are still transcribing.
+        """
+        started = time.monotonic()
+        transcribed = 0
+        paths = [Path(p) for p in video_paths]
+        # FFmpeg decodes in parallel; passes are bounded so long sessions don't pile up in memory
+        with ThreadPoolExecutor(max_workers=4) as decoders:
+            while paths:
+                done, audios, seconds = [], [], 0.0
+                while paths and seconds < BATCH_MAX_AUDIO_SECONDS:
+                    take, paths = paths[:4], paths[4:]
+                    done += take
+                    for audio in decoders.map(self._try_extract, take):
+                        if audio is not None and len(audio):
+                            audios.append(audio)
+                            seconds += len(audio) / WHISPER_SAMPLE_RATE
+                self.transcribe_batch(audios, batch_size)
+                transcribed += len(audios)
+                yield from done
+        elapsed = round(time.monotonic() - started, 2)
+        print(
+            f"[CAPTION] Pre-transcribed {transcribed}/{len(video_paths)} clips in {elapsed}s"
+        )
+
+    def _scan_speech(self, audio) -> Optional[dict]:
+        """Speech pre-scan, plus whether it is confident enough to skip Whisper."""
+        if self.speech_detector is None:
+            return None
+        try:
+            scan = self.speech_detector.scan(audio, WHISPER_SAMPLE_RATE)
+        except Exception as e:
+            print(f"[CAPTION] Speech pre-scan failed: {e}")
+            return None
+        scan["skipped_whisper"] = (
+            not scan["speech"] and scan["confidence"] >= SPEECH_SKIP_CONFIDENCE
+        )
+        if scan["skipped_whisper"]:
+            print(
+                f"[CAPTION] No speech detected (confidence {scan['confidence']:.2f}) — skipping Whisper"
+            )
+        return scan
+
+    def _run_batched(
+        self, model, audios: list, batch_size: int
+    ) -> list[Optional[list[dict]]]:
+        """One batched Whisper run over the concatenated clips, split back per clip."""
+        try:
+            from faster_whisper import BatchedInferencePipeline
+
+            # Clips start on Whisper's 20 ms timestamp grid so their times come back exact
+            grid = WHISPER_SAMPLE_RATE // 50
+            padded, offsets, windows, position = [], [], [], 0
+            for audio in audios:
+                offsets.append(position / WHISPER_SAMPLE_RATE)
+                for start, end in self._speech_windows(audio):
+                    windows.append(
+                        {
+                            "start": (position + start) / WHISPER_SAMPLE_RATE,
+                            "end": (position + end) / WHISPER_SAMPLE_RATE,
+                        }
+                    )
+                padded.append(np.pad(audio, (0, -len(audio) % grid)))
+                position += len(padded[-1])
+            results = [[] for _ in audios]
+            if not windows:
+                return results
+
+            options = {k: v for k, v in TRANSCRIBE_OPTIONS.items() if k != "vad_filter"}
+            segments, info = BatchedInferencePipeline(model).transcribe(
+                np.concatenate(padded),
+                clip_timestamps=windows,
+                batch_size=batch_size,
+                **options,
+            )
+            # A segment's seek is its window's offset in frames, which
+            # places it in the right clip even if its timestamps stray
+            fps = model.frames_per_second
+            starts = [int(offset * fps) for offset in offsets]
+            for segment in segments:
+                i = bisect_right(starts, segment.seek) - 1
+                results[i].append(self._segment_dict(segment, offsets[i]))
+            return results
+
+        except Exception as e:
+            print(f"[CAPTION] Batched transcription error: {e}")
+            return [None] * len(audios)
+
+    def _speech_windows(self, samples) -> list[list[int]]:
+        """Voiced regions (sample offsets) merged into windows of at most WINDOW_SECONDS."""
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        regions = get_speech_timestamps(
+            samples,
+            VadOptions(
+                max_speech_duration_s=WINDOW_SECONDS, min_silence_duration_ms=160
+            ),
+        )
+        windows = []
+        for region in regions:
+            if (
+                windows
+                and region["end"] - windows[-1][0]
+                <= WINDOW_SECONDS * WHISPER_SAMPLE_RATE
+            ):
+                windows[-1][1] = region["end"]
+            else:
+                windows.append([region["start"], region["end"]])
+        return windows
+
+    def _batch_groups(self, indices: list, audios: list) -> list[list[int]]:
+        groups, seconds = [[]], 0.0
+        for i in indices:
+            duration = len(audios[i]) / WHISPER_SAMPLE_RATE
+            if groups[-1] and seconds + duration > BATCH_MAX_AUDIO_SECONDS:
+                groups.append([])
+                seconds = 0.0
+            groups[-1].append(i)
+            seconds += duration
+        return groups
+
+    def _try_extract(self, video_path: Path):
+        try:
+            return self.extract_audio(video_path)
+        except Exception as e:
+            print(f"[CAPTION] No audio from {Path(video_path).name}: {e}")
+            return None
+
+    def _segment_dict(self, segment, offset: float = 0.0) -> dict:
+        """Plain-dict copy of a faster-whisper segment, times shifted back by ``offset``."""
+        return {
+            "start": float(segment.start) - offset,
+            "end": float(segment.end) - offset,
+            "text": segment.text.strip(),
+            "words": [
+                {
+                    "word": word.word,
+                    "start": float(word.start) - offset,
+                    "end": float(word.end) - offset,
+                    "probability": float(word.probability),
+                }
+                for word in segment.words or []
+            ],
+        }
+
+    def _with_fallback(self, segments: list[dict]) -> list[dict]:
+        """If very little speech was detected, use instrumental captions instead."""
+        total_text = " ".join(s["text"] for s in segments).strip()
+        if len(total_text) < 10:
             return self._get_instrumental_captions()
+        return segments
 
     def generate_srt(self, segments: list[dict], output_path: Path) -> Path:
         """Generate an SRT subtitle file from transcription segments."""
@@ -143,42 +361,53 @@ class CaptionEngine:
             text = seg["text"].upper()
 
             # Glow background layer
-            events.append(
-                f"Dialogue: 0,{start},{end},TikTokGlow,,0,0,0,,{text}"
-            )
+            events.append(f"Dialogue: 0,{start},{end},TikTokGlow,,0,0,0,,{text}")
             # Main text layer
-            events.append(
-                f"Dialogue: 1,{start},{end},TikTok,,0,0,0,,{text}"
-            )
+            events.append(f"Dialogue: 1,{start},{end},TikTok,,0,0,0,,{text}")
 
         content = header + "\n".join(events) + "\n"
         output_path.write_text(content, encoding="utf-8")
         return output_path
 
-    def generate_captions(self, video_path: Path) -> dict:
-        """Full pipeline: video → audio → transcribe → subtitle files."""
-        audio_path = self.extract_audio(video_path)
+    def generate_captions(
+        self, video_path: Path, output_dir: Optional[Path] = None
+    ) -> dict:
+        """Full pipeline: video → audio → transcribe → subtitle files.
 
-        try:
-            segments = self.transcribe(audio_path)
-
-            srt_path = video_path.with_suffix(".srt")
-            ass_path = video_path.with_suffix(".ass")
-
-            self.generate_srt(segments, srt_path)
-            self.generate_ass(segments, ass_path)
-
-            return {
-                "segments": segments,
-                "srt_path": str(srt_path),
-                "ass_path": str(ass_path),
-                "word_count": sum(len(s["text"].split()) for s in segments),
-                "duration": segments[-1]["end"] if segments else 0,
-            }
-        finally:
-            # Clean up temp audio
-            if audio_path.exists():
-                audio_path.unlink()
+        Audio never touches disk, so the video's folder may be read-only;
+        subtitle files are written next to the video unless ``output_dir``
+        is given.
+        """
+        video_path = Path(video_path)
+        base = (
+            (Path(output_dir) / video_path.stem)
+            if output_dir
+            else video_path.with_suffix("")
+        )
+        if np is None:
+            # Samples need NumPy; without it (lean deploys) clips get
+            # instrumental captions, as when Whisper itself is missing
+            self._local.cached = False
+            self._local.speech_scan = None
+            segments = self._get_instrumental_captions()
+        else:
+            segments = self.transcribe(self.extract_audio(video_path))
+
+        srt_path = base.with_suffix(".srt")
+        ass_path = base.with_suffix(".ass")
+
+        self.generate_srt(segments, srt_path)
+        self.generate_ass(segments, ass_path)
+
+        return {
+            "segments": segments,
+            "srt_path": str(srt_path),
+            "ass_path": str(ass_path),
+            "word_count": sum(len(s["text"].split()) for s in segments),
+            "duration": segments[-1]["end"] if segments else 0,
+            "transcript_cached": getattr(self._local, "cached", False),
+            "speech_scan": getattr(self._local, "speech_scan", None),
+        }
 
     # ── Helpers ──────────────────────────────────────────────────
 
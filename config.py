@@ -5,6 +5,7 @@ Central configuration for the TikTok AI Platform.
 
 import os
 from pathlib import Path
+
 from dotenv import load_dotenv
 
 # Load environment
@@ -12,15 +13,23 @@ load_dotenv()
 
 # ── Paths ────────────────────────────────────────────────────────
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
 RAW_VIDEO_DIR = Path(os.getenv("RAW_VIDEO_DIR", str(DATA_DIR / "raw_videos")))
-PROCESSED_VIDEO_DIR = Path(os.getenv("PROCESSED_VIDEO_DIR", str(DATA_DIR / "processed_videos")))
+PROCESSED_VIDEO_DIR = Path(
+    os.getenv("PROCESSED_VIDEO_DIR", str(DATA_DIR / "processed_videos"))
+)
 UPLOAD_QUEUE_DIR = Path(os.getenv("UPLOAD_QUEUE_DIR", str(DATA_DIR / "upload_queue")))
 TEMPLATES_DIR = BASE_DIR / "templates"
 DB_PATH = DATA_DIR / "didgeri_boom.json"
 
 # Ensure directories exist
-for d in [RAW_VIDEO_DIR, PROCESSED_VIDEO_DIR, UPLOAD_QUEUE_DIR, DATA_DIR, TEMPLATES_DIR]:
+for d in [
+    RAW_VIDEO_DIR,
+    PROCESSED_VIDEO_DIR,
+    UPLOAD_QUEUE_DIR,
+    DATA_DIR,
+    TEMPLATES_DIR,
+]:
     d.mkdir(parents=True, exist_ok=True)
 
 # ── TikTok API ───────────────────────────────────────────────────
@@ -44,12 +53,73 @@ VIDEO_FPS = 30
 VIDEO_CODEC = "libx264"
 AUDIO_CODEC = "aac"
 VIDEO_BITRATE = "4M"
+VIDEO_MAXRATE = "5M"
+VIDEO_BUFSIZE = "10M"
 AUDIO_BITRATE = "128k"
+# EBU R128 loudness normalization (measured once per clip, applied in the render pass)
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "true").lower() in ("1", "true", "yes")
+AUDIO_LOUDNESS_TARGET = float(os.getenv("AUDIO_LOUDNESS_TARGET", "-14"))  # LUFS
+AUDIO_TRUE_PEAK = float(os.getenv("AUDIO_TRUE_PEAK", "-1.5"))  # dBTP
+AUDIO_LOUDNESS_RANGE = float(os.getenv("AUDIO_LOUDNESS_RANGE", "11"))  # LU
 MAX_FILE_SIZE_MB = 287  # TikTok max
+# "size": video bitrate derived from the clip length so the upload fits
+# VIDEO_TARGET_SIZE_MB (never above VIDEO_BITRATE); "crf": quality-targeted.
+# Either way an output over the target is re-encoded at a lower rate.
+VIDEO_RATE_CONTROL = os.getenv("VIDEO_RATE_CONTROL", "size")
+VIDEO_TARGET_SIZE_MB = min(
+    float(os.getenv("VIDEO_TARGET_SIZE_MB", str(MAX_FILE_SIZE_MB))), MAX_FILE_SIZE_MB
+)
 SUPPORTED_INPUT_FORMATS = {".mp4", ".mov", ".avi", ".mkv", ".webm"}
+# fused = one filtergraph + one encode; staged = one FFmpeg run per step (debug)
+VIDEO_RENDER_MODE = os.getenv("VIDEO_RENDER_MODE", "fused")
+# Concurrent clips in a batch render (CPU is split between workers and FFmpeg threads)
+VIDEO_RENDER_WORKERS = int(os.getenv("VIDEO_RENDER_WORKERS", "2"))
+# Extra renders from the same decode/filter pass as the TikTok master
+VIDEO_VARIANTS = {
+    "preview": {"width": 360, "height": 640, "bitrate": "600k", "audio_bitrate": "64k"},
+    "reels": {"width": 1080, "height": 1920, "bitrate": "5M", "audio_bitrate": "128k"},
+    "shorts": {"width": 1080, "height": 1920, "bitrate": "8M", "audio_bitrate": "192k"},
+}
+# Clips longer than this are split at keyframes and encoded in parallel segments
+VIDEO_CHUNKED_ENCODE_MIN_SECONDS = int(
+    os.getenv("VIDEO_CHUNKED_ENCODE_MIN_SECONDS", "600")
+)
+VIDEO_CHUNK_SECONDS = int(os.getenv("VIDEO_CHUNK_SECONDS", "120"))
+VIDEO_CHUNK_WORKERS = int(os.getenv("VIDEO_CHUNK_WORKERS", str(os.cpu_count() or 2)))
+# Background workers draining the /api/videos/process job queue
+RENDER_JOB_WORKERS = int(os.getenv("RENDER_JOB_WORKERS", "1"))
+# Watch-folder ingestion: a new raw clip counts as complete once its size
+# has been stable this long; optionally queue it for rendering straight away
+INGEST_SETTLE_SECONDS = float(os.getenv("INGEST_SETTLE_SECONDS", "5"))
+INGEST_AUTO_PROCESS = os.getenv("INGEST_AUTO_PROCESS", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Size budget for outputs tracked by the render cache (LRU beyond this)
+RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "20480"))
+# Processed work dirs: intermediates are deleted once a render finishes,
+# reports age out after the retention period, oldest dirs go first when the
+# folder exceeds its budget, and jobs wait while free disk is below the floor
+STORAGE_BUDGET_MB = int(os.getenv("STORAGE_BUDGET_MB", "51200"))
+STORAGE_REPORT_RETENTION_DAYS = int(os.getenv("STORAGE_REPORT_RETENTION_DAYS", "30"))
+STORAGE_MIN_FREE_MB = int(os.getenv("STORAGE_MIN_FREE_MB", "2048"))
+STORAGE_GC_INTERVAL_SECONDS = int(os.getenv("STORAGE_GC_INTERVAL_SECONDS", "3600"))
 
 # ── Whisper (Captions) ──────────────────────────────────────────
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny")
+# The model is loaded once per process and shared: CPU threads per
+# transcription (0 = CTranslate2 default) and how many may run at once
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+# Speech windows decoded together when many clips are captioned at once
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# NumPy pre-scan for speech; clips it calls instrumental with at least
+# this confidence (0–1) get instrumental captions without running Whisper
+SPEECH_PRESCAN = os.getenv("SPEECH_PRESCAN", "true").lower() in ("1", "true", "yes")
+SPEECH_SKIP_CONFIDENCE = float(os.getenv("SPEECH_SKIP_CONFIDENCE", "0.8"))
+# Transcripts keyed by decoded audio + model + options (LRU beyond this)
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "256"))
 
 # ── Scheduling ──────────────────────────────────────────────────
 MAX_DAILY_POSTS = int(os.getenv("MAX_DAILY_POSTS", "3"))
@@ -62,6 +132,10 @@ PEAK_HOURS = [7, 8, 12, 17, 18, 19, 20, 21]
 CREATOR_REWARDS_MIN_FOLLOWERS = 10_000
 CREATOR_REWARDS_MIN_VIEWS_30D = 100_000
 CREATOR_REWARDS_MIN_VIDEO_LENGTH = 60  # seconds
+# Length of highlights auto-trimmed from long sessions (Creator Rewards minimum by default)
+HIGHLIGHT_WINDOW_SECONDS = float(
+    os.getenv("HIGHLIGHT_WINDOW_SECONDS", str(CREATOR_REWARDS_MIN_VIDEO_LENGTH))
+)
 TIKTOK_SHOP_MIN_FOLLOWERS = 5_000
 LIVE_GIFTS_MIN_FOLLOWERS = 1_000
 
@@ -71,23 +145,52 @@ SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
 
 # ── Niche Keywords ──────────────────────────────────────────────
 NICHE_KEYWORDS = [
-    "didgeridoo", "didjeridu", "yidaki", "aboriginal",
-    "indigenous", "music", "instrument", "busking",
-    "street music", "world music", "meditation",
-    "drone", "circular breathing", "outback",
-    "australian", "tribal", "rhythm", "percussion",
+    "didgeridoo",
+    "didjeridu",
+    "yidaki",
+    "aboriginal",
+    "indigenous",
+    "music",
+    "instrument",
+    "busking",
+    "street music",
+    "world music",
+    "meditation",
+    "drone",
+    "circular breathing",
+    "outback",
+    "australian",
+    "tribal",
+    "rhythm",
+    "percussion",
 ]
 
 # ── Hashtag Pools ───────────────────────────────────────────────
 CORE_HASHTAGS = [
-    "#didgeridoo", "#didgeridooplayer", "#worldmusic",
-    "#aboriginal", "#indigenous", "#streetmusic",
-    "#busking", "#musician", "#australia",
-    "#culturalmusic", "#meditation", "#drone",
+    "#didgeridoo",
+    "#didgeridooplayer",
+    "#worldmusic",
+    "#aboriginal",
+    "#indigenous",
+    "#streetmusic",
+    "#busking",
+    "#musician",
+    "#australia",
+    "#culturalmusic",
+    "#meditation",
+    "#drone",
 ]
 
 VIRAL_HASHTAGS = [
-    "#fyp", "#foryou", "#foryoupage", "#viral",
-    "#trending", "#music", "#talent", "#mindblowing",
-    "#satisfying", "#unique", "#wow",
+    "#fyp",
+    "#foryou",
+    "#foryoupage",
+    "#viral",
+    "#trending",
+    "#music",
+    "#talent",
+    "#mindblowing",
+    "#satisfying",
+    "#unique",
+    "#wow",
 ]
@@ -228,16 +228,36 @@ function renderVideoList(containerId, videos, stage) {
 
     container.innerHTML = videos.slice(0, 5).map(v => {
         const name = v.name || v.filename || 'video.mp4';
+        const thumb = v.thumbnail
+            ? `<span class="video-thumb" data-poster="${escapeAttr(v.thumbnail.poster)}" data-sprite="${escapeAttr(v.thumbnail.sprite)}" data-frames="${v.thumbnail.sprite_frames}" style="width:27px; height:48px; flex-shrink:0; border-radius:3px; background:url('${escapeAttr(v.thumbnail.poster)}') center/cover;"></span>`
+            : '<span>🎥</span>';
         return `
             <div style="display: flex; gap: 8px; align-items: center; margin-bottom: 8px; font-size: 0.85rem; padding: 4px; border-radius: 4px; background: rgba(0,0,0,0.2);">
-                <span>🎥</span>
+                ${thumb}
                 <span style="flex-grow: 1; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">${escapeHtml(name)}</span>
+                ${v.duplicate_of ? `<span title="Duplicate of ${escapeAttr(v.duplicate_of)}" style="font-size:0.7rem; color:var(--text-muted);">dup</span>` : ''}
                 ${stage === 'raw' ? `<button onclick="processVideo('${escapeAttr(v.path)}')" style="background:transparent; color:var(--amber-glow); cursor:pointer;">⚙️</button>` : ''}
             </div>
         `;
     }).join('');
 }
 
+// Hovering a thumbnail scrubs through its sprite sheet
+document.addEventListener('mousemove', (e) => {
+    const el = e.target.closest && e.target.closest('.video-thumb');
+    if (!el) return;
+    const frames = parseInt(el.dataset.frames, 10) || 1;
+    const rect = el.getBoundingClientRect();
+    const idx = Math.min(frames - 1, Math.floor((e.clientX - rect.left) / rect.width * frames));
+    el.style.backgroundImage = `url('${el.dataset.sprite}')`;
+    el.style.backgroundSize = `${frames * 100}% 100%`;
+    el.style.backgroundPosition = `${frames > 1 ? idx / (frames - 1) * 100 : 0}% 0`;
+});
+document.addEventListener('mouseout', (e) => {
+    const el = e.target.closest && e.target.closest('.video-thumb');
+    if (el && !el.contains(e.relatedTarget)) el.style.background = `url('${el.dataset.poster}') center/cover`;
+});
+
 window.processVideo = async function(path) {
     await apiFetch('/api/videos/process', {
         method: 'POST',
@@ -253,7 +273,29 @@ window.processAllVideos = async function() {
     btn.innerHTML = '⏳ Processing...';
     btn.disabled = true;
 
-    await apiFetch('/api/videos/process-all', { method: 'POST' });
+    // Results stream back as NDJSON, one line per finished clip
+    try {
+        const res = await fetch(`${API}/api/videos/process-all`, { method: 'POST' });
+        if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let done = 0;
+        while (true) {
+            const { value, done: finished } = await reader.read();
+            if (finished) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                if (!line.trim() || 'processed' in JSON.parse(line)) continue;
+                btn.innerHTML = `⏳ Processing... (${++done})`;
+                loadPipeline();
+            }
+        }
+    } catch (err) {
+        console.warn('[API] /api/videos/process-all failed:', err.message);
+    }
 
     btn.innerHTML = '⚡ Process All';
     btn.disabled = false;
@@ -0,0 +1,253 @@
+"""
+DIDGERI-BOOM Dedup Index
+Perceptual fingerprints of raw clips so re-exported or renamed copies are rendered once.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from audio_analysis import decode_audio, frame_signal, np
+from config import DATA_DIR
+
+# Frames sampled for the video hash (as fractions of the duration)
+SAMPLE_POINTS = (0.2, 0.4, 0.6, 0.8)
+# Seconds of audio fingerprinted from the start of the clip
+AUDIO_SECONDS = 30
+AUDIO_SAMPLE_RATE = 4000
+AUDIO_HOP_SECONDS = 0.1
+# 15 band-energy-difference bits per hop, from 16 log-spaced bands
+AUDIO_BAND_EDGES_HZ = (100, 2000)
+AUDIO_BANDS = 16
+
+# Match thresholds: mean Hamming distance per 63-bit frame hash, share of
+# agreeing audio bits (unrelated audio sits near 0.5), duration tolerance
+MAX_FRAME_DISTANCE = 8
+MIN_AUDIO_SIMILARITY = 0.8
+DURATION_TOLERANCE = 0.02
+# Bump when the fingerprint recipe changes (forces recomputation)
+FINGERPRINT_VERSION = 1
+
+
+class DedupIndex:
+    """Persistent fingerprint index of raw clips.
+
+    A clip is a duplicate when its duration, sampled-frame pHashes and
+    (if both have sound) audio fingerprint all match a clip that was seen
+    first (ties broken by path). Fingerprints are stored with the file's size/mtime, so a rescan
+    of unchanged files costs only a stat.
+    """
+
+    def __init__(self, index_path: Path = DATA_DIR / "dedup_index.json"):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        # path → {"size", "mtime_ns", "duration", "frames", "audio", "first_seen"}
+        self._entries: dict = self._load()
+        self._dct = None
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def duplicate_of(self, path: Path, probe: dict) -> Optional[str]:
+        """Path of the earlier clip ``path`` duplicates, or None."""
+        if np is None:
+            return None
+        entry = self._fingerprint(Path(path), probe)
+        if entry is None:
+            return None
+        key = str(Path(path).resolve())
+        with self._lock:
+            others = [
+                (p, e)
+                for p, e in self._entries.items()
+                if p != key and os.path.exists(p)
+            ]
+        matches = [(e["first_seen"], p) for p, e in others if self._same_clip(entry, e)]
+        matches = [m for m in matches if m < (entry["first_seen"], key)]
+        return min(matches)[1] if matches else None
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {"fingerprints": len(self._entries)}
+
+    # ── Fingerprinting ───────────────────────────────────────────
+
+    def _fingerprint(self, path: Path, probe: dict) -> Optional[dict]:
+        """Cached fingerprint for the file's current version (computed on a miss)."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = str(path.resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and (entry["size"], entry["mtime_ns"], entry["v"]) == (
+            st.st_size,
+            st.st_mtime_ns,
+            FINGERPRINT_VERSION,
+        ):
+            return entry
+
+        duration = probe.get("duration", 0)
+        try:
+            frames = self._frame_hashes(path, duration)
+            audio = self._audio_fingerprint(path) if probe.get("audio_codec") else None
+        except Exception as e:
+            print(f"[DEDUP] Could not fingerprint {path.name}: {e}")
+            return None
+
+        entry = {
+            "v": FINGERPRINT_VERSION,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "duration": duration,
+            "frames": frames,
+            "audio": audio,
+            "first_seen": entry["first_seen"] if entry else datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._save()
+        return entry
+
+    def _frame_hashes(self, path: Path, duration: float) -> list[str]:
+        """64-bit DCT pHash (as hex) of a few frames, grabbed in one seek-only FFmpeg run."""
+        cmd = ["ffmpeg", "-v", "error"]
+        for fraction in SAMPLE_POINTS:
+            cmd += [
+                "-noaccurate_seek",
+                "-ss",
+                f"{duration * fraction:.3f}",
+                "-an",
+                "-i",
+                str(path),
+            ]
+        graph = [
+            f"[{i}:v]trim=end_frame=1,scale=32:32,format=gray,setpts=PTS-STARTPTS[f{i}]"
+            for i in range(len(SAMPLE_POINTS))
+        ]
+        graph.append(
+            "".join(f"[f{i}]" for i in range(len(SAMPLE_POINTS)))
+            + f"vstack=inputs={len(SAMPLE_POINTS)}[out]"
+        )
+        cmd += [
+            "-filter_complex",
+            ";".join(graph),
+            "-map",
+            "[out]",
+            "-frames:v",
+            "1",
+            "-f",
+            "rawvideo",
+            "pipe:1",
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        expected = 32 * 32 * len(SAMPLE_POINTS)
+        if result.returncode != 0 or len(result.stdout) < expected:
+            raise RuntimeError(
+                result.stderr.decode("utf-8", errors="replace").strip()[-300:]
+                or "no frames"
+            )
+
+        pixels = np.frombuffer(result.stdout[:expected], dtype=np.uint8).reshape(
+            len(SAMPLE_POINTS), 32, 32
+        )
+        dct = self._dct_matrix()
+        hashes = []
+        for frame in pixels.astype(np.float64):
+            low = (dct @ frame @ dct.T)[:8, :8].flatten()[1:]  # skip the DC term
+            bits = low > np.median(low)
+            hashes.append(f"{int(''.join('1' if b else '0' for b in bits), 2):016x}")
+        return hashes
+
+    def _audio_fingerprint(self, path: Path) -> Optional[dict]:
+        """Sign bits of band-energy differences across time and frequency."""
+        samples = decode_audio(path, AUDIO_SAMPLE_RATE, duration=AUDIO_SECONDS)
+        hop = int(AUDIO_SAMPLE_RATE * AUDIO_HOP_SECONDS)
+        if len(samples) < hop * 4:
+            return None
+        frames = frame_signal(samples, hop * 2, hop) * np.hanning(hop * 2)
+        spectrum = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        freqs = np.fft.rfftfreq(hop * 2, 1 / AUDIO_SAMPLE_RATE)
+        edges = np.geomspace(*AUDIO_BAND_EDGES_HZ, AUDIO_BANDS + 1)
+        bands = np.stack(
+            [
+                spectrum[:, (freqs >= lo) & (freqs < hi)].sum(axis=1)
+                for lo, hi in zip(edges[:-1], edges[1:])
+            ],
+            axis=1,
+        )
+        across = np.diff(bands, axis=1)
+        bits = np.diff(across, axis=0) > 0
+        return {"hops": int(bits.shape[0]), "bits": np.packbits(bits).tobytes().hex()}
+
+    def _dct_matrix(self):
+        if self._dct is None:
+            k = np.arange(32)[:, None]
+            n = np.arange(32)[None, :]
+            self._dct = np.cos(np.pi * (2 * n + 1) * k / 64)
+        return self._dct
+
+    # ── Matching ─────────────────────────────────────────────────
+
+    def _same_clip(self, a: dict, b: dict) -> bool:
+        longest = max(a["duration"], b["duration"], 1e-6)
+        if abs(a["duration"] - b["duration"]) > max(1.0, longest * DURATION_TOLERANCE):
+            return False
+        distances = [
+            bin(int(x, 16) ^ int(y, 16)).count("1")
+            for x, y in zip(a["frames"], b["frames"])
+        ]
+        if not distances or sum(distances) / len(distances) > MAX_FRAME_DISTANCE:
+            return False
+        if a["audio"] and b["audio"]:
+            return (
+                self._audio_similarity(a["audio"], b["audio"]) >= MIN_AUDIO_SIMILARITY
+            )
+        # A copy exported without sound is still the same footage
+        return True
+
+    def _audio_similarity(self, a: dict, b: dict, max_shift: int = 5) -> float:
+        """Best share of agreeing bits, allowing a small time offset between the copies."""
+        width = AUDIO_BANDS - 1
+        bits_a = np.unpackbits(np.frombuffer(bytes.fromhex(a["bits"]), dtype=np.uint8))[
+            : a["hops"] * width
+        ]
+        bits_b = np.unpackbits(np.frombuffer(bytes.fromhex(b["bits"]), dtype=np.uint8))[
+            : b["hops"] * width
+        ]
+        bits_a = bits_a.reshape(a["hops"], width)
+        bits_b = bits_b.reshape(b["hops"], width)
+        best = 0.0
+        for shift in range(-max_shift, max_shift + 1):
+            x = bits_a[max(0, shift) :]
+            y = bits_b[max(0, -shift) :]
+            n = min(len(x), len(y))
+            if n >= 10:
+                best = max(best, float(np.mean(x[:n] == y[:n])))
+        return best
+
+    # ── Persistence ──────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        try:
+            if self.index_path.exists():
+                return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+        return {}
+
+    def _save(self):
+        """Write the index atomically, dropping files that no longer exist (lock held)."""
+        self._entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+        try:
+            tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps(self._entries, separators=(",", ":")), encoding="utf-8"
+            )
+            tmp.replace(self.index_path)
+        except Exception:
+            pass
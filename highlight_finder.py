@@ -0,0 +1,91 @@
+"""
+DIDGERI-BOOM Highlight Finder
+Scores a long session's audio and picks the strongest clip-length windows.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from audio_analysis import decode_audio, np, onset_envelope, rms_envelope
+from config import HIGHLIGHT_WINDOW_SECONDS
+
+# Plenty for loudness/onset envelopes, and 20 minutes decodes to ~19 MB
+ANALYSIS_SAMPLE_RATE = 8000
+# Envelope resolution — highlights start on multiples of this
+HOP_SECONDS = 0.5
+# How much a window's score comes from loudness vs. rhythmic activity
+RMS_WEIGHT = 0.6
+ONSET_WEIGHT = 0.4
+
+
+class HighlightFinder:
+    """Finds the most energetic windows of a recording from its audio alone.
+
+    ``analyze`` does the one expensive step (a downsampled mono decode)
+    and returns a compact per-hop score curve that can be cached; ``pick``
+    turns that curve into the top-N non-overlapping windows of any length.
+    """
+
+    def __init__(self, window_seconds: float = HIGHLIGHT_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+
+    def analyze(self, path: Path) -> dict:
+        """Per-hop score (0–1-ish) combining loudness and onset strength."""
+        samples = decode_audio(path, ANALYSIS_SAMPLE_RATE)
+        rms = rms_envelope(samples, ANALYSIS_SAMPLE_RATE, HOP_SECONDS)
+        onset = onset_envelope(samples, ANALYSIS_SAMPLE_RATE, HOP_SECONDS)
+        n = min(len(rms), len(onset))
+        loudness_db = 20 * np.log10(rms[:n] + 1e-6)
+        scores = RMS_WEIGHT * self._normalize(
+            loudness_db
+        ) + ONSET_WEIGHT * self._normalize(onset[:n])
+        return {"hop": HOP_SECONDS, "scores": [round(float(s), 4) for s in scores]}
+
+    def pick(
+        self,
+        analysis: dict,
+        count: int = 1,
+        window: Optional[float] = None,
+        duration: Optional[float] = None,
+    ) -> list[dict]:
+        """Best ``count`` non-overlapping windows, highest score first."""
+        hop = analysis["hop"]
+        scores = np.asarray(analysis["scores"], dtype=np.float64)
+        window = window or self.window_seconds
+        duration = duration or len(scores) * hop
+        width = int(round(window / hop))
+        if not len(scores) or width >= len(scores):
+            # Already short enough — the whole clip is the highlight
+            score = float(scores.mean()) if len(scores) else 0.0
+            return [
+                {
+                    "rank": 0,
+                    "start": 0.0,
+                    "end": round(duration, 2),
+                    "score": round(score, 4),
+                }
+            ]
+
+        means = np.convolve(scores, np.ones(width) / width, mode="valid")
+        picked: list[int] = []
+        for i in np.argsort(means)[::-1]:
+            if all(abs(int(i) - j) >= width for j in picked):
+                picked.append(int(i))
+                if len(picked) == count:
+                    break
+        return [
+            {
+                "rank": rank,
+                "start": round(i * hop, 2),
+                "end": round(min(duration, i * hop + window), 2),
+                "score": round(float(means[i]), 4),
+            }
+            for rank, i in enumerate(picked)
+        ]
+
+    def _normalize(self, values):
+        """Scale to roughly 0–1 using the 5th/95th percentiles (robust to spikes and silence)."""
+        lo, hi = np.percentile(values, [5, 95])
+        if hi - lo < 1e-9:
+            return np.zeros_like(values, dtype=np.float64)
+        return np.clip((values - lo) / (hi - lo), 0, 1)
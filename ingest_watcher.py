@@ -0,0 +1,214 @@
+"""
+DIDGERI-BOOM Ingest Watcher
+Watches RAW_VIDEO_DIR for new clips and keeps an in-memory index of pending files.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import INGEST_SETTLE_SECONDS, RAW_VIDEO_DIR, SUPPORTED_INPUT_FORMATS
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    print("[INGEST] watchdog not installed. Watch-folder ingestion disabled.")
+    FileSystemEventHandler = object
+    Observer = None
+
+
+class RawVideoWatcher(FileSystemEventHandler):
+    """Event-driven index of RAW_VIDEO_DIR.
+
+    A file is admitted once its size and mtime have stopped changing for
+    ``settle_seconds`` (so half-copied uploads are never touched). New
+    arrivals are handed to ``on_ready``; files already present at startup
+    are indexed only.
+    """
+
+    def __init__(
+        self,
+        video_editor,
+        on_ready: Optional[Callable[[Path], None]] = None,
+        watch_dir: Path = RAW_VIDEO_DIR,
+        settle_seconds: float = INGEST_SETTLE_SECONDS,
+    ):
+        self.video_editor = video_editor
+        self.on_ready = on_ready
+        self.watch_dir = watch_dir
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = {}
+        # path → [size, mtime_ns, last change (monotonic), notify when admitted]
+        self._settling: dict[str, list] = {}
+        self._stop = threading.Event()
+        self._observer = None
+        self._settle_thread = None
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self) -> bool:
+        """Begin watching; False if watchdog is missing.
+
+        Clips already in the folder are probed and fingerprinted on the
+        settle thread, so this returns at once; listings scan the folder
+        as before until that initial index is complete.
+        """
+        if Observer is None:
+            return False
+        self._observer = Observer()
+        self._observer.schedule(self, str(self.watch_dir), recursive=False)
+        self._observer.start()
+        self._settle_thread = threading.Thread(
+            target=self._settle_loop, name="ingest-settle", daemon=True
+        )
+        self._settle_thread.start()
+        print(f"[INGEST] Watching {self.watch_dir}")
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        if self.video_editor.pending_index is self:
+            self.video_editor.pending_index = None
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def snapshot(self) -> list[dict]:
+        """Current pending clips, straight from memory."""
+        with self._lock:
+            return list(self._index.values())
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._index), "settling": len(self._settling)}
+
+    # ── watchdog callbacks ───────────────────────────────────────
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._mark_changed(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._mark_changed(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._forget(Path(event.src_path))
+            self._mark_changed(Path(event.dest_path))
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._forget(Path(event.src_path))
+
+    # ── Internals ────────────────────────────────────────────────
+
+    def _is_candidate(self, path: Path) -> bool:
+        return (
+            path.suffix.lower() in SUPPORTED_INPUT_FORMATS
+            and not path.name.startswith(".")
+        )
+
+    def _mark_changed(self, path: Path, notify: bool = True):
+        if not self._is_candidate(path):
+            return
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        key = str(path)
+        with self._lock:
+            entry = self._settling.get(key)
+            if entry is None:
+                # Only clips we haven't seen before trigger on_ready
+                notify = notify and key not in self._index
+                self._settling[key] = [
+                    st.st_size,
+                    st.st_mtime_ns,
+                    time.monotonic(),
+                    notify,
+                ]
+            elif (entry[0], entry[1]) != (st.st_size, st.st_mtime_ns):
+                entry[0], entry[1], entry[2] = (
+                    st.st_size,
+                    st.st_mtime_ns,
+                    time.monotonic(),
+                )
+
+    def _forget(self, path: Path):
+        with self._lock:
+            self._index.pop(str(path), None)
+            self._settling.pop(str(path), None)
+
+    def _index_existing(self) -> bool:
+        """Index the clips present at startup; False if stopped part-way."""
+        with self.video_editor.probe_cache.batch():
+            for path in self.watch_dir.iterdir():
+                if self._stop.is_set():
+                    return False
+                if not self._is_candidate(path):
+                    continue
+                # Clips untouched for a while are complete — index them now
+                try:
+                    settled = time.time() - path.stat().st_mtime > self.settle_seconds
+                except OSError:
+                    continue
+                if settled:
+                    self._admit(path, notify=False)
+                else:
+                    self._mark_changed(path, notify=False)
+        print(f"[INGEST] Indexed {len(self._index)} pending clip(s)")
+        return True
+
+    def _settle_loop(self):
+        """Admit files whose size/mtime haven't changed for settle_seconds."""
+        if not self._index_existing() or self._stop.is_set():
+            return
+        self.video_editor.pending_index = self
+        while not self._stop.wait(1.0):
+            now = time.monotonic()
+            with self._lock:
+                keys = list(self._settling)
+            for key in keys:
+                path = Path(key)
+                try:
+                    st = path.stat()
+                except OSError:
+                    self._forget(path)
+                    continue
+                # Re-check here too: modify events aren't guaranteed on every write
+                self._mark_changed(path)
+                with self._lock:
+                    entry = self._settling.get(key)
+                    if not entry or now - entry[2] < self.settle_seconds:
+                        continue
+                    if (entry[0], entry[1]) != (st.st_size, st.st_mtime_ns):
+                        continue
+                    del self._settling[key]
+                    notify = entry[3]
+                self._admit(path, notify)
+
+    def _admit(self, path: Path, notify: bool):
+        try:
+            entry = self.video_editor.describe_pending(path)
+        except Exception as e:
+            print(f"[INGEST] Could not index {path.name}: {e}")
+            return
+        with self._lock:
+            self._index[str(path)] = entry
+        if entry.get("duplicate_of"):
+            print(
+                f"[INGEST] {path.name} duplicates {Path(entry['duplicate_of']).name} — not queued"
+            )
+            return
+        if notify and self.on_ready:
+            print(f"[INGEST] New clip ready: {path.name}")
+            try:
+                self.on_ready(path)
+            except Exception as e:
+                print(f"[INGEST] Could not queue {path.name}: {e}")
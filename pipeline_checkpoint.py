@@ -0,0 +1,134 @@
+"""
+DIDGERI-BOOM Pipeline Checkpoints
+Per-stage manifest in each work dir so an interrupted render resumes where it stopped.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from config import PROCESSED_VIDEO_DIR
+
+MANIFEST_NAME = "checkpoint.json"
+
+
+class StageCheckpoints:
+    """Records what each pipeline stage produced, from what, and with which settings.
+
+    A stage is skipped on a later run only if its recorded inputs (path,
+    size, mtime) and settings are unchanged and every output it wrote is
+    still on disk at the recorded size. Stages interrupted mid-write never
+    reach the manifest, so they simply run again.
+    """
+
+    def __init__(self, work_dir: Path):
+        self.path = Path(work_dir) / MANIFEST_NAME
+        self.resumed: list[str] = []
+        self._data = read_manifest(self.path) or {"stages": {}}
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def begin(self, input_path: Path, options: dict):
+        """Note which clip/options this work dir belongs to (for recovery)."""
+        self._data["job"] = {"input": str(input_path), "options": options}
+        self._data.pop("failed", None)
+        self._save()
+
+    def run(
+        self,
+        stage: str,
+        inputs: list[Path],
+        settings: Any,
+        outputs: list[Path],
+        build: Callable[[], Any],
+    ) -> Any:
+        """Run ``build()`` unless a valid checkpoint exists; returns its (JSON) result."""
+        fingerprint = self._fingerprint(inputs)
+        settings_hash = self._hash(settings)
+        entry = self._data["stages"].get(stage)
+        if (
+            entry
+            and entry["inputs"] == fingerprint
+            and entry["settings"] == settings_hash
+            and self._outputs_intact(entry["outputs"])
+        ):
+            self.resumed.append(stage)
+            print(f"[CHECKPOINT] Resuming past {stage}")
+            return entry.get("result")
+
+        result = build()
+        self._data["stages"][stage] = {
+            "inputs": fingerprint,
+            "settings": settings_hash,
+            # Absolute, so a resume from another working directory still finds them
+            "outputs": [
+                [str(Path(p).resolve()), Path(p).stat().st_size] for p in outputs
+            ],
+            "result": result,
+            "at": datetime.now().isoformat(),
+        }
+        self._save()
+        return result
+
+    def complete(self):
+        self._data["completed"] = True
+        self._save()
+
+    def fail(self, error: str):
+        self._data["failed"] = error
+        self._save()
+
+    # ── Helpers ──────────────────────────────────────────────────
+
+    def _fingerprint(self, inputs: list[Path]) -> str:
+        sigs = []
+        for p in inputs:
+            st = Path(p).stat()
+            sigs.append([str(Path(p).resolve()), st.st_size, st.st_mtime_ns])
+        return self._hash(sigs)
+
+    def _hash(self, value: Any) -> str:
+        payload = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _outputs_intact(self, outputs: list) -> bool:
+        for path, size in outputs:
+            try:
+                if os.path.getsize(path) != size:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _save(self):
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps(self._data, indent=2, default=str), encoding="utf-8"
+            )
+            tmp.replace(self.path)
+        except Exception:
+            pass
+
+
+def read_manifest(path: Path) -> Optional[dict]:
+    try:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        pass
+    return None
+
+
+def find_interrupted(root: Path = PROCESSED_VIDEO_DIR) -> Iterator[tuple[Path, dict]]:
+    """Work dirs whose render started but neither finished nor failed."""
+    for manifest_path in sorted(root.glob(f"*/{MANIFEST_NAME}")):
+        data = read_manifest(manifest_path)
+        if not data or data.get("completed") or data.get("failed") or "job" not in data:
+            continue
+        if not Path(data["job"]["input"]).exists():
+            continue
+        yield manifest_path.parent, data["job"]
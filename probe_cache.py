@@ -0,0 +1,106 @@
+"""
+DIDGERI-BOOM Probe Cache
+ffprobe metadata cached in memory and on disk, keyed by path, size and mtime.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR
+
+
+class ProbeCache:
+    """Remembers probe results until the underlying file changes."""
+
+    def __init__(
+        self, version: int = 1, index_path: Path = DATA_DIR / "probe_cache.json"
+    ):
+        self.version = version
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+        # path → [size, mtime_ns, probe]
+        self._entries = self._read_index()
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def get(self, path: Path) -> Optional[dict]:
+        """Cached probe for ``path``, or None if missing or stale."""
+        sig = self._signature(path)
+        if sig is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(sig[0])
+        if entry and entry[0] == sig[1] and entry[1] == sig[2]:
+            return entry[2]
+        return None
+
+    def put(self, path: Path, probe: dict):
+        """Store a probe result for the file's current size/mtime."""
+        sig = self._signature(path)
+        if sig is None or not probe:
+            return
+        with self._lock:
+            self._entries[sig[0]] = [sig[1], sig[2], probe]
+            self._dirty = True
+            if not self._batch_depth:
+                self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Defer index writes until the end of a bulk listing."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def flush(self):
+        """Write pending entries, merging with what other processes saved."""
+        with self._lock:
+            if not self._dirty:
+                return
+            on_disk = self._read_index()
+            on_disk.update(self._entries)
+            self._entries = {p: e for p, e in on_disk.items() if os.path.exists(p)}
+            try:
+                tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(
+                    json.dumps(
+                        {"v": self.version, "entries": self._entries},
+                        separators=(",", ":"),
+                    ),
+                    encoding="utf-8",
+                )
+                tmp.replace(self.index_path)
+                self._dirty = False
+            except Exception:
+                pass
+
+    # ── Helpers ──────────────────────────────────────────────────
+
+    def _signature(self, path: Path) -> Optional[tuple[str, int, int]]:
+        try:
+            st = Path(path).stat()
+        except OSError:
+            return None
+        return str(Path(path).resolve()), st.st_size, st.st_mtime_ns
+
+    def _read_index(self) -> dict:
+        try:
+            if self.index_path.exists():
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if data.get("v") == self.version:
+                    return data.get("entries", {})
+        except Exception:
+            pass
+        return {}
@@ -0,0 +1,169 @@
+"""
+DIDGERI-BOOM Render Cache
+Content-addressed cache of finished renders so duplicate submissions are free.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR, RENDER_CACHE_MAX_MB
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class RenderCache:
+    """Maps input content + pipeline options + encoder settings to a finished render.
+
+    Entries are evicted least-recently-used once the outputs they point at
+    exceed ``max_mb``. Eviction only forgets the entry — the _READY.mp4
+    itself belongs to the upload queue.
+    """
+
+    def __init__(
+        self,
+        max_mb: int = RENDER_CACHE_MAX_MB,
+        index_path: Path = DATA_DIR / "render_cache.json",
+    ):
+        self.max_bytes = max_mb * 1024 * 1024
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        index = self._read_index()
+        # key → {"output", "size", "last_used", "result"}
+        self._entries: dict = index["entries"]
+        # path → [size, mtime_ns, sha256] so unchanged files are hashed once
+        self._hashes: dict = index["hashes"]
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def make_key(self, input_path: Path, options: dict, settings: dict) -> str:
+        """Cache key for rendering ``input_path`` with the given options/settings."""
+        payload = json.dumps(
+            {
+                "input": self.content_hash(input_path),
+                "options": options,
+                "settings": settings,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def content_hash(self, path: Path) -> str:
+        """SHA-256 of a file's bytes, memoized on path/size/mtime."""
+        path = Path(path)
+        st = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            memo = self._hashes.get(key)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._hashes[key] = [st.st_size, st.st_mtime_ns, digest]
+            self._save_index()
+        return digest
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Return the cached processing report if its output and variants are still intact."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            output = Path(entry["output"])
+            # Variants live in the work dir, which storage GC may have removed
+            variants = [Path(v["path"]) for v in entry["result"].get("variants") or []]
+            if (
+                not output.exists()
+                or output.stat().st_size != entry["size"]
+                or not all(v.exists() for v in variants)
+            ):
+                del self._entries[key]
+                self._save_index()
+                return None
+            entry["last_used"] = time.time()
+            self._save_index()
+            return json.loads(json.dumps(entry["result"]))
+
+    def store(self, key: str, result: dict):
+        """Remember a successful render, evicting LRU entries over budget."""
+        output = Path(result.get("output", ""))
+        if result.get("status") != "ready" or not output.exists():
+            return
+        with self._lock:
+            self._entries[key] = {
+                "output": str(output),
+                "size": output.stat().st_size,
+                "last_used": time.time(),
+                "result": result,
+            }
+            self._evict()
+            self._save_index()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_mb": round(
+                    sum(e["size"] for e in self._entries.values()) / (1024 * 1024), 2
+                ),
+                "max_mb": round(self.max_bytes / (1024 * 1024)),
+            }
+
+    # ── Internals ────────────────────────────────────────────────
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._entries.values())
+        for key, entry in sorted(
+            self._entries.items(), key=lambda kv: kv[1]["last_used"]
+        ):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._entries[key]
+
+    def _read_index(self) -> dict:
+        try:
+            if self.index_path.exists():
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                return {
+                    "entries": data.get("entries", {}),
+                    "hashes": data.get("hashes", {}),
+                }
+        except Exception:
+            pass
+        return {"entries": {}, "hashes": {}}
+
+    def _save_index(self):
+        """Merge with entries saved by other processes, then write atomically."""
+        on_disk = self._read_index()
+        for key, entry in on_disk["entries"].items():
+            mine = self._entries.get(key)
+            if mine is None or entry["last_used"] > mine["last_used"]:
+                self._entries[key] = entry
+        for path, memo in on_disk["hashes"].items():
+            self._hashes.setdefault(path, memo)
+        self._hashes = {p: m for p, m in self._hashes.items() if os.path.exists(p)}
+        self._evict()
+        try:
+            tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps(
+                    {"entries": self._entries, "hashes": self._hashes},
+                    separators=(",", ":"),
+                    default=str,
+                ),
+                encoding="utf-8",
+            )
+            tmp.replace(self.index_path)
+        except Exception:
+            pass
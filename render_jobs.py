@@ -0,0 +1,246 @@
+"""
+DIDGERI-BOOM Render Jobs
+Persistent render job queue drained by a fixed set of background workers.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR, PROCESSED_VIDEO_DIR, RENDER_JOB_WORKERS
+from pipeline_checkpoint import find_interrupted
+
+# Finished jobs kept in the job file (queued/running ones are never pruned)
+MAX_FINISHED_JOBS = 200
+# How often a job held back by low disk space re-checks
+LOW_DISK_RETRY_SECONDS = 60
+
+
+class RenderJobQueue:
+    """Queues process_video calls and runs them off the request path."""
+
+    def __init__(
+        self,
+        video_editor,
+        workers: int = RENDER_JOB_WORKERS,
+        storage=None,
+        jobs_file: Path = DATA_DIR / "render_jobs.json",
+        processed_dir: Path = PROCESSED_VIDEO_DIR,
+    ):
+        self.video_editor = video_editor
+        self.storage = storage
+        self.workers = max(1, workers)
+        self.jobs_file = jobs_file
+        # Searched at start() for renders that were interrupted outside the queue
+        self.processed_dir = processed_dir
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._jobs = self._load_jobs()
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self):
+        """Start the workers, re-queuing work left over from a previous run."""
+        with self._lock:
+            leftover = sorted(
+                (
+                    j
+                    for j in self._jobs.values()
+                    if j["status"] in ("queued", "running")
+                ),
+                key=lambda j: j["created_at"],
+            )
+            for job in leftover:
+                # A "running" job was interrupted by a restart — resume it from its checkpoints
+                job["status"] = "queued"
+                self._queue.put(job["id"])
+            self._save_jobs()
+            known = {j.get("work_dir") for j in self._jobs.values()}
+
+        if leftover:
+            print(f"[JOBS] Re-queued {len(leftover)} job(s) from previous run")
+        # Renders started outside the queue (batch runs, direct calls) that never finished
+        orphans = [
+            (d, job)
+            for d, job in find_interrupted(self.processed_dir)
+            if str(d) not in known
+        ]
+        for work_dir, job in orphans:
+            self.submit(job["input"], {**job["options"], "resume_dir": str(work_dir)})
+        if orphans:
+            print(f"[JOBS] Resuming {len(orphans)} interrupted render(s)")
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._worker, name=f"render-worker-{i}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        """Ask workers to exit once their current job is done."""
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def submit(self, video_path: str, options: Optional[dict] = None) -> dict:
+        """Queue a clip for rendering and return the new job."""
+        job = {
+            "id": f"job_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            "video_path": str(video_path),
+            "options": options or {},
+            "status": "queued",  # queued | running | done | failed
+            "steps": [],
+            "progress": {},
+            "created_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._save_jobs()
+        self._queue.put(job["id"])
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job, default=str)) if job else None
+
+    def list_jobs(self, limit: int = 50) -> list[dict]:
+        """Most recent jobs first, without the full result payload."""
+        with self._lock:
+            jobs = sorted(
+                self._jobs.values(), key=lambda j: j["created_at"], reverse=True
+            )
+            return [
+                {k: v for k, v in job.items() if k != "result"} for job in jobs[:limit]
+            ]
+
+    def get_status(self) -> dict:
+        with self._lock:
+            counts: dict = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": self.workers, "jobs": counts}
+
+    # ── Workers ──────────────────────────────────────────────────
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._wait_for_space(job_id)
+                self._run_job(job_id)
+            except Exception as e:
+                self._update(
+                    job_id,
+                    status="failed",
+                    error=str(e),
+                    finished_at=datetime.now().isoformat(),
+                )
+
+    def _wait_for_space(self, job_id: str):
+        """Hold a job while free disk space would drop below the floor."""
+        if not self.storage:
+            return
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            video_path, render_mode = job["video_path"], job["options"].get(
+                "render_mode"
+            )
+        if self.storage.has_room(video_path, render_mode):
+            return
+        self.storage.collect()
+        if self.storage.has_room(video_path, render_mode):
+            return
+        print(f"[JOBS] Low disk space — holding {job_id}")
+        self._update(job_id, blocked="low_disk_space")
+        while not self.storage.has_room(video_path, render_mode):
+            time.sleep(LOW_DISK_RETRY_SECONDS)
+        self._update(job_id, blocked=None)
+
+    def _run_job(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != "queued":
+                return
+            job.update(
+                status="running",
+                steps=[],
+                progress={},
+                started_at=datetime.now().isoformat(),
+            )
+            self._save_jobs()
+            video_path, options = job["video_path"], dict(job["options"])
+            if job.get("work_dir"):
+                options["resume_dir"] = job["work_dir"]
+
+        def on_progress(stage: str, info: dict):
+            with self._lock:
+                if info.get("work_dir") and job.get("work_dir") != info["work_dir"]:
+                    job["work_dir"] = info["work_dir"]
+                    self._save_jobs()
+                job["progress"][stage] = info
+                if info.get("state") == "done":
+                    job["steps"].append(stage)
+                    self._save_jobs()
+
+        result = self.video_editor.process_video(
+            Path(video_path), progress=on_progress, **options
+        )
+        ok = result.get("status") == "ready"
+        if ok and self.storage and result.get("work_dir"):
+            self.storage.release(Path(result["work_dir"]))
+        self._update(
+            job_id,
+            status="done" if ok else "failed",
+            steps=result.get("steps", []),
+            result=result,
+            error=None if ok else result.get("error"),
+            finished_at=datetime.now().isoformat(),
+        )
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+                self._save_jobs()
+
+    # ── Persistence ──────────────────────────────────────────────
+
+    def _load_jobs(self) -> dict:
+        try:
+            if self.jobs_file.exists():
+                jobs = json.loads(self.jobs_file.read_text(encoding="utf-8"))
+                return {job["id"]: job for job in jobs}
+        except Exception:
+            pass
+        return {}
+
+    def _save_jobs(self):
+        """Write the job file atomically (caller holds the lock)."""
+        finished = sorted(
+            (j for j in self._jobs.values() if j["status"] in ("done", "failed")),
+            key=lambda j: j["created_at"],
+        )
+        for job in finished[:-MAX_FINISHED_JOBS]:
+            del self._jobs[job["id"]]
+        try:
+            tmp = self.jobs_file.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps(list(self._jobs.values()), indent=2, default=str),
+                encoding="utf-8",
+            )
+            tmp.replace(self.jobs_file)
+        except Exception:
+            pass
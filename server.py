@@ -4,67 +4,151 @@ FastAPI application serving the dashboard and all platform endpoints.
 """
 
 import asyncio
-from pathlib import Path
-from datetime import datetime
+import json
+import os
+import threading
 from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Request, UploadFile, File
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 import uvicorn
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
+from fastapi.staticfiles import StaticFiles
 
 from config import (
-    SERVER_HOST, SERVER_PORT, RAW_VIDEO_DIR,
-    UPLOAD_QUEUE_DIR, DATA_DIR,
+    DATA_DIR,
+    INGEST_AUTO_PROCESS,
+    RAW_VIDEO_DIR,
+    SERVER_HOST,
+    SERVER_PORT,
+    UPLOAD_QUEUE_DIR,
 )
 
-# ── Fault-tolerant engine imports ───────────────────────────────
+# ── Fault-tolerant engines ──────────────────────────────────────
 # Each engine is optional — if a dependency is missing on this
 # environment the server still boots and serves the dashboard.
+# They are built by the app lifespan, not at import: render workers
+# are spawned processes that re-import this module as __main__.
+
+trend_monitor = video_editor = storage_manager = render_jobs = None
+ingest_watcher = batch_renderer = thumbnails = scheduler = None
+hashtag_gen = analytics = monetization = uploader = None
+
+
+def _init_engines():
+    global trend_monitor, video_editor, storage_manager, render_jobs, ingest_watcher, batch_renderer
+    global thumbnails, scheduler, hashtag_gen, analytics, monetization, uploader
+
+    try:
+        from trend_monitor import TrendMonitor
+
+        trend_monitor = TrendMonitor()
+    except Exception as e:
+        print(f"[WARN] TrendMonitor unavailable: {e}")
+        trend_monitor = None
+
+    try:
+        from video_editor import VideoEditor
+
+        video_editor = VideoEditor()
+    except Exception as e:
+        print(f"[WARN] VideoEditor unavailable: {e}")
+        video_editor = None
+
+    try:
+        from storage_manager import StorageManager
+
+        storage_manager = StorageManager()
+    except Exception as e:
+        print(f"[WARN] StorageManager unavailable: {e}")
+        storage_manager = None
+
+    try:
+        from render_jobs import RenderJobQueue
+
+        render_jobs = (
+            RenderJobQueue(video_editor, storage=storage_manager)
+            if video_editor
+            else None
+        )
+    except Exception as e:
+        print(f"[WARN] RenderJobQueue unavailable: {e}")
+        render_jobs = None
+
+    try:
+        from ingest_watcher import RawVideoWatcher
+
+        ingest_watcher = (
+            RawVideoWatcher(
+                video_editor,
+                on_ready=(
+                    (lambda path: render_jobs.submit(str(path)))
+                    if render_jobs and INGEST_AUTO_PROCESS
+                    else None
+                ),
+            )
+            if video_editor
+            else None
+        )
+    except Exception as e:
+        print(f"[WARN] RawVideoWatcher unavailable: {e}")
+        ingest_watcher = None
+
+    try:
+        from batch_renderer import BatchRenderer
+
+        batch_renderer = BatchRenderer(storage=storage_manager)
+    except Exception as e:
+        print(f"[WARN] BatchRenderer unavailable: {e}")
+        batch_renderer = None
+
+    try:
+        from thumbnail_service import ThumbnailService
 
-try:
-    from trend_monitor import TrendMonitor
-    trend_monitor = TrendMonitor()
-except Exception as e:
-    print(f"[WARN] TrendMonitor unavailable: {e}")
-    trend_monitor = None
-
-try:
-    from video_editor import VideoEditor
-    video_editor = VideoEditor()
-except Exception as e:
-    print(f"[WARN] VideoEditor unavailable: {e}")
-    video_editor = None
-
-try:
-    from scheduler import PostScheduler
-    scheduler = PostScheduler()
-except Exception as e:
-    print(f"[WARN] PostScheduler unavailable: {e}")
-    scheduler = None
-
-try:
-    from hashtag_generator import HashtagGenerator
-    hashtag_gen = HashtagGenerator()
-except Exception as e:
-    print(f"[WARN] HashtagGenerator unavailable: {e}")
-    hashtag_gen = None
-
-try:
-    from analytics import Analytics, MonetizationTracker
-    analytics = Analytics()
-    monetization = MonetizationTracker(analytics)
-except Exception as e:
-    print(f"[WARN] Analytics unavailable: {e}")
-    analytics = None
-    monetization = None
-
-try:
-    from tiktok_uploader import TikTokUploader
-    uploader = TikTokUploader()
-except Exception as e:
-    print(f"[WARN] TikTokUploader unavailable: {e}")
-    uploader = None
+        thumbnails = ThumbnailService()
+    except Exception as e:
+        print(f"[WARN] ThumbnailService unavailable: {e}")
+        thumbnails = None
+
+    try:
+        from scheduler import PostScheduler
+
+        scheduler = PostScheduler()
+    except Exception as e:
+        print(f"[WARN] PostScheduler unavailable: {e}")
+        scheduler = None
+
+    try:
+        from hashtag_generator import HashtagGenerator
+
+        hashtag_gen = HashtagGenerator()
+    except Exception as e:
+        print(f"[WARN] HashtagGenerator unavailable: {e}")
+        hashtag_gen = None
+
+    try:
+        from analytics import Analytics, MonetizationTracker
+
+        analytics = Analytics()
+        monetization = MonetizationTracker(analytics)
+    except Exception as e:
+        print(f"[WARN] Analytics unavailable: {e}")
+        analytics = None
+        monetization = None
+
+    try:
+        from tiktok_uploader import TikTokUploader
+
+        uploader = TikTokUploader()
+    except Exception as e:
+        print(f"[WARN] TikTokUploader unavailable: {e}")
+        uploader = None
 
 
 @asynccontextmanager
@@ -74,11 +158,35 @@ async def lifespan(app: FastAPI):
     print("  🎵💥 DIDGERI-BOOM — TikTok AI Platform")
     print("  🌐 Dashboard: http://{}:{}".format(SERVER_HOST, SERVER_PORT))
     print("=" * 60 + "\n")
+    _init_engines()
+    # Thumbnail names are hashes of path/size/mtime, so browsers can cache them forever
+    if thumbnails:
+        app.mount(
+            "/thumbnails",
+            ImmutableStaticFiles(directory=str(thumbnails.cache_dir)),
+            name="thumbnails",
+        )
     if trend_monitor:
         trend_monitor.load_cached_trends()
+    if video_editor:
+        # Load Whisper off the event loop; the first caption request waits for it if needed
+        threading.Thread(
+            target=video_editor.caption_engine.pool.preload, daemon=True
+        ).start()
+    if storage_manager:
+        storage_manager.start()
+    if render_jobs:
+        render_jobs.start()
+    if ingest_watcher:
+        ingest_watcher.start()
     yield
     print("\n[SERVER] DIDGERI-BOOM shutting down...")
-
+    if ingest_watcher:
+        ingest_watcher.stop()
+    if render_jobs:
+        render_jobs.stop()
+    if storage_manager:
+        storage_manager.stop()
 
 
 app = FastAPI(
@@ -94,8 +202,18 @@ dashboard_dir = Path(__file__).parent / "dashboard"
 app.mount("/assets", StaticFiles(directory=str(dashboard_dir)), name="assets")
 
 
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose URLs change whenever their content does."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
 # ── Dashboard Route ─────────────────────────────────────────────
 
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_dashboard():
     """Serve the management dashboard."""
@@ -107,11 +225,14 @@ async def serve_dashboard():
 
 # ── Trend Endpoints ─────────────────────────────────────────────
 
+
 @app.get("/api/trends")
 async def get_trends():
     """Get current trending data with niche scoring."""
     if not trend_monitor:
-        return JSONResponse(content={"sounds": [], "hashtags": [], "recommendations": []})
+        return JSONResponse(
+            content={"sounds": [], "hashtags": [], "recommendations": []}
+        )
     trends = await trend_monitor.get_all_trends()
     return JSONResponse(content=trends)
 
@@ -127,12 +248,13 @@ async def get_content_ideas():
 
 # ── Video Pipeline Endpoints ────────────────────────────────────
 
+
 @app.get("/api/videos/pending")
 async def get_pending_videos():
     if not video_editor:
         return JSONResponse(content=[])
     videos = video_editor.get_pending_videos()
-    return JSONResponse(content=videos)
+    return JSONResponse(content=_with_thumbnails(videos))
 
 
 @app.get("/api/videos/ready")
@@ -140,13 +262,66 @@ async def get_ready_videos():
     if not video_editor:
         return JSONResponse(content=[])
     videos = video_editor.get_ready_videos()
-    return JSONResponse(content=videos)
+    return JSONResponse(content=_with_thumbnails(videos))
+
+
+def _with_thumbnails(videos: list[dict]) -> list[dict]:
+    """Attach poster/sprite URLs (None while they're still being generated)."""
+    if not thumbnails:
+        return videos
+    return [
+        {**v, "thumbnail": thumbnails.urls(Path(v["path"]), v.get("duration", 0))}
+        for v in videos
+    ]
 
 
 @app.post("/api/videos/process")
 async def process_video(request: Request):
+    """Queue a render job; poll /api/jobs/{job_id} for progress."""
+    if not render_jobs:
+        raise HTTPException(503, "Video editor not available")
+    body = await request.json()
+    video_path = body.get("video_path")
+    if not video_path:
+        raise HTTPException(400, "video_path required")
+    path = Path(video_path)
+    if not path.exists():
+        raise HTTPException(404, f"Video not found: {video_path}")
+    job = render_jobs.submit(
+        str(path),
+        {
+            "add_captions": body.get("add_captions", True),
+            "add_intro": body.get("add_intro", False),
+            "add_outro": body.get("add_outro", False),
+            "color_grade": body.get("color_grade", True),
+            "render_mode": body.get("render_mode"),
+            "use_cache": body.get("use_cache", True),
+            "variants": body.get("variants"),
+            "normalize_audio": body.get("normalize_audio"),
+            "highlight": body.get("highlight"),
+        },
+    )
+    return JSONResponse(
+        status_code=202, content={"job_id": job["id"], "status": job["status"]}
+    )
+
+
+@app.get("/api/videos/highlights")
+async def get_highlights(path: str, count: int = 3):
+    """Best clip-length windows of a long session, by audio energy."""
     if not video_editor:
         raise HTTPException(503, "Video editor not available")
+    if not Path(path).exists():
+        raise HTTPException(404, f"Video not found: {path}")
+    segments = await asyncio.to_thread(video_editor.find_highlights, Path(path), count)
+    return JSONResponse(content=segments)
+
+
+@app.post("/api/videos/highlights")
+async def render_highlights(request: Request):
+    """Queue one render job per top highlight of a long session."""
+    if not render_jobs:
+        raise HTTPException(503, "Video editor not available")
     body = await request.json()
     video_path = body.get("video_path")
     if not video_path:
@@ -154,32 +329,110 @@ async def process_video(request: Request):
     path = Path(video_path)
     if not path.exists():
         raise HTTPException(404, f"Video not found: {video_path}")
-    result = video_editor.process_video(
-        path,
-        add_captions=body.get("add_captions", True),
-        add_intro=body.get("add_intro", False),
-        add_outro=body.get("add_outro", False),
-        color_grade=body.get("color_grade", True),
+    jobs = [
+        render_jobs.submit(
+            str(path),
+            {
+                "add_captions": body.get("add_captions", True),
+                "color_grade": body.get("color_grade", True),
+                "add_intro": body.get("add_intro", False),
+                "add_outro": body.get("add_outro", False),
+                "highlight": rank,
+            },
+        )
+        for rank in range(max(1, int(body.get("count", 1))))
+    ]
+    return JSONResponse(
+        status_code=202, content={"job_ids": [job["id"] for job in jobs]}
     )
-    return JSONResponse(content=result)
 
 
 @app.post("/api/videos/process-all")
 async def process_all_videos():
-    if not video_editor:
+    """Render every pending clip in the worker pool, streaming NDJSON results."""
+    if not video_editor or not batch_renderer:
         raise HTTPException(503, "Video editor not available")
-    pending = video_editor.get_pending_videos()
-    results = []
-    for video in pending:
-        result = video_editor.process_video(
-            Path(video["path"]), add_captions=True, color_grade=True,
-        )
-        results.append(result)
-    return JSONResponse(content={"processed": len(results), "results": results})
+    if storage_manager and not storage_manager.has_room():
+        raise HTTPException(507, "Not enough free disk space to render")
+    pending = await asyncio.to_thread(video_editor.get_pending_videos)
+    # Re-exports/renamed copies of a clip already in the list render once
+    originals = [
+        v
+        for v in pending
+        if not (v.get("duplicate_of") and os.path.exists(v["duplicate_of"]))
+    ]
+    skipped = len(pending) - len(originals)
+    # Clips are transcribed in batched passes and each pass's clips start
+    # rendering (their caption stage a transcript-cache hit) while the
+    # next pass transcribes
+    results = batch_renderer.render(
+        video_editor.caption_engine.prefill([video["path"] for video in originals]),
+        prefilled=True,
+        add_captions=True,
+        color_grade=True,
+    )
+
+    async def stream():
+        processed = 0
+        try:
+            while True:
+                # Wait for the next finished clip without blocking the event loop
+                result = await asyncio.to_thread(next, results, None)
+                if result is None:
+                    break
+                processed += 1
+                yield json.dumps(result, default=str) + "\n"
+            yield json.dumps(
+                {"processed": processed, "skipped_duplicates": skipped}
+            ) + "\n"
+        finally:
+            # Client gone: drop the clips that haven't started
+            results.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# ── Render Jobs ─────────────────────────────────────────────────
+
+
+@app.get("/api/jobs")
+async def list_jobs():
+    if not render_jobs:
+        return JSONResponse(content=[])
+    return JSONResponse(content=render_jobs.list_jobs())
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job state, completed steps and per-stage progress."""
+    job = render_jobs.get_job(job_id) if render_jobs else None
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return JSONResponse(content=job)
+
+
+# ── Storage ─────────────────────────────────────────────────────
+
+
+@app.get("/api/storage")
+async def storage_status():
+    """Disk usage of processed work dirs and space reclaimed so far."""
+    if not storage_manager:
+        raise HTTPException(503, "Storage manager not available")
+    return JSONResponse(content=await asyncio.to_thread(storage_manager.get_status))
+
+
+@app.post("/api/storage/collect")
+async def storage_collect():
+    """Run a garbage-collection pass now."""
+    if not storage_manager:
+        raise HTTPException(503, "Storage manager not available")
+    return JSONResponse(content=await asyncio.to_thread(storage_manager.collect))
 
 
 # ── Scheduling Endpoints ────────────────────────────────────────
 
+
 @app.get("/api/schedule")
 async def get_schedule():
     if not scheduler:
@@ -224,6 +477,7 @@ async def cancel_scheduled_post(post_id: str):
 
 # ── Upload Endpoints ────────────────────────────────────────────
 
+
 @app.post("/api/upload")
 async def upload_video(request: Request):
     if not uploader:
@@ -233,7 +487,9 @@ async def upload_video(request: Request):
     if not video_path:
         raise HTTPException(400, "video_path required")
     result = await uploader.upload_video(
-        Path(video_path), title=body.get("caption", ""), hashtags=body.get("hashtags", []),
+        Path(video_path),
+        title=body.get("caption", ""),
+        hashtags=body.get("hashtags", []),
     )
     return JSONResponse(content=result)
 
@@ -254,10 +510,17 @@ async def get_upload_history():
 
 # ── Analytics & Monetization ────────────────────────────────────
 
+
 @app.get("/api/analytics")
 async def get_analytics():
     if not analytics:
-        return JSONResponse(content={"account": {"followers": 8420}, "totals": {"total_views": 124500, "avg_engagement_rate": 8.4}, "history": []})
+        return JSONResponse(
+            content={
+                "account": {"followers": 8420},
+                "totals": {"total_views": 124500, "avg_engagement_rate": 8.4},
+                "history": [],
+            }
+        )
     return JSONResponse(content=analytics.get_dashboard_data())
 
 
@@ -286,6 +549,7 @@ async def generate_caption(request: Request):
 # In-memory key store (persists for session lifetime on Render)
 _runtime_settings: dict = {}
 
+
 @app.post("/api/settings")
 async def save_settings(request: Request):
     """Accept API keys from the dashboard settings modal."""
@@ -294,12 +558,14 @@ async def save_settings(request: Request):
         _runtime_settings["tiktok_token"] = body["tiktok_token"]
     if body.get("gemini_api_key"):
         _runtime_settings["gemini_api_key"] = body["gemini_api_key"]
-    return JSONResponse(content={"status": "saved", "keys": list(_runtime_settings.keys())})
-
+    return JSONResponse(
+        content={"status": "saved", "keys": list(_runtime_settings.keys())}
+    )
 
 
 # ── OAuth Callback ──────────────────────────────────────────────
 
+
 @app.get("/auth/tiktok")
 async def tiktok_auth():
     if not uploader:
@@ -321,22 +587,51 @@ async def auth_callback(code: str = ""):
 
 # ── Health Check ────────────────────────────────────────────────
 
+
 @app.get("/api/health")
 async def health_check():
     """System health check."""
-    return JSONResponse(content={
-        "status": "operational",
-        "system": "DIDGERI-BOOM",
-        "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
-        "components": {
-            "trend_monitor": "online" if trend_monitor else "unavailable",
-            "video_editor": "online" if video_editor else "unavailable",
-            "scheduler": "online" if scheduler else "unavailable",
-            "uploader": ("online" if getattr(uploader, 'access_token', None) else "no_api_key") if uploader else "unavailable",
-            "analytics": "online" if analytics else "unavailable",
-        },
-    })
+    return JSONResponse(
+        content={
+            "status": "operational",
+            "system": "DIDGERI-BOOM",
+            "version": "1.0.0",
+            "timestamp": datetime.now().isoformat(),
+            "components": {
+                "trend_monitor": "online" if trend_monitor else "unavailable",
+                "video_editor": "online" if video_editor else "unavailable",
+                "scheduler": "online" if scheduler else "unavailable",
+                "uploader": (
+                    (
+                        "online"
+                        if getattr(uploader, "access_token", None)
+                        else "no_api_key"
+                    )
+                    if uploader
+                    else "unavailable"
+                ),
+                "analytics": "online" if analytics else "unavailable",
+                "ingest_watcher": (
+                    ingest_watcher.get_status() if ingest_watcher else "unavailable"
+                ),
+                "render_jobs": (
+                    render_jobs.get_status() if render_jobs else "unavailable"
+                ),
+                "batch_renderer": (
+                    batch_renderer.get_status() if batch_renderer else "unavailable"
+                ),
+                "storage": (
+                    storage_manager.get_status() if storage_manager else "unavailable"
+                ),
+                "thumbnails": thumbnails.get_status() if thumbnails else "unavailable",
+                "whisper": (
+                    video_editor.caption_engine.pool.get_status()
+                    if video_editor
+                    else "unavailable"
+                ),
+            },
+        }
+    )
 
 
 # ── Entry Point ─────────────────────────────────────────────────
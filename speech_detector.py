@@ -0,0 +1,181 @@
+"""
+DIDGERI-BOOM Speech Detector
+Cheap spectral pre-scan that tells spoken clips from pure didgeridoo before Whisper runs.
+"""
+
+from audio_analysis import frame_signal, np
+
+# 256 ms analysis frames (3.9 Hz bins at 16 kHz — fine enough to track a drone)
+FFT_SIZE = 4096
+HOP_SIZE = 2048
+# Spectra computed per batch, so long sessions stay small in memory
+BLOCK_FRAMES = 256
+
+VOICED_BAND_HZ = (300, 3400)
+FULL_BAND_HZ = (50, 8000)
+DRONE_F0_HZ = (50, 200)
+# A frame holds the drone when its low peak stands this far above the band
+# (6 dB) and sits within this fraction of the clip's median fundamental
+DRONE_PROMINENCE = 4.0
+DRONE_F0_TOLERANCE = 0.05
+# Harmonics used to pin down a frame's fundamental, and how wide (in FFT
+# bins) each drone harmonic is cut out of the spectrum
+DRONE_HARMONICS = 12
+DRONE_NOTCH_BINS = 2.0
+# Frames quieter than this (dBFS) are ignored
+SILENCE_DB = -45.0
+# Clip-level voice share is this percentile of the audible frames, so
+# speech over a quarter of the clip counts even if the rest is music
+POOL_PERCENTILE = 75
+# Voice share (with the drone removed) mapped onto the 0–1 speech score
+VOICED_RAMP = (0.05, 0.3)
+# Spectral flatness of the voice band: voiced speech is harmonic (low),
+# wind and broadband noise are flat. A frame's voice share is scaled
+# down from full weight to none across this range.
+NOISE_FLATNESS_RAMP = (0.3, 0.45)
+
+
+class SpeechDetector:
+    """Scores how likely a clip's audio contains speech, from NumPy features alone.
+
+    The evidence is the share of energy in the voice band, counted only
+    as far as that band is tonal: spectral flatness tells harmonic voiced
+    speech from wind and broadband noise, which fill the same band. A
+    didgeridoo drone is found first — one low fundamental that barely
+    moves from frame to frame — and its harmonics are notched out before
+    the share is taken, so a drone never counts against a voice over it;
+    it only stops its own overtones from passing for one. ``scan``
+    returns the decision with a 0–1 confidence.
+    """
+
+    def scan(self, samples, sample_rate: int) -> dict:
+        features = self._features(samples, sample_rate)
+        if features is None:
+            return {
+                "speech": False,
+                "confidence": 1.0,
+                "features": {"audible_frames": 0},
+            }
+
+        score = self._ramp(features["voiced_ratio"], *VOICED_RAMP)
+        return {
+            "speech": score >= 0.5,
+            "confidence": round(min(1.0, abs(score - 0.5) * 2), 3),
+            "score": round(score, 3),
+            "features": features,
+        }
+
+    # ── Features ─────────────────────────────────────────────────
+
+    def _features(self, samples, sample_rate: int):
+        if len(samples) < FFT_SIZE:
+            return None
+        freqs = np.fft.rfftfreq(FFT_SIZE, 1 / sample_rate)
+        voiced = self._band(freqs, VOICED_BAND_HZ)
+        full = self._band(freqs, FULL_BAND_HZ)
+        drone = self._band(freqs, DRONE_F0_HZ)
+        window = np.hanning(FFT_SIZE).astype(np.float32)
+
+        frames = frame_signal(samples, FFT_SIZE, HOP_SIZE)
+        level_db, voiced_ratio, drone_free_ratio, flatness, f0, prominence = (
+            [],
+            [],
+            [],
+            [],
+            [],
+            [],
+        )
+        for start in range(0, len(frames), BLOCK_FRAMES):
+            block = frames[start : start + BLOCK_FRAMES]
+            power = np.abs(np.fft.rfft(block * window, axis=1)) ** 2 + 1e-12
+            level_db.append(
+                10 * np.log10(np.mean(block.astype(np.float64) ** 2, axis=1) + 1e-12)
+            )
+            total = power[:, full].sum(axis=1)
+            voiced_ratio.append(power[:, voiced].sum(axis=1) / total)
+            band = power[:, voiced]
+            flatness.append(
+                np.exp(np.mean(np.log(band), axis=1)) / np.mean(band, axis=1)
+            )
+            low = power[:, drone]
+            peak = np.argmax(low, axis=1)
+            f0.append(freqs[drone][peak])
+            prominence.append(low[np.arange(len(low)), peak] / np.mean(low, axis=1))
+            # Same share with the harmonics of this frame's low peak cut out;
+            # only used for frames that turn out to hold the drone
+            notched = np.where(self._harmonic_bins(power, freqs, f0[-1]), 0.0, power)
+            drone_free_ratio.append(notched[:, voiced].sum(axis=1) / total)
+
+        level_db = np.concatenate(level_db)
+        audible = level_db > SILENCE_DB
+        if not audible.any():
+            return None
+        f0 = np.concatenate(f0)[audible]
+        prominence = np.concatenate(prominence)[audible]
+
+        # The drone's fundamental: where prominent low peaks cluster
+        peaked = prominence >= DRONE_PROMINENCE
+        fundamental = float(np.median(f0[peaked])) if peaked.any() else 0.0
+        tolerance = max(fundamental * DRONE_F0_TOLERANCE, 1.5 * (freqs[1] - freqs[0]))
+        steady = peaked & (np.abs(f0 - fundamental) <= tolerance)
+
+        ratio = np.where(
+            steady,
+            np.concatenate(drone_free_ratio)[audible],
+            np.concatenate(voiced_ratio)[audible],
+        )
+        flatness = np.concatenate(flatness)[audible]
+        lo, hi = NOISE_FLATNESS_RAMP
+        tonal = 1.0 - np.clip((flatness - lo) / (hi - lo), 0.0, 1.0)
+        return {
+            "audible_frames": int(audible.sum()),
+            "voiced_ratio": round(
+                float(np.percentile(ratio * tonal, POOL_PERCENTILE)), 3
+            ),
+            "flatness": round(float(np.median(flatness)), 3),
+            "drone_hz": round(fundamental, 1),
+            "drone_stability": round(float(steady.mean()), 3),
+        }
+
+    def _harmonic_bins(self, power, freqs, f0):
+        """Mask of the bins on each frame's harmonic series (frames × bins).
+
+        The FFT bin of the low peak is too coarse to follow harmonics up
+        through the voice band, so the fundamental is re-estimated from
+        the interpolated peaks of its first DRONE_HARMONICS harmonics.
+        """
+        bin_hz = freqs[1] - freqs[0]
+        log_power = np.log(power)
+        rows = np.arange(len(power))
+        estimates = []
+        for k in range(1, DRONE_HARMONICS + 1):
+            # Strongest bin near k × f0, then a parabola through it and its neighbours
+            reach = int(np.ceil(k * f0.max() * DRONE_F0_TOLERANCE / bin_hz)) + 1
+            offsets = np.arange(-reach, reach + 1)
+            near = np.clip(
+                np.round(k * f0 / bin_hz).astype(int)[:, None] + offsets,
+                1,
+                power.shape[1] - 2,
+            )
+            peak = near[rows, np.argmax(log_power[rows[:, None], near], axis=1)]
+            left, mid, right = (
+                log_power[rows, peak - 1],
+                log_power[rows, peak],
+                log_power[rows, peak + 1],
+            )
+            curve = left - 2 * mid + right
+            shift = np.where(
+                curve < 0, 0.5 * (left - right) / np.where(curve < 0, curve, -1.0), 0.0
+            )
+            estimates.append((peak + shift) * bin_hz / k)
+        fundamental = np.median(np.stack(estimates, axis=1), axis=1)[:, None]
+
+        harmonic = freqs[None, :] / fundamental
+        distance = np.abs(harmonic - np.round(harmonic)) * fundamental
+        return (distance <= DRONE_NOTCH_BINS * bin_hz) & (harmonic >= 0.5)
+
+    def _band(self, freqs, band: tuple):
+        return (freqs >= band[0]) & (freqs < band[1])
+
+    def _ramp(self, value: float, lo: float, hi: float) -> float:
+        return float(np.clip((value - lo) / (hi - lo), 0.0, 1.0))
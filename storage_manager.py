@@ -0,0 +1,242 @@
+"""
+DIDGERI-BOOM Storage Manager
+Disk budget and garbage collection for processed work dirs.
+"""
+
+import json
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    DATA_DIR,
+    PROCESSED_VIDEO_DIR,
+    STORAGE_BUDGET_MB,
+    STORAGE_GC_INTERVAL_SECONDS,
+    STORAGE_MIN_FREE_MB,
+    STORAGE_REPORT_RETENTION_DAYS,
+)
+from pipeline_checkpoint import MANIFEST_NAME, read_manifest
+
+REPORT_NAME = "processing_report.json"
+# Small files worth keeping after a render: the report, the checkpoint
+# manifest (marks the dir as finished) and the captions
+KEEP_SUFFIXES = (".json", ".srt", ".ass")
+# Scratch space a render needs, as a multiple of the input size
+JOB_SPACE_FACTOR = {"staged": 4.0, "default": 1.5}
+
+
+class StorageManager:
+    """Keeps PROCESSED_VIDEO_DIR within budget.
+
+    - Finished work dirs lose their intermediates straight away (variants,
+      report and captions are kept). Staged renders keep theirs: that mode
+      exists to inspect them.
+    - Finished or failed dirs older than the retention period are removed.
+    - Beyond the byte budget, the oldest finished/failed dirs go first.
+    Dirs without a report or failure mark are renders in progress (or
+    waiting to be resumed) and are never touched.
+    """
+
+    def __init__(
+        self,
+        processed_dir: Path = PROCESSED_VIDEO_DIR,
+        budget_mb: int = STORAGE_BUDGET_MB,
+        retention_days: int = STORAGE_REPORT_RETENTION_DAYS,
+        min_free_mb: int = STORAGE_MIN_FREE_MB,
+        interval: int = STORAGE_GC_INTERVAL_SECONDS,
+    ):
+        self.processed_dir = processed_dir
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.retention_seconds = retention_days * 86400
+        self.min_free_bytes = min_free_mb * 1024 * 1024
+        self.interval = interval
+        self.stats_file = DATA_DIR / "storage_stats.json"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Size of processed_dir as of the last collect(), less what release() freed since
+        self._used_bytes: Optional[int] = None
+        self.stats = self._load_stats()
+
+    # ── Lifecycle ────────────────────────────────────────────────
+
+    def start(self):
+        """Collect now, then every ``interval`` seconds in the background."""
+        self._thread = threading.Thread(
+            target=self._loop, name="storage-gc", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def collect(self) -> dict:
+        """Run one garbage-collection pass; returns what it reclaimed."""
+        with self._lock:
+            freed, files = 0, 0
+            finished = []
+            for work_dir in self._work_dirs():
+                state, finished_at = self._state(work_dir)
+                if state is None:
+                    continue
+                if time.time() - finished_at > self.retention_seconds:
+                    size, count = self._remove_dir(work_dir)
+                    freed, files = freed + size, files + count
+                    continue
+                if state == "ready":
+                    size, count = self._strip_intermediates(work_dir)
+                    freed, files = freed + size, files + count
+                finished.append((finished_at, work_dir))
+
+            # Over budget: drop whole finished dirs, oldest first
+            used = self._dir_size(self.processed_dir)
+            for _, work_dir in sorted(finished):
+                if used <= self.budget_bytes:
+                    break
+                size, count = self._remove_dir(work_dir)
+                used -= size
+                freed, files = freed + size, files + count
+            self._used_bytes = used
+
+            self._record(freed, files)
+            if freed:
+                print(
+                    f"[STORAGE] Reclaimed {freed / (1024 * 1024):.1f} MB ({files} files)"
+                )
+            return {"reclaimed_bytes": freed, "files_deleted": files}
+
+    def release(self, work_dir: Path) -> int:
+        """Delete a finished render's intermediates right away; returns bytes freed."""
+        with self._lock:
+            if self._state(Path(work_dir))[0] != "ready":
+                return 0
+            freed, files = self._strip_intermediates(Path(work_dir))
+            if self._used_bytes is not None:
+                self._used_bytes = max(0, self._used_bytes - freed)
+            self._record(freed, files)
+            return freed
+
+    def has_room(
+        self, input_path: Optional[Path] = None, render_mode: Optional[str] = None
+    ) -> bool:
+        """True if rendering ``input_path`` would leave at least the free-space floor."""
+        needed = 0
+        if input_path is not None:
+            try:
+                factor = JOB_SPACE_FACTOR.get(render_mode, JOB_SPACE_FACTOR["default"])
+                needed = int(Path(input_path).stat().st_size * factor)
+            except OSError:
+                pass
+        return self._free_bytes() - needed >= self.min_free_bytes
+
+    def get_status(self) -> dict:
+        """Cheap enough for health checks: disk use comes from the last collect()."""
+        with self._lock:
+            stats = dict(self.stats)
+            used = self._used_bytes
+        return {
+            "used_mb": round(used / (1024 * 1024), 1) if used is not None else None,
+            "budget_mb": round(self.budget_bytes / (1024 * 1024)),
+            "free_mb": round(self._free_bytes() / (1024 * 1024), 1),
+            "min_free_mb": round(self.min_free_bytes / (1024 * 1024)),
+            "retention_days": round(self.retention_seconds / 86400),
+            "reclaimed_mb": round(stats["reclaimed_bytes"] / (1024 * 1024), 1),
+            "files_deleted": stats["files_deleted"],
+            "last_run": stats["last_run"],
+        }
+
+    # ── Internals ────────────────────────────────────────────────
+
+    def _loop(self):
+        while True:
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"[STORAGE] Collection failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def _work_dirs(self) -> list[Path]:
+        try:
+            return [d for d in self.processed_dir.iterdir() if d.is_dir()]
+        except OSError:
+            return []
+
+    def _state(self, work_dir: Path) -> tuple[Optional[str], float]:
+        """("ready" | "failed" | None, when it finished)."""
+        report = work_dir / REPORT_NAME
+        if report.exists():
+            return "ready", report.stat().st_mtime
+        manifest = read_manifest(work_dir / MANIFEST_NAME)
+        if manifest and manifest.get("failed"):
+            return "failed", (work_dir / MANIFEST_NAME).stat().st_mtime
+        return None, 0.0
+
+    def _strip_intermediates(self, work_dir: Path) -> tuple[int, int]:
+        keep = set()
+        try:
+            report = json.loads((work_dir / REPORT_NAME).read_text(encoding="utf-8"))
+            if report.get("render_mode") == "staged":
+                return 0, 0
+            keep = {Path(v["path"]).name for v in report.get("variants") or []}
+        except Exception:
+            pass
+        freed, files = 0, 0
+        for path in work_dir.iterdir():
+            if not path.is_file() or path.suffix in KEEP_SUFFIXES or path.name in keep:
+                continue
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            freed, files = freed + size, files + 1
+        return freed, files
+
+    def _remove_dir(self, work_dir: Path) -> tuple[int, int]:
+        size = self._dir_size(work_dir)
+        files = sum(1 for p in work_dir.rglob("*") if p.is_file())
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return size, files
+
+    def _dir_size(self, path: Path) -> int:
+        total = 0
+        for p in path.rglob("*"):
+            try:
+                if p.is_file():
+                    total += p.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _free_bytes(self) -> int:
+        return shutil.disk_usage(self.processed_dir).free
+
+    # ── Metrics ──────────────────────────────────────────────────
+
+    def _record(self, freed: int, files: int):
+        """Add to the lifetime reclaimed counters (caller holds the lock)."""
+        self.stats["reclaimed_bytes"] += freed
+        self.stats["files_deleted"] += files
+        self.stats["last_run"] = datetime.now().isoformat()
+        try:
+            self.stats_file.write_text(
+                json.dumps(self.stats, indent=2), encoding="utf-8"
+            )
+        except Exception:
+            pass
+
+    def _load_stats(self) -> dict:
+        stats = {"reclaimed_bytes": 0, "files_deleted": 0, "last_run": None}
+        try:
+            if self.stats_file.exists():
+                stats.update(json.loads(self.stats_file.read_text(encoding="utf-8")))
+        except Exception:
+            pass
+        return stats
@@ -0,0 +1,56 @@
+"""
+DIDGERI-BOOM Template Cache
+Intro/outro bumpers pre-encoded once to the exact output profile.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from config import DATA_DIR
+
+
+class TemplateCache:
+    """Keeps a normalized copy of each template so concat can stream-copy.
+
+    A copy is rebuilt whenever the template file or the encode profile
+    changes.
+    """
+
+    def __init__(self, cache_dir: Path = DATA_DIR / "template_cache"):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get(
+        self, template: Path, profile: dict, build: Callable[[Path, Path], None]
+    ) -> Path:
+        """Normalized copy of ``template``, built with ``build(src, dst)`` on a miss."""
+        template = Path(template)
+        st = template.stat()
+        fingerprint = json.dumps(
+            {"size": st.st_size, "mtime": st.st_mtime_ns, "profile": profile},
+            sort_keys=True,
+            default=str,
+        )
+        key = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+        cached = self.cache_dir / f"{template.stem}_{key}.mp4"
+
+        with self._lock:
+            if cached.exists():
+                return cached
+            # Batch workers may build the same copy at once; each writes its own tmp
+            tmp = cached.with_name(f".{cached.stem}.{os.getpid()}{cached.suffix}")
+            try:
+                build(template, tmp)
+                tmp.replace(cached)
+            finally:
+                tmp.unlink(missing_ok=True)
+            # Drop copies made from older versions of this template
+            for stale in self.cache_dir.glob(f"{template.stem}_*.mp4"):
+                if stale != cached:
+                    stale.unlink(missing_ok=True)
+        return cached
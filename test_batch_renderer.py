@@ -0,0 +1,72 @@
+"""
+Test that BatchRenderer's spawned workers don't rebuild the server's engines.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+ROOT = Path(__file__).parent
+ENGINES = [
+    "trend_monitor",
+    "video_editor",
+    "storage_manager",
+    "render_jobs",
+    "ingest_watcher",
+    "batch_renderer",
+    "thumbnails",
+    "scheduler",
+    "hashtag_gen",
+    "analytics",
+    "monetization",
+    "uploader",
+]
+
+# Started like `python server.py`: spawn workers re-run server.py as __mp_main__
+SPAWN_FROM_SERVER = f"""
+import multiprocessing, sys
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, {str(ROOT)!r})
+sys.modules["__main__"].__file__ = {str(ROOT / "server.py")!r}
+import test_batch_renderer
+with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+    print(pool.submit(test_batch_renderer.engines_in_worker).result())
+"""
+
+
+def engines_in_worker() -> list:
+    """Runs in the worker: the engines its re-imported server.py built."""
+    main = sys.modules["__mp_main__"]
+    assert hasattr(main, "app"), "worker did not re-import server.py"
+    return [name for name in ENGINES if getattr(main, name, None) is not None]
+
+
+def test_spawned_workers_build_no_engines():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATA_DIR": tmp,
+            "PROCESSED_VIDEO_DIR": tmp,
+            "UPLOAD_QUEUE_DIR": tmp,
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", SPAWN_FROM_SERVER],
+            cwd=tmp,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]", result.stdout
+
+
+if __name__ == "__main__":
+    print("Spawning a worker with server.py as __main__...")
+    test_spawned_workers_build_no_engines()
+    print("Success! Workers import the server without building its engines.")
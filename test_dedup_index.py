@@ -0,0 +1,146 @@
+"""
+Tests for near-duplicate detection in DedupIndex.
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from dedup_index import AUDIO_BANDS, MAX_FRAME_DISTANCE, DedupIndex
+
+# Only the comparison helpers run against it; nothing is written
+SCRATCH_INDEX = Path(tempfile.gettempdir()) / "unused_dedup.json"
+FRAMES = [
+    "f0f0f0f0f0f0f0f0",
+    "0123456789abcdef",
+    "ffff0000ffff0000",
+    "00000000ffffffff",
+]
+
+
+def audio(bits) -> dict:
+    bits = np.asarray(bits, dtype=bool)
+    return {"hops": int(bits.shape[0]), "bits": np.packbits(bits).tobytes().hex()}
+
+
+def entry(duration=30.0, frames=FRAMES, bits=None) -> dict:
+    return {
+        "duration": duration,
+        "frames": list(frames),
+        "audio": audio(bits) if bits is not None else None,
+    }
+
+
+def flip(hex_hash: str, n: int) -> str:
+    """``hex_hash`` with its lowest ``n`` bits inverted."""
+    return f"{int(hex_hash, 16) ^ ((1 << n) - 1):016x}"
+
+
+def random_bits(seed: int, hops: int = 200):
+    return np.random.default_rng(seed).random((hops, AUDIO_BANDS - 1)) > 0.5
+
+
+def test_same_clip_within_tolerances():
+    index = DedupIndex(index_path=SCRATCH_INDEX)
+    bits = random_bits(0)
+    near = [flip(h, MAX_FRAME_DISTANCE - 2) for h in FRAMES]
+    assert index._same_clip(
+        entry(bits=bits), entry(duration=30.4, frames=near, bits=bits)
+    )
+
+
+def test_different_length_or_picture_is_not_a_duplicate():
+    index = DedupIndex(index_path=SCRATCH_INDEX)
+    assert not index._same_clip(entry(), entry(duration=33.0))
+    far = [flip(h, MAX_FRAME_DISTANCE + 8) for h in FRAMES]
+    assert not index._same_clip(entry(), entry(frames=far))
+
+
+def test_audio_decides_when_both_have_sound():
+    index = DedupIndex(index_path=SCRATCH_INDEX)
+    assert not index._same_clip(entry(bits=random_bits(0)), entry(bits=random_bits(1)))
+    # A copy exported without sound is still the same footage
+    assert index._same_clip(entry(bits=random_bits(0)), entry())
+
+
+def test_audio_similarity_allows_small_offsets():
+    index = DedupIndex(index_path=SCRATCH_INDEX)
+    bits = random_bits(0)
+    assert index._audio_similarity(audio(bits), audio(bits)) == 1.0
+    assert index._audio_similarity(audio(bits[3:]), audio(bits)) == 1.0
+    assert index._audio_similarity(audio(bits[20:]), audio(bits)) < 0.6
+    assert index._audio_similarity(audio(random_bits(0)), audio(random_bits(1))) < 0.6
+
+
+def make_clip(path: Path, video: str, seed: int, crf: int = 23):
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"{video}=size=320x240:rate=25:duration=4",
+            "-f",
+            "lavfi",
+            "-i",
+            f"anoisesrc=color=pink:seed={seed}:duration=4:sample_rate=16000",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-crf",
+            str(crf),
+            "-c:a",
+            "aac",
+            "-shortest",
+            str(path),
+        ],
+        check=True,
+    )
+
+
+def test_reexport_is_a_duplicate_of_the_first_seen_clip():
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        original, reexport, other = (
+            tmp / "original.mp4",
+            tmp / "reexport.mp4",
+            tmp / "other.mp4",
+        )
+        make_clip(original, "testsrc2", seed=1)
+        make_clip(reexport, "testsrc2", seed=1, crf=35)
+        make_clip(other, "smptebars", seed=2)
+        probe = {"duration": 4.0, "audio_codec": "aac"}
+        index = DedupIndex(index_path=tmp / "dedup.json")
+
+        assert index.duplicate_of(original, probe) is None
+        assert index.duplicate_of(reexport, probe) == str(original.resolve())
+        assert index.duplicate_of(other, probe) is None
+        # The first-seen clip never points at its copy
+        assert (
+            DedupIndex(index_path=tmp / "dedup.json").duplicate_of(original, probe)
+            is None
+        )
+
+
+if __name__ == "__main__":
+    print("Testing DedupIndex...")
+    test_same_clip_within_tolerances()
+    test_different_length_or_picture_is_not_a_duplicate()
+    test_audio_decides_when_both_have_sound()
+    test_audio_similarity_allows_small_offsets()
+    test_reexport_is_a_duplicate_of_the_first_seen_clip()
+    print("Success! Re-exports are flagged and different clips are not.")
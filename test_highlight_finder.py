@@ -0,0 +1,95 @@
+"""
+Tests for the audio envelopes and HighlightFinder window picking.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from audio_analysis import onset_envelope, rms_envelope
+from highlight_finder import ANALYSIS_SAMPLE_RATE, HOP_SECONDS, HighlightFinder
+
+SR = ANALYSIS_SAMPLE_RATE
+
+
+def hum(seconds):
+    rng = np.random.default_rng(0)
+    return (0.01 * rng.standard_normal(int(SR * seconds))).astype(np.float32)
+
+
+def test_envelopes_share_one_grid():
+    for seconds in (0.01, 0.5, 7.3, 120, 1200):
+        samples = hum(seconds)
+        rms = rms_envelope(samples, SR, HOP_SECONDS)
+        onset = onset_envelope(samples, SR, HOP_SECONDS)
+        assert (
+            len(rms) == len(onset) == max(1, int(np.ceil(seconds / HOP_SECONDS)))
+        ), seconds
+
+
+def test_late_onset_lands_in_its_hop():
+    # A burst 19 minutes in must not drift into another hop
+    samples = hum(1200)
+    for at in (10.0, 600.0, 1140.0):
+        start = int(at * SR)
+        samples[start : start + 400] += np.sin(np.arange(400) * 0.9).astype(np.float32)
+        onset = onset_envelope(samples, SR, HOP_SECONDS)
+        assert int(np.argmax(onset)) == int(at / HOP_SECONDS), at
+        samples[start : start + 400] = hum(400 / SR)
+
+
+def test_rms_envelope_levels():
+    samples = np.concatenate([np.zeros(SR), np.full(SR, 0.5)]).astype(np.float32)
+    rms = rms_envelope(samples, SR, HOP_SECONDS)
+    assert np.allclose(rms, [0, 0, 0.5, 0.5])
+
+
+def analysis(scores):
+    return {"hop": HOP_SECONDS, "scores": scores}
+
+
+def test_pick_best_window():
+    scores = [0.1] * 40
+    scores[20:30] = [0.9] * 10
+    picked = HighlightFinder(window_seconds=5).pick(analysis(scores))
+    assert picked == [{"rank": 0, "start": 10.0, "end": 15.0, "score": 0.9}]
+
+
+def test_pick_does_not_overlap():
+    scores = [0.1] * 60
+    scores[10:20] = [0.8] * 10
+    scores[12] = 1.0
+    scores[40:50] = [0.7] * 10
+    picked = HighlightFinder(window_seconds=5).pick(analysis(scores), count=3)
+    assert [p["rank"] for p in picked] == [0, 1, 2]
+    starts = sorted(p["start"] for p in picked)
+    assert all(b - a >= 5 for a, b in zip(starts, starts[1:]))
+    assert picked[0]["start"] == 5.0 and picked[1]["start"] == 20.0
+
+
+def test_pick_clamps_to_duration():
+    scores = [0.1] * 19 + [1.0]
+    picked = HighlightFinder(window_seconds=2).pick(analysis(scores), duration=9.8)
+    assert picked[0]["start"] == 8.0 and picked[0]["end"] == 9.8
+
+
+def test_pick_short_clip_is_whole_clip():
+    picked = HighlightFinder(window_seconds=30).pick(analysis([0.2, 0.4]), duration=1.2)
+    assert picked == [{"rank": 0, "start": 0.0, "end": 1.2, "score": 0.3}]
+    assert HighlightFinder().pick(analysis([]), duration=0)[0]["end"] == 0
+
+
+if __name__ == "__main__":
+    print("Testing HighlightFinder...")
+    test_envelopes_share_one_grid()
+    test_late_onset_lands_in_its_hop()
+    test_rms_envelope_levels()
+    test_pick_best_window()
+    test_pick_does_not_overlap()
+    test_pick_clamps_to_duration()
+    test_pick_short_clip_is_whole_clip()
+    print("Success! Envelopes line up and highlight windows are picked as expected.")
@@ -0,0 +1,199 @@
+"""
+Tests for StageCheckpoints and resuming an interrupted VideoEditor render.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+import video_editor
+from pipeline_checkpoint import MANIFEST_NAME, StageCheckpoints
+from probe_cache import ProbeCache
+from render_cache import RenderCache
+from video_editor import PROBE_FORMAT, VideoEditor
+
+
+class Stage:
+    """A build step that writes ``output`` and counts how often it ran."""
+
+    def __init__(self, output: Path):
+        self.output = output
+        self.runs = 0
+
+    def __call__(self):
+        self.runs += 1
+        self.output.write_bytes(b"frame" * 10)
+        return {"run": self.runs}
+
+
+def test_skips_unchanged_stage_and_reruns_on_new_settings():
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        source = work_dir / "clip.mp4"
+        source.write_bytes(b"raw")
+        stage = Stage(work_dir / "clip_vertical.mp4")
+
+        StageCheckpoints(work_dir).run(
+            "vertical", [source], {"crf": 23}, [stage.output], stage
+        )
+        resumed = StageCheckpoints(work_dir)
+        assert resumed.run(
+            "vertical", [source], {"crf": 23}, [stage.output], stage
+        ) == {"run": 1}
+        assert resumed.resumed == ["vertical"]
+
+        changed = StageCheckpoints(work_dir)
+        assert changed.run(
+            "vertical", [source], {"crf": 20}, [stage.output], stage
+        ) == {"run": 2}
+        assert changed.resumed == []
+
+
+def test_resumes_from_another_working_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp).resolve()
+        work_dir = tmp / "data" / "processed_videos" / "clip_1"
+        work_dir.mkdir(parents=True)
+        source = work_dir / "clip.mp4"
+        source.write_bytes(b"raw")
+        stage = Stage(work_dir / "clip_vertical.mp4")
+        cwd = os.getcwd()
+        try:
+            # Paths as the app sees them with PROCESSED_VIDEO_DIR=./data/...
+            os.chdir(tmp)
+            relative = Path("data/processed_videos/clip_1")
+            StageCheckpoints(relative).run(
+                "vertical",
+                [relative / "clip.mp4"],
+                {},
+                [relative / "clip_vertical.mp4"],
+                stage,
+            )
+            os.chdir(work_dir)
+            checkpoints = StageCheckpoints(work_dir)
+            checkpoints.run("vertical", [source], {}, [stage.output], stage)
+        finally:
+            os.chdir(cwd)
+        assert stage.runs == 1
+        assert checkpoints.resumed == ["vertical"]
+
+
+def editor(tmp: Path) -> VideoEditor:
+    """A VideoEditor whose caches live under ``tmp``."""
+    ed = VideoEditor.__new__(VideoEditor)
+    ed.caption_engine = SimpleNamespace(model_size="tiny")
+    ed.ffmpeg_threads = 0
+    ed.probe_cache = ProbeCache(
+        version=PROBE_FORMAT, index_path=tmp / "probe_cache.json"
+    )
+    ed.render_cache = RenderCache(index_path=tmp / "render_cache.json")
+    ed._local = threading.local()
+    return ed
+
+
+@contextmanager
+def settings(**values):
+    """Temporarily override video_editor's config values."""
+    originals = {name: getattr(video_editor, name) for name in values}
+    for name, value in values.items():
+        setattr(video_editor, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(video_editor, name, value)
+
+
+def render(ed: VideoEditor, clip: Path, **options) -> dict:
+    result = ed.process_video(
+        clip,
+        add_captions=False,
+        color_grade=True,
+        render_mode="staged",
+        use_cache=False,
+        normalize_audio=False,
+        **options,
+    )
+    assert result.get("status") == "ready", result.get("error")
+    return result
+
+
+def test_interrupted_staged_render_resumes():
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = tmp / "clip.mp4"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-v",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "testsrc2=size=160x120:rate=25:duration=1",
+                "-f",
+                "lavfi",
+                "-i",
+                "sine=frequency=220:duration=1",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                "-c:a",
+                "aac",
+                "-shortest",
+                str(clip),
+            ],
+            check=True,
+        )
+        (tmp / "queue").mkdir()
+        ed = editor(tmp)
+        # Small frames keep the three medium-preset encodes quick
+        with settings(
+            PROCESSED_VIDEO_DIR=tmp / "processed",
+            UPLOAD_QUEUE_DIR=tmp / "queue",
+            VIDEO_WIDTH=180,
+            VIDEO_HEIGHT=320,
+        ):
+            first = render(ed, clip)
+            work_dir = Path(first["work_dir"])
+
+            # Interrupted during the final encode: no completed flag, no output
+            manifest_path = work_dir / MANIFEST_NAME
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            del manifest["completed"]
+            del manifest["stages"]["encoded"]
+            manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+            Path(first["output"]).unlink()
+
+            resumed = render(ed, clip, resume_dir=work_dir)
+            assert resumed["resumed_stages"] == ["vertical", "color_graded"]
+            assert Path(resumed["output"]).exists()
+
+            # A changed encoder setting invalidates every stage
+            with settings(VIDEO_BITRATE="2M"):
+                rerun = render(ed, clip, resume_dir=work_dir)
+            assert "resumed_stages" not in rerun
+
+
+if __name__ == "__main__":
+    print("Testing StageCheckpoints...")
+    test_skips_unchanged_stage_and_reruns_on_new_settings()
+    test_resumes_from_another_working_directory()
+    print("Resuming an interrupted staged render...")
+    test_interrupted_staged_render_resumes()
+    print("Success! Interrupted renders resume past every stage that is still valid.")
@@ -0,0 +1,92 @@
+"""
+Tests for the ffprobe metadata ProbeCache.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from probe_cache import ProbeCache
+
+
+def test_hit_until_file_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = tmp / "clip.mp4"
+        clip.write_bytes(b"x" * 10)
+        cache = ProbeCache(index_path=tmp / "probe.json")
+        cache.put(clip, {"duration": 3.0})
+        assert cache.get(clip) == {"duration": 3.0}
+
+        # Same size, new mtime
+        st = clip.stat()
+        os.utime(clip, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert cache.get(clip) is None
+
+        cache.put(clip, {"duration": 3.0})
+        clip.write_bytes(b"x" * 11)
+        assert cache.get(clip) is None
+
+
+def test_persists_across_instances():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = tmp / "clip.mp4"
+        clip.write_bytes(b"x")
+        ProbeCache(index_path=tmp / "probe.json").put(clip, {"duration": 1.0})
+        assert ProbeCache(index_path=tmp / "probe.json").get(clip) == {"duration": 1.0}
+
+
+def test_version_bump_invalidates():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = tmp / "clip.mp4"
+        clip.write_bytes(b"x")
+        ProbeCache(version=1, index_path=tmp / "probe.json").put(
+            clip, {"duration": 1.0}
+        )
+        assert ProbeCache(version=2, index_path=tmp / "probe.json").get(clip) is None
+
+
+def test_batch_defers_writes_and_drops_deleted_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        index = tmp / "probe.json"
+        a, b = tmp / "a.mp4", tmp / "b.mp4"
+        a.write_bytes(b"a")
+        b.write_bytes(b"b")
+        cache = ProbeCache(index_path=index)
+        with cache.batch():
+            cache.put(a, {"duration": 1.0})
+            cache.put(b, {"duration": 2.0})
+            assert not index.exists()
+        assert index.exists()
+
+        b.unlink()
+        cache.put(a, {"duration": 1.5})
+        assert str(b.resolve()) not in ProbeCache(index_path=index)._entries
+
+
+def test_missing_file_and_empty_probe():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = ProbeCache(index_path=tmp / "probe.json")
+        assert cache.get(tmp / "missing.mp4") is None
+        clip = tmp / "clip.mp4"
+        clip.write_bytes(b"x")
+        cache.put(clip, {})
+        assert cache.get(clip) is None
+
+
+if __name__ == "__main__":
+    print("Testing ProbeCache...")
+    test_hit_until_file_changes()
+    test_persists_across_instances()
+    test_version_bump_invalidates()
+    test_batch_defers_writes_and_drops_deleted_files()
+    test_missing_file_and_empty_probe()
+    print("Success! Probe results are reused until a file changes.")
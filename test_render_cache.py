@@ -0,0 +1,117 @@
+"""
+Tests for the content-addressed RenderCache.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from render_cache import RenderCache
+
+
+def ready(output: Path, size: int) -> dict:
+    output.write_bytes(b"v" * size)
+    return {"status": "ready", "output": str(output), "steps": ["exported"]}
+
+
+def test_key_follows_content_options_and_settings():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = RenderCache(index_path=tmp / "render.json")
+        clip = tmp / "clip.mp4"
+        clip.write_bytes(b"one")
+        copy = tmp / "renamed.mp4"
+        copy.write_bytes(b"one")
+
+        key = cache.make_key(clip, {"add_captions": True}, {"video": [1080, 1920]})
+        assert (
+            cache.make_key(copy, {"add_captions": True}, {"video": [1080, 1920]}) == key
+        )
+        assert (
+            cache.make_key(clip, {"add_captions": False}, {"video": [1080, 1920]})
+            != key
+        )
+        assert (
+            cache.make_key(clip, {"add_captions": True}, {"video": [720, 1280]}) != key
+        )
+
+        clip.write_bytes(b"two")
+        assert (
+            cache.make_key(clip, {"add_captions": True}, {"video": [1080, 1920]}) != key
+        )
+
+
+def test_lookup_drops_entries_whose_output_changed():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = RenderCache(index_path=tmp / "render.json")
+        output = tmp / "out_READY.mp4"
+        cache.store("k", ready(output, 100))
+        hit = cache.lookup("k")
+        assert hit["output"] == str(output)
+
+        # The report is a copy, not the cached entry
+        hit["steps"].append("tampered")
+        assert cache.lookup("k")["steps"] == ["exported"]
+
+        output.write_bytes(b"short")
+        assert cache.lookup("k") is None
+        assert RenderCache(index_path=tmp / "render.json").lookup("k") is None
+
+
+def test_lookup_misses_when_a_variant_is_gone():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = RenderCache(index_path=tmp / "render.json")
+        preview = tmp / "work" / "clip_preview.mp4"
+        preview.parent.mkdir()
+        preview.write_bytes(b"p" * 10)
+        result = ready(tmp / "out_READY.mp4", 100)
+        result["variants"] = [{"name": "preview", "path": str(preview), "size_mb": 0.0}]
+        cache.store("k", result)
+        assert cache.lookup("k")["variants"][0]["path"] == str(preview)
+
+        preview.unlink()
+        assert cache.lookup("k") is None
+
+
+def test_failed_renders_are_not_stored():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = RenderCache(index_path=tmp / "render.json")
+        cache.store("failed", {"status": "failed", "output": str(tmp / "none.mp4")})
+        cache.store("missing", {"status": "ready", "output": str(tmp / "none.mp4")})
+        assert cache.get_status()["entries"] == 0
+
+
+def test_least_recently_used_evicted_over_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = RenderCache(index_path=tmp / "render.json")
+        cache.max_bytes = 250
+        cache.store("a", ready(tmp / "a.mp4", 100))
+        time.sleep(0.01)
+        cache.store("b", ready(tmp / "b.mp4", 100))
+        time.sleep(0.01)
+        assert cache.lookup("a")  # a is now the most recent
+        time.sleep(0.01)
+        cache.store("c", ready(tmp / "c.mp4", 100))
+
+        assert cache.lookup("b") is None
+        assert cache.lookup("a") and cache.lookup("c")
+        # Eviction only forgets the entry; the file belongs to the upload queue
+        assert (tmp / "b.mp4").exists()
+
+
+if __name__ == "__main__":
+    print("Testing RenderCache...")
+    test_key_follows_content_options_and_settings()
+    test_lookup_drops_entries_whose_output_changed()
+    test_lookup_misses_when_a_variant_is_gone()
+    test_failed_renders_are_not_stored()
+    test_least_recently_used_evicted_over_budget()
+    print("Success! Render cache keys, validation and eviction behave.")
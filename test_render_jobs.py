@@ -0,0 +1,147 @@
+"""
+Tests for the persistent RenderJobQueue and the /api/jobs endpoints.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+import server
+from pipeline_checkpoint import StageCheckpoints
+from render_jobs import RenderJobQueue
+
+
+class RecordingEditor:
+    """Stands in for VideoEditor: records each render and finishes it at once."""
+
+    def __init__(self, processed_dir: Path):
+        self.processed_dir = processed_dir
+        self.calls = []
+
+    def process_video(self, input_path: Path, progress=None, **options) -> dict:
+        self.calls.append((Path(input_path).name, options))
+        work_dir = options.get("resume_dir") or str(
+            self.processed_dir / f"{Path(input_path).stem}_new"
+        )
+        if progress:
+            progress("started", {"state": "running", "work_dir": work_dir})
+            progress("exported", {"state": "done"})
+        return {"status": "ready", "steps": ["exported"], "work_dir": work_dir}
+
+
+def wait_until_finished(jobs: RenderJobQueue, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(j["status"] in ("done", "failed") for j in jobs.list_jobs()):
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"jobs still pending: {jobs.list_jobs()}")
+
+
+def make_tree(tmp: Path) -> tuple[Path, Path, list[Path]]:
+    jobs_file, processed = tmp / "render_jobs.json", tmp / "processed"
+    processed.mkdir()
+    clips = []
+    for name in ("a.mp4", "b.mp4", "c.mp4"):
+        clip = tmp / name
+        clip.write_bytes(b"clip")
+        clips.append(clip)
+    return jobs_file, processed, clips
+
+
+def test_submitted_jobs_persist_across_restarts():
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs_file, processed, clips = make_tree(Path(tmp))
+        editor = RecordingEditor(processed)
+        job = RenderJobQueue(
+            editor, jobs_file=jobs_file, processed_dir=processed
+        ).submit(
+            str(clips[0]),
+            {"add_captions": False},
+        )
+        assert job["status"] == "queued"
+
+        reloaded = RenderJobQueue(editor, jobs_file=jobs_file, processed_dir=processed)
+        assert reloaded.get_job(job["id"])["options"] == {"add_captions": False}
+        assert reloaded.get_status()["jobs"] == {"queued": 1}
+
+        # Queued before the restart, so the new workers pick it up
+        reloaded.start()
+        wait_until_finished(reloaded)
+        reloaded.stop()
+        assert editor.calls == [("a.mp4", {"add_captions": False})]
+        job = RenderJobQueue(
+            editor, jobs_file=jobs_file, processed_dir=processed
+        ).get_job(job["id"])
+        assert job["status"] == "done" and job["steps"] == ["exported"]
+
+
+def test_start_resumes_interrupted_jobs_and_orphaned_renders():
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs_file, processed, (a, b, c) = make_tree(Path(tmp))
+        editor = RecordingEditor(processed)
+
+        # a: a queued job that was mid-render when the server stopped
+        before = RenderJobQueue(editor, jobs_file=jobs_file, processed_dir=processed)
+        job_a = before.submit(str(a), {"color_grade": True})
+        a_dir = processed / "a_1"
+        a_dir.mkdir()
+        StageCheckpoints(a_dir).begin(a, {"color_grade": True})
+        before._update(job_a["id"], status="running", work_dir=str(a_dir))
+        # b: a batch render that never finished; c: one that did
+        for clip, done in ((b, False), (c, True)):
+            work_dir = processed / f"{clip.stem}_1"
+            work_dir.mkdir()
+            checkpoints = StageCheckpoints(work_dir)
+            checkpoints.begin(clip, {"add_captions": False})
+            if done:
+                checkpoints.complete()
+
+        jobs = RenderJobQueue(editor, jobs_file=jobs_file, processed_dir=processed)
+        jobs.start()
+        wait_until_finished(jobs)
+        jobs.stop()
+        assert sorted(editor.calls) == [
+            ("a.mp4", {"color_grade": True, "resume_dir": str(a_dir)}),
+            ("b.mp4", {"add_captions": False, "resume_dir": str(processed / "b_1")}),
+        ]
+        assert jobs.get_status()["jobs"] == {"done": 2}
+
+
+def test_jobs_endpoints():
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs_file, processed, clips = make_tree(Path(tmp))
+        jobs = RenderJobQueue(
+            RecordingEditor(processed), jobs_file=jobs_file, processed_dir=processed
+        )
+        job = jobs.submit(str(clips[0]))
+        jobs._update(job["id"], result={"status": "ready"})
+        original, server.render_jobs = server.render_jobs, jobs
+        try:
+            # No lifespan: the engines stay unbuilt and only this queue is wired in
+            client = TestClient(server.app)
+            listed = client.get("/api/jobs").json()
+            assert [j["id"] for j in listed] == [job["id"]] and "result" not in listed[
+                0
+            ]
+            assert client.get(f"/api/jobs/{job['id']}").json()["result"] == {
+                "status": "ready"
+            }
+            assert client.get("/api/jobs/job_missing").status_code == 404
+        finally:
+            server.render_jobs = original
+
+
+if __name__ == "__main__":
+    print("Testing RenderJobQueue...")
+    test_submitted_jobs_persist_across_restarts()
+    test_start_resumes_interrupted_jobs_and_orphaned_renders()
+    print("Testing the /api/jobs endpoints...")
+    test_jobs_endpoints()
+    print("Success! Jobs persist, survive restarts and resume interrupted renders.")
@@ -0,0 +1,133 @@
+"""
+Tests for the NumPy speech pre-scan that decides whether Whisper runs.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from speech_detector import SpeechDetector
+
+SR = 16000
+SECONDS = 8
+
+
+def drone(f0=70.0):
+    """Harmonic drone with a slight wobble and a rhythmic pulse, like a played didgeridoo."""
+    t = np.arange(SR * SECONDS) / SR
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.003 * np.sin(2 * np.pi * 0.3 * t))) / SR
+    rng = np.random.default_rng(0)
+    out = sum(
+        (1 / k + 0.15 * np.exp(-(((k * f0 - 1500) / 300) ** 2)))
+        * np.sin(k * phase + rng.uniform(0, 2 * np.pi))
+        for k in range(1, int(4000 / f0))
+    )
+    out = out * (1 + 0.2 * np.sin(2 * np.pi * 2 * t)) + 0.01 * rng.standard_normal(
+        len(t)
+    )
+    return out / np.sqrt(np.mean(out**2))
+
+
+def voice():
+    """Gliding pitch through shifting vowel formants, four syllables a second with pauses."""
+    t = np.arange(SR * SECONDS) / SR
+    f0 = 140 + 40 * np.sin(2 * np.pi * 0.4 * t) + 15 * np.sin(2 * np.pi * 3.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    vowels = np.array(
+        [(700, 1200), (300, 2300), (500, 900), (400, 2000), (600, 1700)], dtype=float
+    )
+    f1, f2 = vowels[(t * 4).astype(int) % 5].T
+    out = sum(
+        (
+            np.exp(-(((k * f0 - f1) / 120) ** 2))
+            + 0.6 * np.exp(-(((k * f0 - f2) / 150) ** 2))
+        )
+        / np.sqrt(k)
+        * np.sin(k * phase)
+        for k in range(1, 30)
+    )
+    envelope = np.clip(1.4 * np.sin(np.pi * (t * 4 % 1)), 0, 1) * ((t % 2) < 1.7)
+    out = out * envelope
+    return out / np.sqrt(np.mean(out**2))
+
+
+def noise(color: str):
+    """Loud broadband noise (wind, crowd hiss): white, or pink (-3 dB/octave)."""
+    spectrum = np.fft.rfft(np.random.default_rng(3).standard_normal(SR * SECONDS))
+    if color == "pink":
+        spectrum /= np.sqrt(np.maximum(np.arange(len(spectrum)), 1))
+    out = np.fft.irfft(spectrum, SR * SECONDS)
+    return out / np.sqrt(np.mean(out**2))
+
+
+def scan(samples):
+    return SpeechDetector().scan((0.25 * samples).astype(np.float32), SR)
+
+
+def test_drone_is_instrumental():
+    for f0 in (55.0, 70.0, 110.0):
+        result = scan(drone(f0))
+        assert not result["speech"], result
+        assert result["confidence"] >= 0.9, result
+        assert abs(result["features"]["drone_hz"] - f0) < 4, result
+
+
+def test_loud_noise_is_not_speech():
+    for color in ("white", "pink"):
+        result = SpeechDetector().scan((0.5 * noise(color)).astype(np.float32), SR)
+        assert not result["speech"] and result["confidence"] >= 0.9, (color, result)
+        assert result["features"]["flatness"] > 0.4, (color, result)
+
+
+def test_voice_is_speech():
+    result = scan(voice())
+    assert result["speech"] and result["confidence"] >= 0.9, result
+
+
+def test_drone_does_not_hide_voice():
+    for voice_db in (0, 6):
+        result = scan(drone() + voice() * 10 ** (voice_db / 20))
+        assert result["speech"], (voice_db, result)
+
+
+def test_quieter_voice_over_drone_is_not_confidently_instrumental():
+    result = scan(drone() + voice() * 10 ** (-6 / 20))
+    assert result["speech"] or result["confidence"] < 0.8, result
+
+
+def test_voice_over_background_noise_is_speech():
+    result = scan(voice() + noise("pink") * 10 ** (-10 / 20))
+    assert result["speech"], result
+
+
+def test_spoken_intro_counts():
+    half = SR * SECONDS // 2
+    result = scan(np.concatenate([voice()[:half], drone()[:half]]))
+    assert result["speech"], result
+
+
+def test_silence_and_short_audio():
+    assert (
+        SpeechDetector().scan(np.zeros(SR * 2, dtype=np.float32), SR)["features"][
+            "audible_frames"
+        ]
+        == 0
+    )
+    assert not SpeechDetector().scan(np.zeros(100, dtype=np.float32), SR)["speech"]
+
+
+if __name__ == "__main__":
+    print("Testing SpeechDetector...")
+    test_drone_is_instrumental()
+    test_loud_noise_is_not_speech()
+    test_voice_is_speech()
+    test_drone_does_not_hide_voice()
+    test_quieter_voice_over_drone_is_not_confidently_instrumental()
+    test_voice_over_background_noise_is_speech()
+    test_spoken_intro_counts()
+    test_silence_and_short_audio()
+    print("Success! Drones and noise skip Whisper; voices over them don't.")
@@ -0,0 +1,161 @@
+"""
+Tests for StorageManager garbage collection and the low-disk hold in batches.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+import batch_renderer
+from batch_renderer import BatchRun
+from pipeline_checkpoint import MANIFEST_NAME
+from storage_manager import REPORT_NAME, StorageManager
+
+MB = 1024 * 1024
+DiskUsage = namedtuple("DiskUsage", "total used free")
+
+
+@contextmanager
+def free_space(mb: float):
+    """Make shutil.disk_usage report ``mb`` free; yields a setter to change it."""
+    free = [int(mb * MB)]
+    real = shutil.disk_usage
+    shutil.disk_usage = lambda path: DiskUsage(1000 * MB, 0, free[0])
+    try:
+        yield lambda new_mb: free.__setitem__(0, int(new_mb * MB))
+    finally:
+        shutil.disk_usage = real
+
+
+def work_dir(
+    root: Path,
+    name: str,
+    state: str = "ready",
+    render_mode: str = "fused",
+    age_days: float = 0,
+) -> Path:
+    """A finished ("ready"/"failed") or in-progress (None) work dir with 1 MB of intermediates."""
+    d = root / name
+    d.mkdir()
+    (d / f"{name}_vertical.mp4").write_bytes(b"v" * MB)
+    (d / f"{name}.ass").write_text("captions", encoding="utf-8")
+    if state == "ready":
+        (d / REPORT_NAME).write_text(
+            json.dumps({"render_mode": render_mode}), encoding="utf-8"
+        )
+    elif state == "failed":
+        (d / MANIFEST_NAME).write_text(json.dumps({"failed": "boom"}), encoding="utf-8")
+    finished = time.time() - age_days * 86400
+    for f in d.iterdir():
+        os.utime(f, (finished, finished))
+    return d
+
+
+def manager(root: Path, **kwargs) -> StorageManager:
+    processed = root / "processed"
+    processed.mkdir(exist_ok=True)
+    sm = StorageManager(processed_dir=processed, **kwargs)
+    sm.stats_file = root / "storage_stats.json"
+    return sm
+
+
+def test_collect_strips_expires_and_enforces_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        sm = manager(Path(tmp), budget_mb=2, retention_days=7)
+        root = sm.processed_dir
+        expired = work_dir(root, "expired", age_days=10)
+        failed = work_dir(root, "failed", state="failed", age_days=2)
+        running = work_dir(root, "running", state=None, age_days=30)
+        done = work_dir(root, "done", age_days=1)
+
+        reclaimed = sm.collect()
+        assert not expired.exists()
+        # Over the 2 MB budget, so the oldest finished dir goes whole
+        assert not failed.exists()
+        assert (running / "running_vertical.mp4").exists()
+        assert not (done / "done_vertical.mp4").exists()
+        assert (done / "done.ass").exists() and (done / REPORT_NAME).exists()
+        assert reclaimed["reclaimed_bytes"] >= 3 * MB
+        assert sm.get_status()["used_mb"] == 1.0
+
+
+def test_release_keeps_staged_intermediates():
+    with tempfile.TemporaryDirectory() as tmp:
+        sm = manager(Path(tmp))
+        fused = work_dir(sm.processed_dir, "fused")
+        staged = work_dir(sm.processed_dir, "staged", render_mode="staged")
+        running = work_dir(sm.processed_dir, "running", state=None)
+
+        assert sm.release(fused) == MB
+        assert not (fused / "fused_vertical.mp4").exists()
+        assert sm.release(staged) == 0
+        assert (staged / "staged_vertical.mp4").exists()
+        assert sm.release(running) == 0
+        sm.collect()
+        assert (staged / "staged_vertical.mp4").exists()
+
+
+def test_has_room_counts_the_job_scratch_space():
+    with tempfile.TemporaryDirectory() as tmp:
+        sm = manager(Path(tmp), min_free_mb=100)
+        clip = Path(tmp) / "clip.mp4"
+        clip.write_bytes(b"c" * (10 * MB))
+        with free_space(120) as set_free:
+            assert sm.has_room()
+            assert sm.has_room(clip)  # 1.5x → 15 MB
+            assert not sm.has_room(clip, "staged")  # 4x → 40 MB
+            set_free(99)
+            assert not sm.has_room()
+
+
+def test_batch_holds_clips_until_there_is_room():
+    with tempfile.TemporaryDirectory() as tmp:
+        sm = manager(Path(tmp), min_free_mb=100)
+        clips = []
+        for name in ("a.mp4", "b.mp4"):
+            clip = Path(tmp) / name
+            clip.write_bytes(b"c" * MB)
+            clips.append(clip)
+        retry = batch_renderer.LOW_DISK_RETRY_SECONDS
+        batch_renderer.LOW_DISK_RETRY_SECONDS = 0.05
+        try:
+            with free_space(50) as set_free:
+                # Workers are threads without a VideoEditor, so every clip "fails" fast
+                assert len(list(BatchRun(ThreadPoolExecutor(1), 1, clips, {}))) == 2
+
+                run = BatchRun(ThreadPoolExecutor(1), 1, clips, {}, storage=sm)
+                time.sleep(0.3)
+                assert run._submitted == 0
+                set_free(500)
+                assert [r["status"] for r in run] == ["failed", "failed"]
+
+                set_free(50)
+                run = BatchRun(ThreadPoolExecutor(1), 1, clips, {}, storage=sm)
+                time.sleep(0.1)
+                started = time.monotonic()
+                run.close()
+                assert list(run) == []
+                assert run._submitted == 0
+                assert time.monotonic() - started < 1
+        finally:
+            batch_renderer.LOW_DISK_RETRY_SECONDS = retry
+
+
+if __name__ == "__main__":
+    print("Testing StorageManager...")
+    test_collect_strips_expires_and_enforces_budget()
+    test_release_keeps_staged_intermediates()
+    test_has_room_counts_the_job_scratch_space()
+    print("Testing the batch low-disk hold...")
+    test_batch_holds_clips_until_there_is_room()
+    print("Success! Work dirs stay within budget and batches wait for disk space.")
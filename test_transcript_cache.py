@@ -0,0 +1,105 @@
+"""
+Tests for the Whisper TranscriptCache.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from caption_engine import BATCHED_OPTIONS, TRANSCRIBE_OPTIONS
+from transcript_cache import TranscriptCache
+
+SEGMENTS = [
+    {
+        "start": 0.123456,
+        "end": 1.5,
+        "text": "hello there",
+        "words": [
+            {"word": " hello", "start": 0.123456, "end": 0.6, "probability": 0.98765},
+            {"word": " there", "start": 0.7, "end": 1.5, "probability": 0.9},
+        ],
+    }
+]
+
+
+def samples(seed: int):
+    return np.random.default_rng(seed).standard_normal(16000).astype(np.float32)
+
+
+def test_key_covers_audio_model_and_options():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(cache_dir=Path(tmp))
+        key = cache.make_key(samples(0), "tiny", TRANSCRIBE_OPTIONS)
+        assert cache.make_key(samples(0), "tiny", TRANSCRIBE_OPTIONS) == key
+        assert cache.make_key(samples(1), "tiny", TRANSCRIBE_OPTIONS) != key
+        assert cache.make_key(samples(0), "base", TRANSCRIBE_OPTIONS) != key
+        assert cache.make_key(samples(0), "tiny", BATCHED_OPTIONS) != key
+        assert (
+            cache.make_key(samples(0).astype(np.float64), "tiny", TRANSCRIBE_OPTIONS)
+            != key
+        )
+
+
+def test_round_trip_at_millisecond_precision():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(cache_dir=Path(tmp))
+        cache.store("k", SEGMENTS)
+        segment = TranscriptCache(cache_dir=Path(tmp)).lookup("k")[0]
+        assert segment["start"] == 0.123 and segment["text"] == "hello there"
+        assert segment["words"][0] == {
+            "word": " hello",
+            "start": 0.123,
+            "end": 0.6,
+            "probability": 0.988,
+        }
+
+
+def test_missing_or_corrupt_entries_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(cache_dir=Path(tmp))
+        assert cache.lookup("absent") is None
+        cache.store("k", SEGMENTS)
+        (Path(tmp) / "k.json").write_text("{not json", encoding="utf-8")
+        assert cache.lookup("k") is None
+        assert cache.get_status()["entries"] == 0
+
+
+def test_least_recently_used_evicted_over_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(cache_dir=Path(tmp))
+        cache.store("a", SEGMENTS)
+        size = (Path(tmp) / "a.json").stat().st_size
+        cache.max_bytes = size * 2 + size // 2
+        time.sleep(0.01)
+        cache.store("b", SEGMENTS)
+        time.sleep(0.01)
+        assert cache.lookup("a")
+        time.sleep(0.01)
+        cache.store("c", SEGMENTS)
+
+        assert not (Path(tmp) / "b.json").exists()
+        assert cache.lookup("b") is None
+        assert cache.lookup("a") and cache.lookup("c")
+
+
+def test_zero_budget_keeps_nothing():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(max_mb=0, cache_dir=Path(tmp))
+        cache.store("k", SEGMENTS)
+        assert cache.lookup("k") is None
+
+
+if __name__ == "__main__":
+    print("Testing TranscriptCache...")
+    test_key_covers_audio_model_and_options()
+    test_round_trip_at_millisecond_precision()
+    test_missing_or_corrupt_entries_miss()
+    test_least_recently_used_evicted_over_budget()
+    test_zero_budget_keeps_nothing()
+    print("Success! Transcripts are keyed, rounded and evicted as expected.")
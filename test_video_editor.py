@@ -0,0 +1,219 @@
+"""
+Tests for VideoEditor's render settings and encoder helpers.
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+from unittest import mock
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+import video_editor
+from probe_cache import ProbeCache
+from video_editor import MIN_VIDEO_BITRATE, PROBE_FORMAT, SIZE_HEADROOM, VideoEditor
+
+
+def editor(tmp: Optional[Path] = None) -> VideoEditor:
+    """A VideoEditor without the FFmpeg check or caption engine; probes are cached under ``tmp``."""
+    ed = VideoEditor.__new__(VideoEditor)
+    ed.caption_engine = SimpleNamespace(model_size="tiny")
+    ed.ffmpeg_threads = 0
+    ed._local = threading.local()
+    if tmp:
+        ed.probe_cache = ProbeCache(
+            version=PROBE_FORMAT, index_path=tmp / "probe_cache.json"
+        )
+        ed.render_cache = SimpleNamespace(
+            make_key=lambda *args: "key", store=lambda *args: None
+        )
+    return ed
+
+
+def test_parse_bitrate():
+    ed = editor()
+    assert ed._parse_bitrate("5M") == 5_000_000
+    assert ed._parse_bitrate("128k") == 128_000
+    assert ed._parse_bitrate("1.5m") == 1_500_000
+    assert ed._parse_bitrate(" 600K ") == 600_000
+    assert ed._parse_bitrate("800000") == 800_000
+
+
+def test_target_bitrate_fits_budget():
+    ed = editor()
+    audio = ed._parse_bitrate(video_editor.AUDIO_BITRATE)
+    budget = 50 * 1024 * 1024
+    duration = 600
+    rate = ed._target_bitrate(duration, budget)
+    assert rate == int(budget * 8 * SIZE_HEADROOM / duration) - audio
+    assert (rate + audio) * duration / 8 <= budget
+
+
+def test_target_bitrate_clamps():
+    ed = editor()
+    # A short clip with room to spare never exceeds the configured bitrate
+    assert ed._target_bitrate(10, 287 * 1024 * 1024) == ed._parse_bitrate(
+        video_editor.VIDEO_BITRATE
+    )
+    # A budget that can't be met still gets a watchable floor
+    assert ed._target_bitrate(3600, 1024 * 1024) == MIN_VIDEO_BITRATE
+
+
+def test_render_settings_cover_encoder_knobs():
+    ed = editor()
+    base = ed._render_settings(False, False)
+    for name, value in (
+        ("VIDEO_MAXRATE", "9M"),
+        ("VIDEO_BUFSIZE", "20M"),
+        (
+            "VIDEO_VARIANTS",
+            {
+                "preview": {
+                    "width": 180,
+                    "height": 320,
+                    "bitrate": "300k",
+                    "audio_bitrate": "48k",
+                }
+            },
+        ),
+        ("VIDEO_CHUNK_SECONDS", 7),
+        ("VIDEO_CHUNKED_ENCODE_MIN_SECONDS", 30),
+        ("SPEECH_SKIP_CONFIDENCE", 0.95),
+    ):
+        original = getattr(video_editor, name)
+        setattr(video_editor, name, value)
+        try:
+            assert ed._render_settings(False, False) != base, name
+        finally:
+            setattr(video_editor, name, original)
+    assert ed._render_settings(False, False) == base
+
+
+def make_clip(path: Path, gop: int):
+    """4 s, 25 fps test clip with a keyframe every ``gop`` frames."""
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=180x320:rate=25:duration=4",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=frequency=220:duration=4",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            str(gop),
+            "-keyint_min",
+            str(gop),
+            "-sc_threshold",
+            "0",
+            "-c:a",
+            "aac",
+            "-shortest",
+            str(path),
+        ],
+        check=True,
+    )
+
+
+def test_chunked_encode_splits_at_keyframes_and_rejoins():
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        ed = editor(tmp)
+        ed.ffmpeg_threads = 2
+        gop_1s, one_gop = tmp / "gop_1s.mp4", tmp / "one_gop.mp4"
+        make_clip(gop_1s, gop=25)
+        make_clip(one_gop, gop=250)
+        with mock.patch.multiple(
+            video_editor,
+            PROCESSED_VIDEO_DIR=tmp,
+            VIDEO_CHUNKED_ENCODE_MIN_SECONDS=2,
+            VIDEO_CHUNK_SECONDS=1,
+        ):
+            assert [start for start, _ in ed._chunk_bounds(gop_1s, 4.0)] == [
+                0.0,
+                1.0,
+                2.0,
+                3.0,
+            ]
+            assert ed._final_encode(gop_1s, tmp / "chunked.mp4") == 4
+            probe = ed._probe_video(tmp / "chunked.mp4")
+            assert abs(probe["duration"] - 4.0) < 0.1, probe
+            assert probe["audio_codec"] == "aac", probe
+
+            # No interior keyframes: one plain encode, no chunk dir or concat
+            with mock.patch.object(ed, "_encode_chunked") as chunked:
+                assert ed._final_encode(one_gop, tmp / "single.mp4") == 0
+            assert not chunked.called
+            assert abs(ed._probe_video(tmp / "single.mp4")["duration"] - 4.0) < 0.1
+        assert not list(tmp.glob("chunks_*"))
+
+
+def test_short_clip_has_only_one_highlight():
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        ed = editor(tmp)
+        clip = tmp / "clip.mp4"
+        make_clip(clip, gop=25)
+        (tmp / "queue").mkdir()
+        with mock.patch.multiple(
+            video_editor,
+            PROCESSED_VIDEO_DIR=tmp,
+            UPLOAD_QUEUE_DIR=tmp / "queue",
+            VIDEO_WIDTH=180,
+            VIDEO_HEIGHT=320,
+            HIGHLIGHT_WINDOW_SECONDS=30,
+        ):
+            options = dict(
+                add_captions=False,
+                color_grade=False,
+                use_cache=False,
+                normalize_audio=False,
+            )
+            second = ed.process_video(clip, highlight=1, **options)
+            assert (
+                second["status"] == "failed" and "only highlight 0" in second["error"]
+            ), second
+            first = ed.process_video(clip, highlight=0, **options)
+            assert first["status"] == "ready", first.get("error")
+            assert first["highlight"] == {
+                "rank": 0,
+                "start": 0.0,
+                "end": 4.0,
+                "whole_clip": True,
+            }
+
+
+if __name__ == "__main__":
+    print("Checking VideoEditor bitrate targeting and render settings...")
+    test_parse_bitrate()
+    test_target_bitrate_fits_budget()
+    test_target_bitrate_clamps()
+    test_render_settings_cover_encoder_knobs()
+    print("Encoding in keyframe-aligned chunks...")
+    test_chunked_encode_splits_at_keyframes_and_rejoins()
+    print("Rendering highlights of a short clip...")
+    test_short_clip_has_only_one_highlight()
+    print(
+        "Success! Bitrates fit the size budget and every encoder setting changes the render cache key."
+    )
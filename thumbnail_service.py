@@ -0,0 +1,197 @@
+"""
+DIDGERI-BOOM Thumbnail Service
+Poster frames and hover-scrub sprite sheets, cached per file version.
+"""
+
+import hashlib
+import json
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR
+
+SPRITE_FRAMES = 8
+SPRITE_HEIGHT = 160
+POSTER_WIDTH = 360
+# Bump when the image layout changes (gives every thumbnail a new URL)
+THUMBNAIL_VERSION = 1
+
+
+class ThumbnailService:
+    """Builds a poster + sprite per video version and hands out their URLs.
+
+    Files are named by a hash of path, size and mtime, so a URL never
+    changes meaning and can be cached by browsers indefinitely. Missing
+    thumbnails are generated in the background; until then ``urls``
+    returns None.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DATA_DIR / "thumbnails",
+        url_prefix: str = "/thumbnails",
+        index_file: Path = DATA_DIR / "thumbnails_index.json",
+    ):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.url_prefix = url_prefix
+        # Kept outside cache_dir: that folder is served publicly and the
+        # index maps local video paths
+        self.index_file = index_file
+        legacy = self.cache_dir / "index.json"
+        if legacy.exists():
+            if not self.index_file.exists():
+                legacy.replace(self.index_file)
+            else:
+                legacy.unlink(missing_ok=True)
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+        # video path → key of its current thumbnails
+        self._index: dict[str, str] = self._load_index()
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def urls(self, path: Path, duration: float) -> Optional[dict]:
+        """Poster/sprite URLs for ``path``, queuing generation on a miss.
+
+        Only stats the file — ``duration`` comes from the caller's listing.
+        """
+        key = self._key(path)
+        if key is None:
+            return None
+        if (self.cache_dir / f"{key}_sprite.jpg").exists():
+            return {
+                "poster": f"{self.url_prefix}/{key}.jpg",
+                "sprite": f"{self.url_prefix}/{key}_sprite.jpg",
+                "sprite_frames": SPRITE_FRAMES,
+            }
+        with self._lock:
+            if key not in self._pending:
+                self._pending.add(key)
+                self._pool.submit(self._generate, Path(path), key, duration)
+        return None
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {"videos": len(self._index), "pending": len(self._pending)}
+
+    # ── Generation ───────────────────────────────────────────────
+
+    def _generate(self, path: Path, key: str, duration: float):
+        try:
+            self._extract(path, key, duration)
+            with self._lock:
+                old = self._index.get(str(path))
+                self._index[str(path)] = key
+                self._prune(old if old != key else None)
+                self._save_index()
+        except Exception as e:
+            print(f"[THUMBS] Could not thumbnail {path.name}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _extract(self, path: Path, key: str, duration: float):
+        """One FFmpeg run: an input-side (keyframe) seek per frame, nothing else decoded."""
+        last = max(0.0, duration - 0.5)
+        times = [min(last, duration * 0.1)]
+        times += [
+            min(last, duration * (i + 0.5) / SPRITE_FRAMES)
+            for i in range(SPRITE_FRAMES)
+        ]
+
+        cmd = ["ffmpeg", "-y", "-v", "error"]
+        for t in times:
+            cmd += [
+                "-noaccurate_seek",
+                "-ss",
+                f"{t:.3f}",
+                "-an",
+                "-sn",
+                "-dn",
+                "-i",
+                str(path),
+            ]
+        graph = [
+            f"[0:v]trim=end_frame=1,scale={POSTER_WIDTH}:-2,setsar=1,setpts=PTS-STARTPTS[poster]"
+        ]
+        for i in range(1, len(times)):
+            graph.append(
+                f"[{i}:v]trim=end_frame=1,scale=-2:{SPRITE_HEIGHT},setsar=1,setpts=PTS-STARTPTS[s{i}]"
+            )
+        graph.append(
+            "".join(f"[s{i}]" for i in range(1, len(times)))
+            + f"hstack=inputs={SPRITE_FRAMES}[sprite]"
+        )
+
+        poster = self.cache_dir / f".{key}.jpg"
+        sprite = self.cache_dir / f".{key}_sprite.jpg"
+        cmd += [
+            "-filter_complex",
+            ";".join(graph),
+            "-map",
+            "[poster]",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "3",
+            "-update",
+            "1",
+            str(poster),
+            "-map",
+            "[sprite]",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "5",
+            "-update",
+            "1",
+            str(sprite),
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-300:])
+        poster.replace(self.cache_dir / f"{key}.jpg")
+        # The sprite lands last — its presence marks the pair complete
+        sprite.replace(self.cache_dir / f"{key}_sprite.jpg")
+
+    # ── Helpers ──────────────────────────────────────────────────
+
+    def _key(self, path: Path) -> Optional[str]:
+        try:
+            st = Path(path).stat()
+        except OSError:
+            return None
+        fingerprint = (
+            f"{Path(path).resolve()}|{st.st_size}|{st.st_mtime_ns}|{THUMBNAIL_VERSION}"
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:20]
+
+    def _prune(self, stale_key: Optional[str]):
+        """Drop an outdated key plus thumbnails of videos that no longer exist (lock held)."""
+        stale = [stale_key] if stale_key else []
+        for video in [p for p in self._index if not Path(p).exists()]:
+            stale.append(self._index.pop(video))
+        for key in stale:
+            (self.cache_dir / f"{key}.jpg").unlink(missing_ok=True)
+            (self.cache_dir / f"{key}_sprite.jpg").unlink(missing_ok=True)
+
+    def _load_index(self) -> dict:
+        try:
+            if self.index_file.exists():
+                return json.loads(self.index_file.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+        return {}
+
+    def _save_index(self):
+        try:
+            tmp = self.index_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._index, indent=2), encoding="utf-8")
+            tmp.replace(self.index_file)
+        except Exception:
+            pass
@@ -0,0 +1,184 @@
+"""
+DIDGERI-BOOM Transcript Cache
+Whisper results keyed by the decoded audio, so re-renders skip transcription.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR, TRANSCRIPT_CACHE_MAX_MB
+
+# Bump when the stored layout changes (old entries are simply never hit)
+TRANSCRIPT_FORMAT = 1
+
+
+class TranscriptCache:
+    """Maps audio samples + model + transcription options to Whisper segments.
+
+    The key hashes the decoded samples rather than the file, so a clip
+    re-rendered with other grading, trimmed copies sharing a soundtrack
+    and renamed files all hit. Each transcript is one compact JSON file;
+    the index tracks sizes and last use for LRU eviction past ``max_mb``.
+    """
+
+    def __init__(
+        self,
+        max_mb: int = TRANSCRIPT_CACHE_MAX_MB,
+        cache_dir: Path = DATA_DIR / "transcripts",
+    ):
+        self.max_bytes = max_mb * 1024 * 1024
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self._lock = threading.RLock()
+        # key → {"size", "last_used"}
+        self._entries: dict = self._read_index()
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def make_key(self, samples, model_size: str, options: dict) -> str:
+        """Cache key for transcribing ``samples`` (a NumPy array) with this model/options."""
+        h = hashlib.sha256(samples.tobytes())
+        h.update(
+            json.dumps(
+                {
+                    "model": model_size,
+                    "options": options,
+                    "dtype": str(samples.dtype),
+                    "v": TRANSCRIPT_FORMAT,
+                },
+                sort_keys=True,
+            ).encode("utf-8")
+        )
+        return h.hexdigest()
+
+    def lookup(self, key: str) -> Optional[list[dict]]:
+        """Cached segments, or None."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            packed = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            # Missing or unreadable — remove the file so the index merge can't revive it
+            path.unlink(missing_ok=True)
+            with self._lock:
+                if self._entries.pop(key, None):
+                    self._save_index()
+            return None
+        with self._lock:
+            self._entries[key] = {"size": path.stat().st_size, "last_used": time.time()}
+            self._save_index()
+        return self._unpack(packed)
+
+    def store(self, key: str, segments: list[dict]):
+        """Save a transcript, evicting least-recently-used ones over budget."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps(
+                    self._pack(segments), separators=(",", ":"), ensure_ascii=False
+                ),
+                encoding="utf-8",
+            )
+            tmp.replace(path)
+        except Exception as e:
+            print(f"[CAPTION] Could not cache transcript: {e}")
+            return
+        with self._lock:
+            self._entries[key] = {"size": path.stat().st_size, "last_used": time.time()}
+            self._evict()
+            self._save_index()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_mb": round(
+                    sum(e["size"] for e in self._entries.values()) / (1024 * 1024), 2
+                ),
+                "max_mb": round(self.max_bytes / (1024 * 1024)),
+            }
+
+    # ── Encoding ─────────────────────────────────────────────────
+
+    def _pack(self, segments: list[dict]) -> list:
+        """[start, end, text, [[word, start, end, probability], ...]] with ms-precision times."""
+        return [
+            [
+                round(s["start"], 3),
+                round(s["end"], 3),
+                s["text"],
+                [
+                    [
+                        w["word"],
+                        round(w["start"], 3),
+                        round(w["end"], 3),
+                        round(w["probability"], 3),
+                    ]
+                    for w in s["words"]
+                ],
+            ]
+            for s in segments
+        ]
+
+    def _unpack(self, packed: list) -> list[dict]:
+        return [
+            {
+                "start": start,
+                "end": end,
+                "text": text,
+                "words": [
+                    {"word": w, "start": ws, "end": we, "probability": p}
+                    for w, ws, we, p in words
+                ],
+            }
+            for start, end, text, words in packed
+        ]
+
+    # ── Internals ────────────────────────────────────────────────
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._entries.values())
+        for key, entry in sorted(
+            self._entries.items(), key=lambda kv: kv[1]["last_used"]
+        ):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._entries[key]
+            (self.cache_dir / f"{key}.json").unlink(missing_ok=True)
+
+    def _read_index(self) -> dict:
+        try:
+            if self.index_path.exists():
+                return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+        return {}
+
+    def _save_index(self):
+        """Merge with entries saved by other processes, then write atomically."""
+        for key, entry in self._read_index().items():
+            mine = self._entries.get(key)
+            if mine is None or entry["last_used"] > mine["last_used"]:
+                self._entries[key] = entry
+        # Forget entries whose file another process evicted
+        self._entries = {
+            k: e
+            for k, e in self._entries.items()
+            if (self.cache_dir / f"{k}.json").exists()
+        }
+        self._evict()
+        try:
+            tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps(self._entries, separators=(",", ":")), encoding="utf-8"
+            )
+            tmp.replace(self.index_path)
+        except Exception:
+            pass
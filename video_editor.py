@@ -3,27 +3,98 @@ DIDGERI-BOOM Video Editor
 Automated video editing pipeline: raw → TikTok-ready vertical content.
 """
 
-import subprocess
 import json
-import shutil
-from pathlib import Path
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Optional
 
+try:
+    import resource
+except ImportError:  # Windows — no FFmpeg CPU or peak RSS figures
+    resource = None
+
+from caption_engine import CaptionEngine
 from config import (
-    VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS,
-    VIDEO_CODEC, AUDIO_CODEC, VIDEO_BITRATE, AUDIO_BITRATE,
-    RAW_VIDEO_DIR, PROCESSED_VIDEO_DIR, UPLOAD_QUEUE_DIR,
-    SUPPORTED_INPUT_FORMATS, TEMPLATES_DIR,
+    AUDIO_BITRATE,
+    AUDIO_CODEC,
+    AUDIO_LOUDNESS_RANGE,
+    AUDIO_LOUDNESS_TARGET,
+    AUDIO_NORMALIZE,
+    AUDIO_TRUE_PEAK,
+    HIGHLIGHT_WINDOW_SECONDS,
+    PROCESSED_VIDEO_DIR,
+    RAW_VIDEO_DIR,
+    SPEECH_PRESCAN,
+    SPEECH_SKIP_CONFIDENCE,
+    SUPPORTED_INPUT_FORMATS,
+    TEMPLATES_DIR,
+    UPLOAD_QUEUE_DIR,
+    VIDEO_BITRATE,
+    VIDEO_BUFSIZE,
+    VIDEO_CHUNK_SECONDS,
+    VIDEO_CHUNK_WORKERS,
+    VIDEO_CHUNKED_ENCODE_MIN_SECONDS,
+    VIDEO_CODEC,
+    VIDEO_FPS,
+    VIDEO_HEIGHT,
+    VIDEO_MAXRATE,
+    VIDEO_RATE_CONTROL,
+    VIDEO_RENDER_MODE,
+    VIDEO_TARGET_SIZE_MB,
+    VIDEO_VARIANTS,
+    VIDEO_WIDTH,
+)
+from dedup_index import DedupIndex
+from highlight_finder import HighlightFinder
+from pipeline_checkpoint import StageCheckpoints
+from probe_cache import ProbeCache
+from render_cache import RenderCache
+from template_cache import TemplateCache
+
+RENDER_MODES = ("fused", "stream", "staged")
+
+# Bump when the shape of _probe_video's result changes (invalidates the cache)
+PROBE_FORMAT = 4
+# Bump when a pipeline change alters output for the same inputs/settings
+RENDER_CACHE_VERSION = 5
+
+# Size-targeted rate control: share of the byte budget given to the streams
+# (the rest covers MP4 overhead and VBV slack), the video bitrate floor, and
+# how many lower-rate re-encodes an overshooting output gets
+SIZE_HEADROOM = 0.96
+MIN_VIDEO_BITRATE = 300_000
+SIZE_RETRIES = 2
+
+# Warm color grading: slight orange tint, boosted contrast, slight
+# vignette for cinematic feel, subtle sharpening
+COLOR_GRADE_FILTER = (
+    "eq=contrast=1.1:brightness=0.02:saturation=1.2," "vignette=PI/5," "unsharp=3:3:0.5"
 )
-from caption_engine import CaptionEngine
 
 
 class VideoEditor:
     """Processes raw video into TikTok-optimized vertical content."""
 
-    def __init__(self):
+    def __init__(self, ffmpeg_threads: int = 0):
         self.caption_engine = CaptionEngine()
+        # 0 lets FFmpeg pick; batch workers pass their share of the cores
+        self.ffmpeg_threads = ffmpeg_threads
+        self.probe_cache = ProbeCache(version=PROBE_FORMAT)
+        self.render_cache = RenderCache()
+        self.template_cache = TemplateCache()
+        self.highlight_finder = HighlightFinder()
+        self.dedup_index = DedupIndex()
+        # Per-thread telemetry sink for the process_video call in flight
+        self._local = threading.local()
+        # Set by the ingest watcher to serve pending listings from memory
+        self.pending_index = None
         self._verify_ffmpeg()
 
     def _verify_ffmpeg(self):
@@ -31,7 +102,8 @@ class VideoEditor:
         try:
             result = subprocess.run(
                 ["ffmpeg", "-version"],
-                capture_output=True, text=True,
+                capture_output=True,
+                text=True,
             )
             version_line = result.stdout.split("\n")[0] if result.stdout else "unknown"
             print(f"[VIDEO] FFmpeg ready: {version_line}")
@@ -47,108 +119,722 @@ class VideoEditor:
         add_intro: bool = False,
         add_outro: bool = False,
         color_grade: bool = True,
+        render_mode: Optional[str] = None,
+        progress: Optional[Callable[[str, dict], None]] = None,
+        use_cache: bool = True,
+        variants: Optional[list[str]] = None,
+        resume_dir: Optional[Path] = None,
+        normalize_audio: Optional[bool] = None,
+        highlight: Optional[int] = None,
     ) -> dict:
         """
         Full processing pipeline:
         1. Probe input → 2. Crop/pad to vertical → 3. Add captions
         4. Color grade → 5. Add intro/outro → 6. Export final
+
+        In "fused" mode (default) steps 2–4 and 6 are a single FFmpeg
+        filtergraph with one encode. "stream" runs each step as its own
+        FFmpeg process chained through pipes (raw NUT in between), so no
+        intermediate files hit the disk. "staged" runs one FFmpeg pass per
+        step and keeps every intermediate — use it for debugging.
+
+        With captions and grading off (or already baked in) and no
+        bumpers, an input that already meets the upload spec is only
+        remuxed with +faststart.
+
+        ``variants`` names extra renders from VIDEO_VARIANTS (preview,
+        Reels, Shorts…) produced from the same decode and filter pass as
+        the TikTok master; fused mode only.
+
+        ``progress(stage, info)`` is called as each step completes, and
+        with live FFmpeg stats (fps, speed, frames, bitrate) while a stage
+        runs. Per-stage timings are saved under "timings" in the report.
+        A clip already rendered with identical content, options and
+        settings is served from the render cache unless ``use_cache`` is off.
+
+        Audio is loudness-normalized to AUDIO_LOUDNESS_TARGET unless
+        ``normalize_audio`` is off: loudness is measured once (audio-only
+        decode, cached with the probe) and corrected with a linear
+        loudnorm inside whichever encode already runs.
+
+        ``highlight`` renders only the N-th best HIGHLIGHT_WINDOW_SECONDS
+        window of a longer session (0 = best), chosen by audio energy and
+        cut by stream copy before any stage decodes video. A clip no
+        longer than one window is its own highlight 0 (marked
+        ``whole_clip``); asking it for a later one is an error.
+
+        Every stage is checkpointed in the work dir (checkpoint.json).
+        Passing an interrupted run's work dir as ``resume_dir`` reuses it
+        and skips the stages whose outputs are still valid.
         """
         input_path = Path(input_path)
         if input_path.suffix.lower() not in SUPPORTED_INPUT_FORMATS:
             return {"error": f"Unsupported format: {input_path.suffix}"}
+        render_mode = render_mode or VIDEO_RENDER_MODE
+        if render_mode not in RENDER_MODES:
+            return {"error": f"Unknown render mode: {render_mode}"}
+        variants = sorted(set(variants or []))
+        unknown = [v for v in variants if v not in VIDEO_VARIANTS]
+        if unknown:
+            return {"error": f"Unknown variant(s): {', '.join(unknown)}"}
+        if variants and render_mode != "fused":
+            return {"error": "Variants require the fused render mode"}
+        if normalize_audio is None:
+            normalize_audio = AUDIO_NORMALIZE
+        if highlight is not None and highlight < 0:
+            return {"error": "highlight must be 0 or greater"}
+
+        options = {
+            "add_captions": add_captions,
+            "add_intro": add_intro,
+            "add_outro": add_outro,
+            "color_grade": color_grade,
+            "render_mode": render_mode,
+            "variants": variants,
+            "normalize_audio": normalize_audio,
+            "highlight": highlight,
+        }
+        settings = self._render_settings(add_intro, add_outro)
+        cache_key = self.render_cache.make_key(input_path, options, settings)
+        if use_cache:
+            cached = self.render_cache.lookup(cache_key)
+            if cached:
+                cached["cache_hit"] = True
+                if progress:
+                    progress(
+                        "cache_hit", {"state": "done", "at": datetime.now().isoformat()}
+                    )
+                return cached
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        stem = input_path.stem
-        work_dir = PROCESSED_VIDEO_DIR / f"{stem}_{timestamp}"
-        work_dir.mkdir(parents=True, exist_ok=True)
+        stem = (
+            input_path.stem
+            if highlight is None
+            else f"{input_path.stem}_hl{highlight + 1}"
+        )
+        if resume_dir and Path(resume_dir).is_dir():
+            # Keep the interrupted run's names so its checkpoints line up
+            work_dir = Path(resume_dir)
+            timestamp = work_dir.name[len(stem) + 1 :] or timestamp
+        else:
+            work_dir = PROCESSED_VIDEO_DIR / f"{stem}_{timestamp}"
+            work_dir.mkdir(parents=True, exist_ok=True)
+        checkpoints = StageCheckpoints(work_dir)
+        checkpoints.begin(input_path, options)
+        if progress:
+            progress("started", {"state": "running", "work_dir": str(work_dir)})
 
         result = {
             "input": str(input_path),
             "stem": stem,
+            "render_mode": render_mode,
+            "work_dir": str(work_dir),
             "started_at": datetime.now().isoformat(),
             "steps": [],
         }
 
+        def step(name: str):
+            result["steps"].append(name)
+            if progress:
+                progress(name, {"state": "done", "at": datetime.now().isoformat()})
+
+        result["timings"] = {}
+        result["rate_control"] = {}
+        self._local.run = {
+            "timings": result["timings"],
+            "rate_control": result["rate_control"],
+            "progress": progress,
+            "lock": threading.Lock(),
+        }
         try:
             # Step 1: Probe input
             probe = self._probe_video(input_path)
-            result["probe"] = probe
-            result["steps"].append("probed")
+            result["probe"] = {k: v for k, v in probe.items() if k != "highlights"}
+            step("probed")
+
+            final_path = UPLOAD_QUEUE_DIR / f"{stem}_{timestamp}_READY.mp4"
+
+            if (
+                highlight is not None
+                and probe.get("duration", 0) <= HIGHLIGHT_WINDOW_SECONDS
+            ):
+                # Shorter than one window: the whole clip is its only highlight
+                if highlight > 0:
+                    raise ValueError(
+                        f"Clip is {probe.get('duration', 0):.1f}s, shorter than one "
+                        f"{HIGHLIGHT_WINDOW_SECONDS}s highlight window — only highlight 0 exists"
+                    )
+                result["highlight"] = {
+                    "rank": 0,
+                    "start": 0.0,
+                    "end": round(probe.get("duration", 0), 2),
+                    "whole_clip": True,
+                }
+            # Long session: cut the chosen highlight (stream copy) before any rendering
+            elif highlight is not None:
+                segments = self.find_highlights(input_path, count=highlight + 1)
+                if len(segments) <= highlight:
+                    raise ValueError(f"Only {len(segments)} highlight(s) in this clip")
+                segment = segments[highlight]
+                trimmed_path = work_dir / f"{stem}.mp4"
+                source = input_path
+                segment["start"] = checkpoints.run(
+                    "trimmed",
+                    [source],
+                    [settings, segment],
+                    [trimmed_path],
+                    lambda: self._trim_copy(
+                        source, trimmed_path, segment["start"], segment["end"]
+                    ),
+                )
+                result["highlight"] = segment
+                input_path = trimmed_path
+                probe = self._probe_video(input_path)
+                step("trimmed")
+
+            af = None
+            if normalize_audio:
+                loudness = self._loudness(input_path, probe)
+                af = self._loudnorm_filter(loudness)
+                if loudness:
+                    result["loudness"] = {
+                        **loudness,
+                        "target_i": AUDIO_LOUDNESS_TARGET,
+                        "applied": bool(af),
+                    }
+
+            # Fast path: nothing to render and the input already meets the spec
+            nothing_to_render = not (
+                add_captions or color_grade or add_intro or add_outro or variants
+            )
+            if nothing_to_render and self._is_upload_ready(probe):
+                self._remux(input_path, final_path, af=af)
+                result["fast_path"] = "remux"
+                step("vertical_skipped")
+                step("encode_skipped")
+                step("remuxed")
+                step("exported")
+                return self._finish(
+                    final_path, work_dir, result, cache_key, checkpoints
+                )
+
+            if render_mode != "staged":
+                self._process_direct(
+                    input_path,
+                    work_dir,
+                    final_path,
+                    probe,
+                    result,
+                    add_captions=add_captions,
+                    add_intro=add_intro,
+                    add_outro=add_outro,
+                    color_grade=color_grade,
+                    render_mode=render_mode,
+                    variants=variants,
+                    step=step,
+                    checkpoints=checkpoints,
+                    settings=settings,
+                    af=af,
+                )
+                return self._finish(
+                    final_path, work_dir, result, cache_key, checkpoints
+                )
 
             # Step 2: Convert to vertical format
             vertical_path = work_dir / f"{stem}_vertical.mp4"
-            self._make_vertical(input_path, vertical_path, probe)
-            result["steps"].append("vertical")
+            checkpoints.run(
+                "vertical",
+                [input_path],
+                [settings, self._vertical_filter(probe)],
+                [vertical_path],
+                lambda: self._make_vertical(input_path, vertical_path, probe),
+            )
+            step("vertical")
             current = vertical_path
 
             # Step 3: Color grading
             if color_grade:
                 graded_path = work_dir / f"{stem}_graded.mp4"
-                self._apply_color_grade(current, graded_path)
-                result["steps"].append("color_graded")
+                checkpoints.run(
+                    "color_graded",
+                    [current],
+                    settings,
+                    [graded_path],
+                    lambda: self._apply_color_grade(vertical_path, graded_path),
+                )
+                step("color_graded")
                 current = graded_path
 
             # Step 4: Add captions
-            caption_data = None
             if add_captions:
-                caption_data = self.caption_engine.generate_captions(current)
+                source = current
                 captioned_path = work_dir / f"{stem}_captioned.mp4"
-                self._burn_captions(current, captioned_path, caption_data["ass_path"])
-                result["steps"].append("captioned")
-                result["caption_data"] = {
-                    "word_count": caption_data["word_count"],
-                    "duration": caption_data["duration"],
-                }
+
+                def caption_stage() -> dict:
+                    with self._timed("transcribe"):
+                        caption_data = self.caption_engine.generate_captions(source)
+                    self._burn_captions(
+                        source, captioned_path, caption_data["ass_path"]
+                    )
+                    return {
+                        "word_count": caption_data["word_count"],
+                        "duration": caption_data["duration"],
+                        "transcript_cached": caption_data["transcript_cached"],
+                        "speech_scan": caption_data["speech_scan"],
+                    }
+
+                result["caption_data"] = checkpoints.run(
+                    "captioned",
+                    [source],
+                    settings,
+                    [captioned_path],
+                    caption_stage,
+                )
+                step("captioned")
                 current = captioned_path
 
-            # Step 5: Add intro/outro
-            if add_intro or add_outro:
-                final_parts = []
-                if add_intro and (TEMPLATES_DIR / "intro.mp4").exists():
-                    final_parts.append(TEMPLATES_DIR / "intro.mp4")
-                final_parts.append(current)
-                if add_outro and (TEMPLATES_DIR / "outro.mp4").exists():
-                    final_parts.append(TEMPLATES_DIR / "outro.mp4")
-
-                if len(final_parts) > 1:
-                    concat_path = work_dir / f"{stem}_concat.mp4"
-                    self._concat_videos(final_parts, concat_path)
-                    result["steps"].append("intro_outro")
-                    current = concat_path
-
-            # Step 6: Final export (optimized for TikTok)
-            final_path = UPLOAD_QUEUE_DIR / f"{stem}_{timestamp}_READY.mp4"
-            self._final_encode(current, final_path)
-            result["steps"].append("exported")
-
-            # Get final file info
-            final_probe = self._probe_video(final_path)
-            result["output"] = str(final_path)
-            result["output_size_mb"] = round(final_path.stat().st_size / (1024 * 1024), 2)
-            result["output_duration"] = final_probe.get("duration", 0)
-            result["output_resolution"] = f"{final_probe.get('width', '?')}x{final_probe.get('height', '?')}"
-            result["completed_at"] = datetime.now().isoformat()
-            result["status"] = "ready"
-
-            # Save processing report
-            report_path = work_dir / "processing_report.json"
-            report_path.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+            # Step 5: Final export (optimized for TikTok)
+            parts = self._bumper_parts(current, add_intro, add_outro)
+            main_path = final_path if len(parts) == 1 else work_dir / f"{stem}_main.mp4"
+            source = current
+            budget = self._size_budget(parts, current)
+            chunks = checkpoints.run(
+                "encoded",
+                [source],
+                [settings, af],
+                [main_path],
+                lambda: self._final_encode(
+                    source, main_path, af=af, size_budget=budget
+                ),
+            )
+            if chunks:
+                result["encode_chunks"] = chunks
 
-            return result
+            # Step 6: Add intro/outro (pre-normalized, so a stream copy)
+            if len(parts) > 1:
+                parts[parts.index(current)] = main_path
+                checkpoints.run(
+                    "intro_outro",
+                    parts,
+                    settings,
+                    [final_path],
+                    lambda: self._concat_videos(parts, final_path),
+                )
+                step("intro_outro")
+            step("exported")
+
+            return self._finish(final_path, work_dir, result, cache_key, checkpoints)
 
         except Exception as e:
             result["error"] = str(e)
             result["status"] = "failed"
+            checkpoints.fail(str(e))
             return result
+        finally:
+            self._local.run = None
+
+    def _process_direct(
+        self,
+        input_path: Path,
+        work_dir: Path,
+        final_path: Path,
+        probe: dict,
+        result: dict,
+        add_captions: bool,
+        add_intro: bool,
+        add_outro: bool,
+        color_grade: bool,
+        render_mode: str,
+        variants: list[str],
+        step: Callable[[str], None],
+        checkpoints: StageCheckpoints,
+        settings: dict,
+        af: Optional[str] = None,
+    ):
+        """Fused or streamed render — one encode, no intermediate MP4s."""
+        ass_path = None
+        if add_captions:
+            ass_path = str(work_dir / f"{input_path.stem}.ass")
+
+            def caption_stage() -> dict:
+                # Audio is untouched by the video filters, so transcribe the source
+                with self._timed("transcribe"):
+                    caption_data = self.caption_engine.generate_captions(
+                        input_path, output_dir=work_dir
+                    )
+                return {
+                    "word_count": caption_data["word_count"],
+                    "duration": caption_data["duration"],
+                    "transcript_cached": caption_data["transcript_cached"],
+                    "speech_scan": caption_data["speech_scan"],
+                }
+
+            result["caption_data"] = checkpoints.run(
+                "captions",
+                [input_path],
+                settings,
+                [ass_path],
+                caption_stage,
+            )
+
+        parts = self._bumper_parts(input_path, add_intro, add_outro)
+        main_path = (
+            final_path if len(parts) == 1 else work_dir / f"{input_path.stem}_main.mp4"
+        )
+        render_inputs = [input_path] + ([ass_path] if ass_path else [])
+        budget = self._size_budget(parts, input_path)
+        duration = probe.get("duration", 0)
+
+        if render_mode == "stream":
+            checkpoints.run(
+                "rendered",
+                render_inputs,
+                [settings, render_mode, af],
+                [main_path],
+                lambda: self._rate_controlled(
+                    main_path,
+                    duration,
+                    budget,
+                    lambda bitrate: self._render_streamed(
+                        input_path,
+                        main_path,
+                        probe,
+                        color_grade,
+                        ass_path,
+                        af=af,
+                        bitrate=bitrate,
+                    ),
+                ),
+            )
+        else:
+            vf = self._build_filtergraph(
+                probe, color_grade=color_grade, ass_path=ass_path
+            )
+            result["filtergraph"] = vf
+            if variants:
+                outputs = [main_path] + [
+                    work_dir / f"{input_path.stem}_{name}.mp4" for name in variants
+                ]
+                result["variants"] = checkpoints.run(
+                    "rendered",
+                    render_inputs,
+                    [settings, vf, variants, af],
+                    outputs,
+                    lambda: self._rate_controlled(
+                        main_path,
+                        duration,
+                        budget,
+                        lambda bitrate: self._encode_variants(
+                            input_path,
+                            main_path,
+                            vf,
+                            variants,
+                            work_dir,
+                            af=af,
+                            bitrate=bitrate,
+                        ),
+                    ),
+                )
+            else:
+                chunks = checkpoints.run(
+                    "rendered",
+                    render_inputs,
+                    [settings, vf, af],
+                    [main_path],
+                    lambda: self._final_encode(
+                        input_path, main_path, vf=vf, af=af, size_budget=budget
+                    ),
+                )
+                if chunks:
+                    result["encode_chunks"] = chunks
+
+        if len(parts) > 1:
+            parts[parts.index(input_path)] = main_path
+            checkpoints.run(
+                "intro_outro",
+                parts,
+                settings,
+                [final_path],
+                lambda: self._concat_videos(parts, final_path),
+            )
+            main_path.unlink(missing_ok=True)
+
+        step("vertical")
+        if color_grade:
+            step("color_graded")
+        if add_captions:
+            step("captioned")
+        if len(parts) > 1:
+            step("intro_outro")
+        step("exported")
+
+    def _encode_variants(
+        self,
+        input_path: Path,
+        master_path: Path,
+        vf: str,
+        variants: list[str],
+        work_dir: Path,
+        af: Optional[str] = None,
+        bitrate: Optional[int] = None,
+    ) -> list[dict]:
+        """Encode the master plus each variant from one decode via ``split``."""
+        labels = [f"[v{i}]" for i in range(len(variants))]
+        graph = f"[0:v]{vf},split={len(variants) + 1}[master]{''.join(labels)}"
+        for i, name in enumerate(variants):
+            spec = VIDEO_VARIANTS[name]
+            graph += f";[v{i}]scale={spec['width']}:{spec['height']}[out{i}]"
+
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(input_path),
+            "-filter_complex",
+            graph,
+            "-map",
+            "[master]",
+            "-map",
+            "0:a:0?",
+            *self._video_encode_args(bitrate),
+            *self._audio_encode_args(af),
+            "-movflags",
+            "+faststart",
+            *self._thread_args(),
+            str(master_path),
+        ]
+        outputs = []
+        for i, name in enumerate(variants):
+            spec = VIDEO_VARIANTS[name]
+            path = work_dir / f"{input_path.stem}_{name}.mp4"
+            bitrate = self._parse_bitrate(spec["bitrate"])
+            cmd += [
+                "-map",
+                f"[out{i}]",
+                "-map",
+                "0:a:0?",
+                "-c:v",
+                VIDEO_CODEC,
+                "-preset",
+                "medium",
+                "-b:v",
+                spec["bitrate"],
+                "-maxrate",
+                str(int(bitrate * 1.25)),
+                "-bufsize",
+                str(bitrate * 2),
+                "-pix_fmt",
+                "yuv420p",
+                *(["-af", af] if af else []),
+                "-c:a",
+                AUDIO_CODEC,
+                "-b:a",
+                spec["audio_bitrate"],
+                "-ar",
+                "44100",
+                "-ac",
+                "2",
+                "-movflags",
+                "+faststart",
+                *self._thread_args(),
+                str(path),
+            ]
+            outputs.append((name, path, spec))
+        self._run_ffmpeg(cmd, "render_variants")
+
+        return [
+            {
+                "name": name,
+                "path": str(path),
+                "resolution": f"{spec['width']}x{spec['height']}",
+                "bitrate": spec["bitrate"],
+                "size_mb": round(path.stat().st_size / (1024 * 1024), 2),
+            }
+            for name, path, spec in outputs
+        ]
+
+    def _render_streamed(
+        self,
+        input_path: Path,
+        output_path: Path,
+        probe: dict,
+        color_grade: bool,
+        ass_path: Optional[str],
+        af: Optional[str] = None,
+        bitrate: Optional[int] = None,
+    ):
+        """Run each stage as its own FFmpeg, piping raw NUT between them."""
+        # Lossless raw video + PCM between stages; only the last one encodes
+        pipe_out = [
+            "-c:v",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "pcm_s16le",
+            *self._thread_args(),
+            "-f",
+            "nut",
+            "pipe:1",
+        ]
+        pipe_in = ["ffmpeg", "-y", "-f", "nut", "-i", "pipe:0"]
+
+        cmds = [
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(input_path),
+                "-vf",
+                self._vertical_filter(probe),
+                "-r",
+                str(VIDEO_FPS),
+                *pipe_out,
+            ]
+        ]
+        if color_grade:
+            cmds.append([*pipe_in, "-vf", COLOR_GRADE_FILTER, *pipe_out])
+        if ass_path:
+            cmds.append([*pipe_in, "-vf", self._ass_filter(ass_path), *pipe_out])
+        cmds.append(
+            self._final_encode_cmd(
+                "pipe:0", output_path, input_format="nut", af=af, bitrate=bitrate
+            )
+        )
+        self._run_piped(cmds, "render_streamed")
+
+    def _finish(
+        self,
+        final_path: Path,
+        work_dir: Path,
+        result: dict,
+        cache_key: str,
+        checkpoints: Optional[StageCheckpoints] = None,
+    ) -> dict:
+        """Record final file info, save the processing report and cache the render."""
+        final_probe = self._probe_video(final_path)
+        result["output"] = str(final_path)
+        result["output_size_mb"] = round(final_path.stat().st_size / (1024 * 1024), 2)
+        result["output_duration"] = final_probe.get("duration", 0)
+        result["output_resolution"] = (
+            f"{final_probe.get('width', '?')}x{final_probe.get('height', '?')}"
+        )
+        result["completed_at"] = datetime.now().isoformat()
+        result["status"] = "ready"
+        if checkpoints and checkpoints.resumed:
+            result["resumed_stages"] = checkpoints.resumed
+
+        report_path = work_dir / "processing_report.json"
+        report_path.write_text(
+            json.dumps(result, indent=2, default=str), encoding="utf-8"
+        )
+        self.render_cache.store(cache_key, result)
+        if checkpoints:
+            checkpoints.complete()
+        return result
+
+    def _render_settings(self, add_intro: bool, add_outro: bool) -> dict:
+        """Everything besides the input and options that shapes the output."""
+        settings = {
+            "version": RENDER_CACHE_VERSION,
+            "video": [VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, VIDEO_CODEC, VIDEO_BITRATE],
+            "rate_control": [
+                VIDEO_RATE_CONTROL,
+                VIDEO_TARGET_SIZE_MB,
+                VIDEO_MAXRATE,
+                VIDEO_BUFSIZE,
+            ],
+            "variants": VIDEO_VARIANTS,
+            # Chunk boundaries restart the encoder, so they shape the output too
+            "chunking": [VIDEO_CHUNKED_ENCODE_MIN_SECONDS, VIDEO_CHUNK_SECONDS],
+            "audio": [AUDIO_CODEC, AUDIO_BITRATE],
+            "loudness": [AUDIO_LOUDNESS_TARGET, AUDIO_TRUE_PEAK, AUDIO_LOUDNESS_RANGE],
+            "highlight_window": HIGHLIGHT_WINDOW_SECONDS,
+            "color_grade": COLOR_GRADE_FILTER,
+            "whisper_model": self.caption_engine.model_size,
+            "speech_prescan": [SPEECH_PRESCAN, SPEECH_SKIP_CONFIDENCE],
+        }
+        for name, wanted in (("intro", add_intro), ("outro", add_outro)):
+            template = TEMPLATES_DIR / f"{name}.mp4"
+            if wanted and template.exists():
+                settings[f"{name}_sha256"] = self.render_cache.content_hash(template)
+        return settings
+
+    def _bumper_parts(self, main: Path, add_intro: bool, add_outro: bool) -> list[Path]:
+        """Normalized intro/outro templates (when present) around the main clip."""
+        parts = []
+        if add_intro and (TEMPLATES_DIR / "intro.mp4").exists():
+            parts.append(self._normalized_template(TEMPLATES_DIR / "intro.mp4"))
+        parts.append(main)
+        if add_outro and (TEMPLATES_DIR / "outro.mp4").exists():
+            parts.append(self._normalized_template(TEMPLATES_DIR / "outro.mp4"))
+        return parts
+
+    def _normalized_template(self, template: Path) -> Path:
+        """Template re-encoded once to the exact output profile (cached)."""
+        profile = {
+            "size": [VIDEO_WIDTH, VIDEO_HEIGHT],
+            "video": self._video_encode_args(),
+            "audio": self._audio_encode_args(),
+        }
+        return self.template_cache.get(template, profile, self._normalize_template)
+
+    def _normalize_template(self, template: Path, output_path: Path):
+        """Encode a bumper with the same geometry, codecs and audio layout as main clips."""
+        probe = self._probe_video(template)
+        vf = (
+            f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
+            f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black,"
+            f"setsar=1,fps={VIDEO_FPS},format=yuv420p"
+        )
+        cmd = ["ffmpeg", "-y", "-i", str(template)]
+        if probe.get("audio_codec"):
+            cmd += ["-map", "0:v:0", "-map", "0:a:0"]
+        else:
+            # Silent bumper — add a silent track so every part has audio
+            cmd += [
+                "-f",
+                "lavfi",
+                "-i",
+                "anullsrc=r=44100:cl=stereo",
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a:0",
+                "-shortest",
+            ]
+        cmd += [
+            "-vf",
+            vf,
+            *self._video_encode_args(),
+            *self._audio_encode_args(),
+            "-movflags",
+            "+faststart",
+            *self._thread_args(),
+            str(output_path),
+        ]
+        self._run_ffmpeg(cmd, f"template_{template.stem}")
 
     # ── FFmpeg Operations ────────────────────────────────────────
 
     def _probe_video(self, path: Path) -> dict:
+        """Get video metadata, from the probe cache when the file is unchanged."""
+        probe = self.probe_cache.get(path)
+        if probe is None:
+            probe = self._run_ffprobe(path)
+            self.probe_cache.put(path, probe)
+        return probe
+
+    def _run_ffprobe(self, path: Path) -> dict:
         """Get video metadata using ffprobe."""
         cmd = [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format", "-show_streams",
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
             str(path),
         ]
         result = subprocess.run(cmd, capture_output=True, text=True)
@@ -162,134 +848,865 @@ class VideoEditor:
             (s for s in data.get("streams", []) if s.get("codec_type") == "video"),
             {},
         )
+        audio_stream = next(
+            (s for s in data.get("streams", []) if s.get("codec_type") == "audio"),
+            {},
+        )
         return {
             "width": int(video_stream.get("width", 0)),
             "height": int(video_stream.get("height", 0)),
             "duration": float(data.get("format", {}).get("duration", 0)),
             "fps": self._parse_fps(video_stream.get("r_frame_rate", "30/1")),
             "codec": video_stream.get("codec_name", "unknown"),
+            "audio_codec": audio_stream.get("codec_name"),
+            "pix_fmt": video_stream.get("pix_fmt"),
+            "bit_rate": int(
+                video_stream.get("bit_rate")
+                or data.get("format", {}).get("bit_rate")
+                or 0
+            ),
             "size_mb": round(
                 int(data.get("format", {}).get("size", 0)) / (1024 * 1024), 2
             ),
         }
 
-    def _make_vertical(self, input_path: Path, output_path: Path, probe: dict):
-        """Convert video to 9:16 vertical format (1080x1920)."""
+    def _vertical_filter(self, probe: dict) -> str:
+        """Filter chain converting any input to 9:16 vertical (1080x1920)."""
         w = probe.get("width", 1920)
         h = probe.get("height", 1080)
         aspect = w / h if h > 0 else 1.78
 
         if aspect > 0.5625:
             # Landscape → crop to vertical (center crop)
-            vf = (
+            return (
                 f"crop=ih*(9/16):ih,"
                 f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black,"
+                f"setsar=1"
             )
         elif aspect < 0.5:
             # Ultra-tall → scale and pad
-            vf = (
+            return (
                 f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black,"
+                f"setsar=1"
             )
         else:
             # Already roughly vertical → scale to fit
-            vf = (
+            return (
                 f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+                f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black,"
+                f"setsar=1"
             )
 
+    def _ass_filter(self, ass_path: str) -> str:
+        """ASS subtitle filter with the path escaped for FFmpeg."""
+        # Escape path for FFmpeg filter (Windows backslashes)
+        escaped_path = ass_path.replace("\\", "/").replace(":", "\\:")
+        return f"ass={escaped_path}"
+
+    def _build_filtergraph(
+        self,
+        probe: dict,
+        color_grade: bool = True,
+        ass_path: Optional[str] = None,
+    ) -> str:
+        """Fused chain: crop/scale/pad → eq/vignette/unsharp → ass → fps/format."""
+        filters = [self._vertical_filter(probe)]
+        if color_grade:
+            filters.append(COLOR_GRADE_FILTER)
+        if ass_path:
+            filters.append(self._ass_filter(ass_path))
+        filters.append(f"fps={VIDEO_FPS}")
+        filters.append("format=yuv420p")
+        return ",".join(filters)
+
+    def _make_vertical(self, input_path: Path, output_path: Path, probe: dict):
+        """Convert video to 9:16 vertical format (1080x1920)."""
+        vf = self._vertical_filter(probe)
+
         cmd = [
-            "ffmpeg", "-y",
-            "-i", str(input_path),
-            "-vf", vf,
-            "-c:v", VIDEO_CODEC,
-            "-b:v", VIDEO_BITRATE,
-            "-c:a", AUDIO_CODEC,
-            "-b:a", AUDIO_BITRATE,
-            "-r", str(VIDEO_FPS),
-            "-movflags", "+faststart",
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(input_path),
+            "-vf",
+            vf,
+            "-c:v",
+            VIDEO_CODEC,
+            "-b:v",
+            VIDEO_BITRATE,
+            "-c:a",
+            AUDIO_CODEC,
+            "-b:a",
+            AUDIO_BITRATE,
+            "-r",
+            str(VIDEO_FPS),
+            "-movflags",
+            "+faststart",
+            *self._thread_args(),
             str(output_path),
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
+        self._run_ffmpeg(cmd, "vertical", probe.get("duration", 0))
 
     def _apply_color_grade(self, input_path: Path, output_path: Path):
         """Apply cinematic color grading — warm tones for outback/earthy feel."""
-        vf = (
-            # Warm color grading: slight orange tint, boosted contrast
-            "eq=contrast=1.1:brightness=0.02:saturation=1.2,"
-            # Slight vignette for cinematic feel
-            "vignette=PI/5,"
-            # Subtle sharpening
-            "unsharp=3:3:0.5"
-        )
         cmd = [
-            "ffmpeg", "-y",
-            "-i", str(input_path),
-            "-vf", vf,
-            "-c:v", VIDEO_CODEC,
-            "-b:v", VIDEO_BITRATE,
-            "-c:a", "copy",
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(input_path),
+            "-vf",
+            COLOR_GRADE_FILTER,
+            "-c:v",
+            VIDEO_CODEC,
+            "-b:v",
+            VIDEO_BITRATE,
+            "-c:a",
+            "copy",
+            *self._thread_args(),
             str(output_path),
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
+        self._run_ffmpeg(cmd, "color_grade")
 
     def _burn_captions(self, input_path: Path, output_path: Path, ass_path: str):
         """Burn ASS subtitles into the video."""
-        # Escape path for FFmpeg filter (Windows backslashes)
-        escaped_path = ass_path.replace("\\", "/").replace(":", "\\:")
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(input_path),
+            "-vf",
+            self._ass_filter(ass_path),
+            "-c:v",
+            VIDEO_CODEC,
+            "-b:v",
+            VIDEO_BITRATE,
+            "-c:a",
+            "copy",
+            *self._thread_args(),
+            str(output_path),
+        ]
+        self._run_ffmpeg(cmd, "burn_captions")
 
+    def _is_upload_ready(self, probe: dict) -> bool:
+        """True if the input already matches the output spec and size/bitrate caps."""
+        return (
+            probe.get("width") == VIDEO_WIDTH
+            and probe.get("height") == VIDEO_HEIGHT
+            and probe.get("codec") == "h264"
+            and probe.get("pix_fmt") == "yuv420p"
+            and probe.get("audio_codec") == "aac"
+            and abs(probe.get("fps", 0) - VIDEO_FPS) < 0.05
+            and 0 < probe.get("bit_rate", 0) <= self._parse_bitrate(VIDEO_MAXRATE)
+            and probe.get("size_mb", 0) <= VIDEO_TARGET_SIZE_MB
+        )
+
+    def _remux(self, input_path: Path, output_path: Path, af: Optional[str] = None):
+        """Copy streams into a fresh MP4 with the moov atom up front.
+
+        With ``af`` the audio is re-encoded through it; video is still copied.
+        """
+        audio = [*self._audio_encode_args(af)] if af else ["-c:a", "copy"]
         cmd = [
-            "ffmpeg", "-y",
-            "-i", str(input_path),
-            "-vf", f"ass={escaped_path}",
-            "-c:v", VIDEO_CODEC,
-            "-b:v", VIDEO_BITRATE,
-            "-c:a", "copy",
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(input_path),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0",
+            "-c:v",
+            "copy",
+            *audio,
+            "-movflags",
+            "+faststart",
             str(output_path),
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
+        self._run_ffmpeg(cmd, "remux")
+
+    def _trim_copy(
+        self, input_path: Path, output_path: Path, start: float, end: float
+    ) -> float:
+        """Cut ``start``–``end`` by stream copy, beginning on the keyframe at or before ``start``.
+
+        Returns the actual start time, so the cut never opens on frames
+        that can't be decoded.
+        """
+        keyframes = [k for k in self._keyframe_times(input_path) if k <= start + 0.001]
+        cut = keyframes[-1] if keyframes else 0.0
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            f"{cut:.3f}",
+            "-i",
+            str(input_path),
+            "-t",
+            f"{end - cut:.3f}",
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
+            "-c",
+            "copy",
+            "-avoid_negative_ts",
+            "make_zero",
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ]
+        self._run_ffmpeg(cmd, "trim", end - cut)
+        return cut
 
     def _concat_videos(self, parts: list[Path], output_path: Path):
-        """Concatenate multiple video segments (intro + main + outro)."""
-        list_file = output_path.parent / "concat_list.txt"
-        lines = [f"file '{p}'" for p in parts]
-        list_file.write_text("\n".join(lines), encoding="utf-8")
+        """Concatenate multiple video segments (intro + main + outro).
+
+        All parts share one encode profile, so this is a pure stream copy.
+        The result must run as long as the parts combined — a part the
+        demuxer silently skipped would otherwise ship as a short video.
+        """
+        list_file = output_path.with_suffix(".concat.txt")
+        self._write_concat_list(list_file, parts)
 
         cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(list_file),
-            "-c", "copy",
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_file),
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
             str(output_path),
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
+        self._run_ffmpeg(cmd, "concat")
         list_file.unlink(missing_ok=True)
 
-    def _final_encode(self, input_path: Path, output_path: Path):
-        """Final encoding pass optimized for TikTok upload."""
-        cmd = [
-            "ffmpeg", "-y",
-            "-i", str(input_path),
-            "-c:v", VIDEO_CODEC,
-            "-preset", "medium",
-            "-crf", "23",
-            "-b:v", VIDEO_BITRATE,
-            "-maxrate", "5M",
-            "-bufsize", "10M",
-            "-c:a", AUDIO_CODEC,
-            "-b:a", AUDIO_BITRATE,
-            "-ar", "44100",
-            "-r", str(VIDEO_FPS),
-            "-movflags", "+faststart",
-            "-pix_fmt", "yuv420p",
+        expected = sum(self._probe_video(p).get("duration", 0) for p in parts)
+        actual = self._probe_video(output_path).get("duration", 0)
+        if actual < expected - max(0.5, expected * 0.01):
+            output_path.unlink(missing_ok=True)
+            raise RuntimeError(
+                f"concat produced {actual:.1f}s of an expected {expected:.1f}s"
+            )
+
+    def _final_encode(
+        self,
+        input_path: Path,
+        output_path: Path,
+        vf: Optional[str] = None,
+        af: Optional[str] = None,
+        size_budget: Optional[int] = None,
+    ) -> int:
+        """Final encoding pass optimized for TikTok upload.
+
+        ``vf`` lets the fused pipeline run its whole filtergraph inside
+        this single encode. Clips longer than VIDEO_CHUNKED_ENCODE_MIN_SECONDS
+        are encoded as parallel segments; returns the segment count
+        (0 for a single-process encode). The output is kept within
+        ``size_budget`` bytes (see _rate_controlled).
+        """
+        duration = self._probe_video(input_path).get("duration", 0)
+        # A source without interior keyframes can't be split: encode it in one go
+        bounds = (
+            self._chunk_bounds(input_path, duration)
+            if duration > VIDEO_CHUNKED_ENCODE_MIN_SECONDS
+            else []
+        )
+
+        def encode(bitrate: Optional[int]) -> int:
+            if len(bounds) > 1:
+                return self._encode_chunked(
+                    input_path,
+                    output_path,
+                    duration,
+                    bounds,
+                    vf=vf,
+                    af=af,
+                    bitrate=bitrate,
+                )
+            cmd = self._final_encode_cmd(
+                str(input_path), output_path, vf=vf, af=af, bitrate=bitrate
+            )
+            self._run_ffmpeg(cmd, "encode", duration)
+            return 0
+
+        return self._rate_controlled(output_path, duration, size_budget, encode)
+
+    def _final_encode_cmd(
+        self,
+        source: str,
+        output_path: Path,
+        vf: Optional[str] = None,
+        input_format: Optional[str] = None,
+        af: Optional[str] = None,
+        bitrate: Optional[int] = None,
+    ) -> list[str]:
+        """FFmpeg command for the final encode (``source`` may be pipe:0)."""
+        cmd = ["ffmpeg", "-y"]
+        if input_format:
+            cmd += ["-f", input_format]
+        cmd += ["-i", source]
+        if vf:
+            cmd += ["-vf", vf]
+        cmd += [
+            *self._video_encode_args(bitrate),
+            *self._audio_encode_args(af),
+            "-movflags",
+            "+faststart",
+            *self._thread_args(),
             str(output_path),
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
+        return cmd
+
+    def _video_encode_args(self, bitrate: Optional[int] = None) -> list[str]:
+        """Encoder settings; ``bitrate`` (bits/s) forces average-bitrate mode."""
+        args = ["-c:v", VIDEO_CODEC, "-preset", "medium"]
+        if bitrate is None and VIDEO_RATE_CONTROL == "crf":
+            args += [
+                "-crf",
+                "23",
+                "-b:v",
+                VIDEO_BITRATE,
+                "-maxrate",
+                VIDEO_MAXRATE,
+                "-bufsize",
+                VIDEO_BUFSIZE,
+            ]
+        else:
+            rate = bitrate or self._parse_bitrate(VIDEO_BITRATE)
+            # VBV cap: 1.5x the average, never above VIDEO_MAXRATE
+            maxrate = max(
+                rate, min(int(rate * 1.5), self._parse_bitrate(VIDEO_MAXRATE))
+            )
+            args += [
+                "-b:v",
+                str(rate),
+                "-maxrate",
+                str(maxrate),
+                "-bufsize",
+                str(maxrate * 2),
+            ]
+        if VIDEO_CODEC == "libx264":
+            # Rate-control-independent headers, so bumpers and chunks encoded
+            # at other rates still stream-copy into one file
+            args += ["-x264-params", "stitchable=1"]
+        return args + ["-r", str(VIDEO_FPS), "-pix_fmt", "yuv420p"]
+
+    def _audio_encode_args(self, af: Optional[str] = None) -> list[str]:
+        return [
+            *(["-af", af] if af else []),
+            "-c:a",
+            AUDIO_CODEC,
+            "-b:a",
+            AUDIO_BITRATE,
+            "-ar",
+            "44100",
+            "-ac",
+            "2",
+        ]
+
+    # ── Rate Control ─────────────────────────────────────────────
+
+    def _size_budget(self, parts: list[Path], main: Path) -> int:
+        """Bytes left for the main render once the bumpers are accounted for."""
+        bumpers = sum(p.stat().st_size for p in parts if p != main)
+        return int(VIDEO_TARGET_SIZE_MB * 1024 * 1024) - bumpers
+
+    def _target_bitrate(self, duration: float, budget: int) -> int:
+        """Video bits/s that fits ``budget`` bytes over ``duration`` seconds."""
+        audio = self._parse_bitrate(AUDIO_BITRATE)
+        fit = int(budget * 8 * SIZE_HEADROOM / duration) - audio
+        return max(MIN_VIDEO_BITRATE, min(self._parse_bitrate(VIDEO_BITRATE), fit))
+
+    def _rate_controlled(
+        self,
+        output_path: Path,
+        duration: float,
+        size_budget: Optional[int],
+        encode: Callable[[Optional[int]], object],
+    ):
+        """Run ``encode(video_bitrate)`` and re-encode lower if the output overshoots.
+
+        In "size" mode the first attempt already targets the budget; in
+        "crf" mode it runs at the configured quality. An overshoot is
+        retried at the bitrate actually achieved, scaled down by the
+        overshoot. Returns whatever ``encode`` returned.
+        """
+        budget = size_budget or int(VIDEO_TARGET_SIZE_MB * 1024 * 1024)
+        bitrate = None
+        if VIDEO_RATE_CONTROL == "size" and duration:
+            bitrate = self._target_bitrate(duration, budget)
+
+        attempts = 0
+        while True:
+            value = encode(bitrate)
+            attempts += 1
+            size = output_path.stat().st_size
+            if size <= budget or not duration:
+                break
+            achieved = int(size * 8 / duration) - self._parse_bitrate(AUDIO_BITRATE)
+            retry = max(
+                MIN_VIDEO_BITRATE, int(achieved * budget / size * SIZE_HEADROOM)
+            )
+            if attempts > SIZE_RETRIES or (bitrate is not None and retry >= bitrate):
+                # Never leave an oversize file where the uploader would pick it up
+                output_path.unlink(missing_ok=True)
+                raise RuntimeError(
+                    f"{output_path.name} is {size / (1024 * 1024):.2f} MB after {attempts} encode(s), "
+                    f"over the {budget / (1024 * 1024):.2f} MB budget"
+                )
+            bitrate = retry
+            print(
+                f"[VIDEO] {output_path.name} overshot by {size - budget} bytes — re-encoding at {bitrate // 1000}k"
+            )
+
+        run = getattr(self._local, "run", None)
+        if run:
+            with run["lock"]:
+                run["rate_control"].update(
+                    {
+                        "mode": VIDEO_RATE_CONTROL,
+                        "video_bitrate": bitrate,
+                        "budget_mb": round(budget / (1024 * 1024), 2),
+                        "attempts": attempts,
+                    }
+                )
+        return value
+
+    # ── Loudness ─────────────────────────────────────────────────
+
+    def _loudness(self, path: Path, probe: dict) -> Optional[dict]:
+        """EBU R128 measurement for ``path``, cached alongside its probe."""
+        if "loudness" not in probe:
+            with self._timed("loudness"):
+                probe["loudness"] = (
+                    self._measure_loudness(path) if probe.get("audio_codec") else None
+                )
+            self.probe_cache.put(path, probe)
+        return probe["loudness"]
+
+    def _measure_loudness(self, path: Path) -> Optional[dict]:
+        """First loudnorm pass: decode the audio only and read its stats."""
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            str(path),
+            "-map",
+            "0:a:0",
+            "-vn",
+            "-sn",
+            "-dn",
+            "-af",
+            self._loudnorm_args() + ":print_format=json",
+            "-f",
+            "null",
+            "-",
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        stats = result.stderr[result.stderr.rfind("{") : result.stderr.rfind("}") + 1]
+        try:
+            data = json.loads(stats)
+            measured = {
+                key: float(data[key])
+                for key in ("input_i", "input_tp", "input_lra", "input_thresh")
+            }
+        except (ValueError, KeyError):
+            return None
+        # Digital silence measures as -inf; there is nothing to normalize
+        if any(v != v or abs(v) == float("inf") for v in measured.values()):
+            return None
+        return measured
+
+    def _loudnorm_filter(self, loudness: Optional[dict]) -> Optional[str]:
+        """Second loudnorm pass as an ``-af`` chain, or None if already on target."""
+        if not loudness:
+            return None
+        if (
+            abs(loudness["input_i"] - AUDIO_LOUDNESS_TARGET) < 0.5
+            and loudness["input_tp"] <= AUDIO_TRUE_PEAK
+        ):
+            return None
+        return (
+            f"{self._loudnorm_args()}"
+            f":measured_I={loudness['input_i']}:measured_TP={loudness['input_tp']}"
+            f":measured_LRA={loudness['input_lra']}:measured_thresh={loudness['input_thresh']}"
+            ":linear=true:print_format=none"
+        )
+
+    def _loudnorm_args(self) -> str:
+        return f"loudnorm=I={AUDIO_LOUDNESS_TARGET}:TP={AUDIO_TRUE_PEAK}:LRA={AUDIO_LOUDNESS_RANGE}"
+
+    # ── Chunked Encoding ─────────────────────────────────────────
+
+    def _encode_chunked(
+        self,
+        input_path: Path,
+        output_path: Path,
+        duration: float,
+        bounds: list[tuple[float, Optional[float]]],
+        vf: Optional[str] = None,
+        af: Optional[str] = None,
+        bitrate: Optional[int] = None,
+    ) -> int:
+        """Encode keyframe-aligned segments in parallel, then stream-copy concat.
+
+        Video segments (``bounds``, from _chunk_bounds) and the (single,
+        unsplit) audio track are encoded by concurrent FFmpeg processes
+        with identical settings; the concat demuxer stitches the video
+        back together and muxes the audio in.
+        """
+        cpus = self.ffmpeg_threads or os.cpu_count() or 1
+        workers = max(1, min(VIDEO_CHUNK_WORKERS, cpus, len(bounds)))
+        threads = max(1, cpus // workers)
+
+        with tempfile.TemporaryDirectory(
+            dir=PROCESSED_VIDEO_DIR, prefix="chunks_"
+        ) as tmp:
+            tmp_dir = Path(tmp).resolve()
+            audio_path = tmp_dir / "audio.m4a"
+            jobs = [
+                (
+                    "encode_audio",
+                    duration,
+                    [
+                        "ffmpeg",
+                        "-y",
+                        "-i",
+                        str(input_path),
+                        "-vn",
+                        *self._audio_encode_args(af),
+                        *self._thread_args(threads),
+                        str(audio_path),
+                    ],
+                )
+            ]
+            chunk_paths = []
+            for i, (start, end) in enumerate(bounds):
+                chunk_path = tmp_dir / f"chunk_{i:04d}.mp4"
+                chunk_paths.append(chunk_path)
+                cmd = ["ffmpeg", "-y", "-ss", f"{start:.3f}", "-i", str(input_path)]
+                if end is not None:
+                    cmd += ["-t", f"{end - start:.3f}"]
+                if vf:
+                    # Give filters (ass in particular) the original timeline
+                    cmd += [
+                        "-vf",
+                        f"setpts=PTS-STARTPTS+{start:.3f}/TB,{vf},setpts=PTS-STARTPTS",
+                    ]
+                cmd += [
+                    "-an",
+                    *self._video_encode_args(bitrate),
+                    *self._thread_args(threads),
+                    str(chunk_path),
+                ]
+                jobs.append((f"encode_chunk_{i}", (end or duration) - start, cmd))
+
+            # Pool threads don't see this thread's telemetry sink — pass it on
+            run = getattr(self._local, "run", None)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(
+                    pool.map(
+                        lambda job: self._run_ffmpeg(job[2], job[0], job[1], run=run),
+                        jobs,
+                    )
+                )
+
+            list_file = tmp_dir / "chunks.txt"
+            self._write_concat_list(list_file, chunk_paths)
+            cmd = [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(list_file),
+                "-i",
+                str(audio_path),
+                "-map",
+                "0:v",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                str(output_path),
+            ]
+            self._run_ffmpeg(cmd, "encode_concat")
+        return len(bounds)
+
+    def _write_concat_list(self, list_file: Path, parts: list[Path]):
+        """Concat-demuxer list with absolute paths.
+
+        The demuxer resolves relative entries against the list file's own
+        folder, so a relative PROCESSED_VIDEO_DIR (as in .env) would point
+        every entry at a file that doesn't exist.
+        """
+        lines = []
+        for part in parts:
+            escaped = str(Path(part).resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped}'")
+        list_file.write_text("\n".join(lines), encoding="utf-8")
+
+    def _chunk_bounds(
+        self, path: Path, duration: float
+    ) -> list[tuple[float, Optional[float]]]:
+        """Split points near every VIDEO_CHUNK_SECONDS, snapped to keyframes."""
+        keyframes = self._keyframe_times(path)
+        cuts = []
+        target = VIDEO_CHUNK_SECONDS
+        while target < duration - VIDEO_CHUNK_SECONDS / 2:
+            cut = min(keyframes, key=lambda k: abs(k - target)) if keyframes else target
+            if cut > (cuts[-1] if cuts else 0):
+                cuts.append(cut)
+            target += VIDEO_CHUNK_SECONDS
+        starts = [0.0] + cuts
+        return list(zip(starts, cuts + [None]))
+
+    def _keyframe_times(self, path: Path) -> list[float]:
+        """Keyframe timestamps, read from packet flags (demux only, no decode)."""
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(path),
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        times = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(",")
+            if "K" in flags:
+                try:
+                    times.append(float(pts))
+                except ValueError:
+                    continue
+        return sorted(times)
+
+    def _run_piped(self, cmds: list[list[str]], stage: str):
+        """Run FFmpeg commands as a pipeline, stdout of each feeding the next.
+
+        Telemetry comes from the last command, which writes the file and
+        so sets the pace for the whole chain.
+        """
+        procs = []
+        upstream = None
+        with tempfile.TemporaryFile() as err:
+            for i, cmd in enumerate(cmds):
+                last = i == len(cmds) - 1
+                if last:
+                    cmd = self._with_progress(cmd)
+                proc = subprocess.Popen(
+                    cmd,
+                    stdin=upstream.stdout if upstream else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=err,
+                    text=last,
+                )
+                if upstream:
+                    # Let the upstream stage see EPIPE if this one dies
+                    upstream.stdout.close()
+                procs.append(proc)
+                upstream = proc
+
+            self._watch_progress(procs[-1], stage)
+            codes = self._reap(procs, stage)
+            for cmd, code in zip(cmds, codes):
+                if code:
+                    raise self._ffmpeg_error(code, cmd, err)
+
+    # ── Telemetry ────────────────────────────────────────────────
+
+    def _run_ffmpeg(
+        self,
+        cmd: list[str],
+        stage: str,
+        duration: float = 0,
+        run: Optional[dict] = None,
+    ):
+        """Run FFmpeg with ``-progress pipe:1``, reporting live stats for ``stage``."""
+        cmd = self._with_progress(cmd)
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=err,
+                text=True,
+            )
+            self._watch_progress(proc, stage, duration, run)
+            if self._reap([proc], stage, run)[0]:
+                raise self._ffmpeg_error(proc.returncode, cmd, err)
+
+    def _reap(self, procs: list, stage: str, run: Optional[dict] = None) -> list[int]:
+        """Wait for FFmpeg processes; their CPU time and peak RSS go into ``stage``'s timing.
+
+        A piped chain runs together, so its processes' peaks are summed.
+        """
+        run = run if run is not None else getattr(self._local, "run", None)
+        codes, cpu, peak = [], 0.0, 0
+        for proc in procs:
+            try:
+                _, status, usage = os.wait4(proc.pid, 0)
+            except (AttributeError, ChildProcessError):
+                # No wait4 (Windows) or already reaped — exit code only
+                codes.append(proc.wait())
+                continue
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            codes.append(proc.returncode)
+            cpu += usage.ru_utime + usage.ru_stime
+            peak += usage.ru_maxrss
+        if run and peak:
+            with run["lock"]:
+                timing = run["timings"].setdefault(stage, {})
+                timing["cpu_s"] = round(cpu, 2)
+                # ru_maxrss is KiB on Linux
+                timing["peak_rss_mb"] = round(peak / 1024, 1)
+        return codes
+
+    def _with_progress(self, cmd: list[str]) -> list[str]:
+        return [
+            cmd[0],
+            "-progress",
+            "pipe:1",
+            "-nostats",
+            "-loglevel",
+            "error",
+            *cmd[1:],
+        ]
+
+    def _ffmpeg_error(
+        self, code: int, cmd: list[str], err
+    ) -> subprocess.CalledProcessError:
+        err.seek(0)
+        tail = err.read()[-2000:].decode("utf-8", errors="replace")
+        return subprocess.CalledProcessError(code, cmd, stderr=tail)
+
+    def _watch_progress(
+        self,
+        proc: subprocess.Popen,
+        stage: str,
+        duration: float = 0,
+        run: Optional[dict] = None,
+    ):
+        """Parse ``-progress`` key=value blocks until FFmpeg closes stdout."""
+        run = run if run is not None else getattr(self._local, "run", None)
+        started = time.monotonic()
+        fields: dict = {}
+        stats: dict = {"state": "running"}
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            if key != "progress":
+                fields[key] = value
+                continue
+            stats = self._progress_stats(fields, duration)
+            if value == "end" and duration:
+                stats["percent"] = 100.0
+            stats["elapsed_s"] = round(time.monotonic() - started, 2)
+            if run and run["progress"]:
+                run["progress"](stage, stats)
+
+        if run:
+            timing = {k: v for k, v in stats.items() if k != "state"}
+            timing["wall_s"] = round(time.monotonic() - started, 2)
+            with run["lock"]:
+                run["timings"][stage] = timing
+            if run["progress"]:
+                run["progress"](stage, {"state": "finished", **timing})
+
+    def _progress_stats(self, fields: dict, duration: float) -> dict:
+        """Turn one ``-progress`` block into frames/fps/speed/bitrate numbers."""
+
+        def number(value: str, suffix: str = "") -> float:
+            try:
+                return float(value.removesuffix(suffix))
+            except (ValueError, AttributeError):
+                return 0.0
+
+        out_time = number(fields.get("out_time_us", "")) / 1_000_000
+        stats = {
+            "state": "running",
+            "frames": int(number(fields.get("frame", ""))),
+            "fps": number(fields.get("fps", "")),
+            "speed": number(fields.get("speed", "").strip(), "x"),
+            "bitrate_kbps": number(fields.get("bitrate", "").strip(), "kbits/s"),
+            "out_time_s": round(out_time, 2),
+        }
+        if duration:
+            stats["percent"] = round(min(100.0, out_time / duration * 100), 1)
+        return stats
+
+    @contextmanager
+    def _timed(self, stage: str):
+        """Record wall time for a non-FFmpeg stage (e.g. Whisper).
+
+        CPU is this process's plus any FFmpeg it ran (all threads, so
+        overlapping stages share it); the peak is the process's RSS
+        high-water mark so far.
+        """
+        run = getattr(self._local, "run", None)
+        started = time.monotonic()
+        before = self._cpu_seconds()
+        try:
+            yield
+        finally:
+            if run:
+                timing = {"wall_s": round(time.monotonic() - started, 2)}
+                if resource:
+                    timing["cpu_s"] = round(self._cpu_seconds() - before, 2)
+                    timing["peak_rss_mb"] = round(
+                        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+                    )
+                with run["lock"]:
+                    run["timings"][stage] = timing
+
+    def _cpu_seconds(self) -> float:
+        """User + system time of this process and its reaped children."""
+        if not resource:
+            # Windows: this process only — FFmpeg children go uncounted
+            return time.process_time()
+        return sum(
+            usage.ru_utime + usage.ru_stime
+            for usage in (
+                resource.getrusage(resource.RUSAGE_SELF),
+                resource.getrusage(resource.RUSAGE_CHILDREN),
+            )
+        )
 
     # ── Utilities ────────────────────────────────────────────────
 
+    def _thread_args(self, threads: Optional[int] = None) -> list[str]:
+        """FFmpeg thread limits for this editor's share of the CPU."""
+        threads = threads or self.ffmpeg_threads
+        if not threads:
+            return []
+        n = str(threads)
+        return ["-threads", n, "-filter_threads", n]
+
+    def _parse_bitrate(self, rate: str) -> int:
+        """Parse an FFmpeg bitrate string like '5M' or '128k' into bits/s."""
+        units = {"k": 1_000, "m": 1_000_000}
+        rate = rate.strip().lower()
+        if rate and rate[-1] in units:
+            return int(float(rate[:-1]) * units[rate[-1]])
+        return int(float(rate))
+
     def _parse_fps(self, fps_str: str) -> float:
         """Parse FFmpeg frame rate string like '30/1' or '29.97'."""
         try:
@@ -300,33 +1717,84 @@ class VideoEditor:
         except (ValueError, ZeroDivisionError):
             return 30.0
 
+    def find_highlights(
+        self, path: Path, count: int = 3, window: Optional[float] = None
+    ) -> list[dict]:
+        """Top ``count`` windows of ``path`` by audio energy.
+
+        The audio is decoded and scored once; the score curve is cached
+        with the clip's probe, so later calls (any count/window) are free.
+        """
+        path = Path(path)
+        probe = self._probe_video(path)
+        if "highlights" not in probe:
+            with self._timed("highlights"):
+                probe["highlights"] = (
+                    self.highlight_finder.analyze(path)
+                    if probe.get("audio_codec")
+                    else None
+                )
+            self.probe_cache.put(path, probe)
+        if not probe["highlights"]:
+            # No soundtrack to judge by — take the opening window
+            end = min(probe.get("duration", 0), window or HIGHLIGHT_WINDOW_SECONDS)
+            return [{"rank": 0, "start": 0.0, "end": round(end, 2), "score": 0.0}]
+        return self.highlight_finder.pick(
+            probe["highlights"], count, window, probe.get("duration")
+        )
+
     def get_pending_videos(self) -> list[dict]:
-        """List raw videos waiting to be processed."""
+        """List raw videos waiting to be processed.
+
+        When an ingest watcher maintains ``pending_index`` this is just a
+        snapshot of it — no directory walk, no probes.
+        """
+        if self.pending_index is not None:
+            return self.pending_index.snapshot()
         videos = []
-        for f in RAW_VIDEO_DIR.iterdir():
-            if f.suffix.lower() in SUPPORTED_INPUT_FORMATS:
-                probe = self._probe_video(f)
-                videos.append({
-                    "filename": f.name,
-                    "path": str(f),
-                    "size_mb": probe.get("size_mb", 0),
-                    "duration": probe.get("duration", 0),
-                    "resolution": f"{probe.get('width', '?')}x{probe.get('height', '?')}",
-                })
+        with self.probe_cache.batch():
+            for f in RAW_VIDEO_DIR.iterdir():
+                if f.suffix.lower() in SUPPORTED_INPUT_FORMATS:
+                    videos.append(self.describe_pending(f))
         return videos
 
+    def describe_pending(self, path: Path) -> dict:
+        """Listing entry for one raw video.
+
+        ``duplicate_of`` names an earlier clip with the same footage
+        (fingerprinted once per file version, so rescans are free).
+        """
+        probe = self._probe_video(path)
+        try:
+            duplicate_of = self.dedup_index.duplicate_of(path, probe)
+        except Exception as e:
+            print(f"[DEDUP] Duplicate check failed for {path.name}: {e}")
+            duplicate_of = None
+        return {
+            "filename": path.name,
+            "path": str(path),
+            "size_mb": probe.get("size_mb", 0),
+            "duration": probe.get("duration", 0),
+            "resolution": f"{probe.get('width', '?')}x{probe.get('height', '?')}",
+            "duplicate_of": duplicate_of,
+        }
+
     def get_ready_videos(self) -> list[dict]:
         """List processed videos ready for upload."""
         videos = []
-        for f in UPLOAD_QUEUE_DIR.iterdir():
-            if f.suffix.lower() == ".mp4" and "_READY" in f.name:
+        with self.probe_cache.batch():
+            for f in UPLOAD_QUEUE_DIR.iterdir():
+                if f.suffix.lower() != ".mp4" or "_READY" not in f.name:
+                    continue
                 probe = self._probe_video(f)
-                videos.append({
-                    "filename": f.name,
-                    "path": str(f),
-                    "size_mb": probe.get("size_mb", 0),
-                    "duration": probe.get("duration", 0),
-                    "resolution": f"{probe.get('width', '?')}x{probe.get('height', '?')}",
-                    "status": "ready",
-                })
+                videos.append(
+                    {
+                        "filename": f.name,
+                        "path": str(f),
+                        "size_mb": probe.get("size_mb", 0),
+                        "duration": probe.get("duration", 0),
+                        "resolution": f"{probe.get('width', '?')}x{probe.get('height', '?')}",
+                        "status": "ready",
+                    }
+                )
         return videos
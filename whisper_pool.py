@@ -0,0 +1,163 @@
+"""
+DIDGERI-BOOM Whisper Pool
+One preloaded faster-whisper model per process, shared by every CaptionEngine.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from config import WHISPER_CPU_THREADS, WHISPER_MODEL, WHISPER_NUM_WORKERS
+
+# Seconds of silence pushed through a fresh model so the first real clip
+# doesn't pay for lazy allocations
+WARMUP_SECONDS = 1.0
+
+
+class WhisperPool:
+    """Process-wide registry of loaded Whisper models.
+
+    Each model size is loaded (and warmed up) at most once per process.
+    CTranslate2 runs up to ``num_workers`` transcriptions in parallel on
+    one model, so callers borrow it through ``acquire``, which caps
+    concurrent use at that number instead of loading more copies.
+    """
+
+    def __init__(
+        self,
+        cpu_threads: int = WHISPER_CPU_THREADS,
+        num_workers: int = WHISPER_NUM_WORKERS,
+    ):
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self._lock = threading.Lock()
+        # Held while a model loads, so status reads never wait on it
+        self._load_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.num_workers)
+        self._models: dict = {}
+        # model size → {"state", "load_seconds", "warmup_seconds", "error"}
+        self._stats: dict = {}
+        self._in_use = 0
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def preload(self, model_size: str = WHISPER_MODEL) -> bool:
+        """Load and warm up ``model_size`` now (no-op if already loaded)."""
+        return self.get(model_size) is not None
+
+    def get(self, model_size: str = WHISPER_MODEL):
+        """The shared model, loading it on first use; None if unavailable."""
+        with self._load_lock:
+            if model_size not in self._models:
+                model = self._load(model_size)
+                # A failed load is retried next time; a missing package is not
+                if (
+                    model is not None
+                    or self._stats[model_size]["state"] == "unavailable"
+                ):
+                    self._models[model_size] = model
+                return model
+            return self._models[model_size]
+
+    @contextmanager
+    def acquire(self, model_size: str = WHISPER_MODEL):
+        """Borrow the model for one transcription (blocks while all workers are busy).
+
+        faster-whisper decodes lazily, so keep consuming segments inside
+        the ``with`` block.
+        """
+        model = self.get(model_size)
+        if model is None:
+            yield None
+            return
+        with self._slots:
+            with self._lock:
+                self._in_use += 1
+            try:
+                yield model
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "cpu_threads": self.cpu_threads,
+                "num_workers": self.num_workers,
+                "in_use": self._in_use,
+                "models": {size: dict(stats) for size, stats in self._stats.items()},
+            }
+
+    # ── Loading ──────────────────────────────────────────────────
+
+    def _load(self, model_size: str):
+        """Build and warm up one model (load lock held)."""
+        self._set_stats(model_size, state="loading")
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            print("[CAPTION] faster-whisper not installed. Captions disabled.")
+            self._set_stats(model_size, state="unavailable")
+            return None
+
+        started = time.monotonic()
+        try:
+            model = WhisperModel(
+                model_size,
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers,
+            )
+        except Exception as e:
+            print(f"[CAPTION] Could not load Whisper model '{model_size}': {e}")
+            self._set_stats(model_size, state="failed", error=str(e))
+            return None
+        load_seconds = round(time.monotonic() - started, 2)
+
+        started = time.monotonic()
+        try:
+            import numpy as np
+
+            segments, _ = model.transcribe(
+                np.zeros(int(16000 * WARMUP_SECONDS), dtype=np.float32), beam_size=1
+            )
+            list(segments)
+        except Exception as e:
+            # A failed warmup only means the first clip runs cold
+            print(f"[CAPTION] Whisper warmup failed: {e}")
+        warmup_seconds = round(time.monotonic() - started, 2)
+        self._set_stats(
+            model_size,
+            state="ready",
+            load_seconds=load_seconds,
+            warmup_seconds=warmup_seconds,
+        )
+        print(
+            f"[CAPTION] Whisper '{model_size}' ready (load {load_seconds}s, warmup {warmup_seconds}s)"
+        )
+        return model
+
+    def _set_stats(self, model_size: str, **fields):
+        with self._lock:
+            self._stats.setdefault(model_size, {}).update(fields)
+
+
+_shared_pool: Optional[WhisperPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool(cpu_threads: Optional[int] = None) -> WhisperPool:
+    """The pool for this process, created on first call.
+
+    ``cpu_threads`` only applies to that first call — batch workers pass
+    their share of the cores when WHISPER_CPU_THREADS is left at 0.
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = WhisperPool(
+                cpu_threads=WHISPER_CPU_THREADS or cpu_threads or 0
+            )
+        return _shared_pool